@@ -11,7 +11,7 @@ import os
 import logging
 import subprocess
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 import httpx
 
 # Set up logging to file to avoid interfering with stdio
@@ -29,6 +29,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Capture, diagnostics and binary response formats come from the server's package; without it the bridge runs alone on plain JSON
+try:
+    from src.core.capture import get_traffic_capture
+    from src.core.diagnostics import get_diagnostics
+    from src.utils.codecs import CBOR, JSON, MSGPACK, decode, encodings, media_types
+except ImportError:
+    get_traffic_capture = get_diagnostics = None
+    JSON, MSGPACK, CBOR = "application/json", "application/msgpack", "application/cbor"
+    
+    def decode(data: bytes, media_type: str) -> Any:
+        return json.loads(data)
+    
+    def encodings() -> List[str]:
+        return ["gzip"]
+    
+    def media_types() -> List[str]:
+        return [JSON]
+
 
 class MCPHttpBridge:
     """Bridge between MCP stdio protocol and HTTP API."""
@@ -37,20 +55,44 @@ class MCPHttpBridge:
         """Initialize the bridge."""
         self.server_url = os.getenv("SERVER_URL", "http://localhost:8008")
         self.api_key = os.getenv("API_KEY")
+        self.page_size = int(os.getenv("TOOLS_PAGE_SIZE", "100"))
         self.server_process = None
+        # Tool calls are captured like the server's when TRAFFIC_CAPTURE_ENABLED is set
+        self.capture = get_traffic_capture() if get_traffic_capture is not None else None
+        # One client for every request, so connections to the server are kept alive and reused
+        self.http = httpx.AsyncClient()
+        
+        # Binary formats decode faster than JSON; compression only pays off when the server is remote
+        self.response_format = self._response_format(os.getenv("BRIDGE_RESPONSE_FORMAT", "json"))
+        self.accept_encoding = ", ".join(encodings()) if os.getenv("BRIDGE_COMPRESSION", "false").lower() == "true" else "identity"
         logger.info(f"MCP HTTP Bridge initialized, server URL: {self.server_url}")
         if not self.api_key:
             logger.warning("No API_KEY environment variable found")
     
+    @staticmethod
+    def _response_format(name: str) -> str:
+        """Get the media type of a BRIDGE_RESPONSE_FORMAT, falling back to JSON if its package is missing."""
+        media_type = {"json": JSON, "msgpack": MSGPACK, "cbor": CBOR}.get(name.strip().lower())
+        if media_type is None or media_type not in media_types():
+            logger.warning(f"Response format '{name}' is not available, using JSON")
+            return JSON
+        return media_type
+    
+    def _headers(self) -> Dict[str, str]:
+        """Headers of every request to the server."""
+        headers = {"Accept": self.response_format, "Accept-Encoding": self.accept_encoding}
+        if self.api_key:
+            headers["X-API-Key"] = self.api_key
+        return headers
+    
     async def start_http_server(self):
         """Start the HTTP server if not already running."""
         try:
             # Check if server is already running
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.server_url}/health", timeout=2.0)
-                if response.status_code == 200:
-                    logger.info("HTTP server already running")
-                    return True
+            response = await self.http.get(f"{self.server_url}/health", timeout=2.0)
+            if response.status_code == 200:
+                logger.info("HTTP server already running")
+                return True
         except:
             logger.info("HTTP server not running, starting it...")
         
@@ -67,17 +109,16 @@ class MCPHttpBridge:
             for _ in range(10):  # Wait up to 10 seconds
                 await asyncio.sleep(1)
                 try:
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(f"{self.server_url}/health", timeout=2.0)
-                        if response.status_code == 200:
-                            logger.info("HTTP server started successfully")
-                            return True
+                    response = await self.http.get(f"{self.server_url}/health", timeout=2.0)
+                    if response.status_code == 200:
+                        logger.info("HTTP server started successfully")
+                        return True
                 except:
                     continue
             
             logger.error("Failed to start HTTP server")
             return False
-            
+        
         except Exception as e:
             logger.error(f"Error starting HTTP server: {e}")
             return False
@@ -94,7 +135,7 @@ class MCPHttpBridge:
                 return await self._handle_initialize(request_id, request.get("params", {}))
             
             elif method == "tools/list":
-                return await self._handle_list_tools(request_id)
+                return await self._handle_list_tools(request_id, request.get("params") or {})
             
             elif method == "tools/call":
                 return await self._handle_call_tool(request_id, request.get("params", {}))
@@ -136,35 +177,47 @@ class MCPHttpBridge:
             }
         }
     
-    async def _handle_list_tools(self, request_id: Optional[str]) -> Dict[str, Any]:
-        """Handle tools list request."""
+    async def _handle_list_tools(self, request_id: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle tools list request, one page at a time (filters may be given in params or _meta)."""
         try:
-            headers = {}
-            if self.api_key:
-                headers["X-API-Key"] = self.api_key
+            headers = self._headers()
+            
+            meta = params.get("_meta") or {}
+            query = {}
+            if self.page_size > 0:
+                query["limit"] = self.page_size
+            for name in ("cursor", "client", "prefix", "fields"):
+                value = params.get(name, meta.get(name))
+                if value:
+                    query[name] = value
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.server_url}/tools", headers=headers)
-                response.raise_for_status()
-                tools_data = response.json()
+            response = await self.http.get(f"{self.server_url}/tools", params=query, headers=headers)
+            if response.status_code == 400:
+                return self._error_response(request_id, -32602, response.json().get("detail", "Invalid cursor"))
+            response.raise_for_status()
+            tools_data = decode(response.content, response.headers.get("content-type", JSON))
             
             # Convert HTTP response to MCP format
             mcp_tools = []
             for tool in tools_data["tools"]:
-                mcp_tools.append({
+                mcp_tool = {
                     "name": tool["name"],
-                    "description": tool["description"],
-                    "inputSchema": tool["input_schema"]
-                })
+                    "inputSchema": tool.get("input_schema") or {"type": "object"}
+                }
+                if tool.get("description") is not None:
+                    mcp_tool["description"] = tool["description"]
+                mcp_tools.append(mcp_tool)
+            
+            result = {"tools": mcp_tools}
+            if tools_data.get("next_cursor"):
+                result["nextCursor"] = tools_data["next_cursor"]
             
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
-                "result": {
-                    "tools": mcp_tools
-                }
+                "result": result
             }
-            
+        
         except Exception as e:
             logger.error(f"Error listing tools: {e}")
             return self._error_response(request_id, -32603, f"Failed to list tools: {str(e)}")
@@ -177,19 +230,18 @@ class MCPHttpBridge:
         if not tool_name:
             return self._error_response(request_id, -32602, "Missing tool name")
         
+        started = time.time()
+        response = None
         try:
-            headers = {"Content-Type": "application/json"}
-            if self.api_key:
-                headers["X-API-Key"] = self.api_key
+            headers = {**self._headers(), "Content-Type": "application/json"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.server_url}/tools/{tool_name}",
-                    json=arguments,
-                    headers=headers
-                )
-                response.raise_for_status()
-                result_data = response.json()
+            response = await self.http.post(
+                f"{self.server_url}/tools/{tool_name}",
+                json=arguments,
+                headers=headers
+            )
+            response.raise_for_status()
+            result_data = decode(response.content, response.headers.get("content-type", JSON))
             
             # Convert HTTP response to MCP format
             return {
@@ -204,7 +256,7 @@ class MCPHttpBridge:
                     ]
                 }
             }
-            
+        
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error calling tool {tool_name}: {e}")
             error_detail = e.response.text if hasattr(e.response, 'text') else str(e)
@@ -213,6 +265,20 @@ class MCPHttpBridge:
         except Exception as e:
             logger.error(f"Error calling tool {tool_name}: {e}")
             return self._error_response(request_id, -32603, f"Tool execution failed: {str(e)}")
+        
+        finally:
+            # Status 0 when the server could not be reached
+            if self.capture is not None:
+                self.capture.record_call(
+                    "bridge",
+                    f"{self.api_key[:8]}***" if self.api_key else None,
+                    tool_name,
+                    arguments,
+                    started,
+                    time.time() - started,
+                    response.status_code if response is not None else 0,
+                    len(response.content) if response is not None else None
+                )
     
     async def _handle_list_prompts(self, request_id: Optional[str]) -> Dict[str, Any]:
         """Handle prompts list request."""
@@ -250,8 +316,9 @@ class MCPHttpBridge:
             }
         }
     
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up resources."""
+        await self.http.aclose()
         # Don't kill the HTTP server - let it persist for future bridge calls
         logger.info("Bridge cleanup - keeping HTTP server running")
 
@@ -261,6 +328,12 @@ async def main():
     bridge = MCPHttpBridge()
     logger.info("Starting MCP HTTP Bridge")
     
+    # SIGUSR1 dumps tasks and a profile to files; the loop blocks reading stdin, so its lag is not monitored
+    diagnostics = get_diagnostics() if get_diagnostics is not None else None
+    if diagnostics is not None and diagnostics.enabled:
+        diagnostics.start(monitor_lag=False)
+        diagnostics.install_signal_handler()
+    
     try:
         while True:
             # Read line from stdin
@@ -283,7 +356,7 @@ async def main():
                 if response is not None:
                     print(json.dumps(response))
                     sys.stdout.flush()
-                
+            
             except json.JSONDecodeError as e:
                 logger.error(f"JSON decode error: {e}")
                 error_response = {
@@ -296,13 +369,13 @@ async def main():
                 }
                 print(json.dumps(error_response))
                 sys.stdout.flush()
-                
+    
     except KeyboardInterrupt:
         logger.info("Bridge stopped by user")
     except Exception as e:
         logger.error(f"Bridge error: {e}")
     finally:
-        bridge.cleanup()
+        await bridge.cleanup()
         logger.info("MCP HTTP Bridge shutdown")
 
 
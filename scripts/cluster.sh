@@ -0,0 +1,48 @@
+#!/bin/bash
+
+# Local sharded cluster for testing
+# Usage: ./scripts/cluster.sh start [nodes] [first port]
+#        ./scripts/cluster.sh stop
+
+set -e
+
+PYTHON=${PYTHON:-./mcp-server-env/bin/python}
+PID_FILE=logs/cluster.pids
+NODES=${2:-3}
+FIRST_PORT=${3:-8008}
+
+export PYTHONPYCACHEPREFIX=.cache/pycache
+mkdir -p logs
+
+case "$1" in
+    start)
+        CLUSTER_NODES=""
+        for ((i = 0; i < NODES; i++)); do
+            CLUSTER_NODES="$CLUSTER_NODES${CLUSTER_NODES:+,}http://127.0.0.1:$((FIRST_PORT + i))"
+        done
+        
+        echo "🔧 Starting $NODES nodes: $CLUSTER_NODES"
+        : > "$PID_FILE"
+        for ((i = 0; i < NODES; i++)); do
+            port=$((FIRST_PORT + i))
+            # Each node keeps its own snapshot, so restarts stay warm for the keys it owns
+            CLUSTER_NODES="$CLUSTER_NODES" CLUSTER_SELF="http://127.0.0.1:$port" \
+                SNAPSHOT_PATH=".cache/snapshot-$port.bin" \
+                "$PYTHON" -m uvicorn src.app:app --host 127.0.0.1 --port "$port" > "logs/node-$port.log" 2>&1 &
+            echo $! >> "$PID_FILE"
+        done
+        echo "✅ Cluster started; logs in logs/node-<port>.log, routing stats at /metrics"
+        ;;
+    stop)
+        echo "🛑 Stopping cluster..."
+        if [ -f "$PID_FILE" ]; then
+            xargs kill -TERM < "$PID_FILE" 2>/dev/null || true
+            rm -f "$PID_FILE"
+        fi
+        echo "✅ Cluster stopped"
+        ;;
+    *)
+        echo "Usage: $0 start [nodes] [first port] | stop"
+        exit 2
+        ;;
+esac
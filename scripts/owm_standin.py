@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Local OpenWeatherMap stand-in serving the upstream responses recorded in a traffic capture.
+
+Requests are matched by endpoint and query parameters (the API key is
+ignored). A request recorded several times gets the recorded responses in
+order, then the last one again, so a replay sees what production saw.
+Requests that were never recorded are answered by point, as OWM would:
+coordinates with a response recorded for the same point under any name,
+and names with a response for the point the name resolved to on another
+endpoint. A replay's cache may serve different requests from upstream than
+production did (e.g. a place by coordinates before its name). Requests
+that still have no response get a 503, which the weather client does not
+cache, and are counted as misses.
+
+With `--synthetic`, requests without a recorded response get generated
+ones instead, so a load test can ask for any location for as long as it
+runs (scripts/soak.py does). Generated weather is deterministic per
+location and about one name in twenty is "city not found".
+
+Point the server at it with OPENWEATHERMAP_BASE_URL, e.g.:
+    python scripts/owm_standin.py logs/traffic.jsonl --port 8090
+    OPENWEATHERMAP_BASE_URL=http://127.0.0.1:8090/data/2.5 ./scripts/start.sh
+
+Usage: python scripts/owm_standin.py [CAPTURE] [--synthetic] [--host HOST] [--port PORT] [--latency SCALE]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+# Query parameters that never identify a response
+IGNORED_PARAMS = ("appid",)
+
+# Decimal places coordinates are matched to (0.01° is about 1.1 km, the default cache grid)
+COORDINATE_DIGITS = 2
+
+# Upstream latency of generated responses, in milliseconds
+SYNTHETIC_LATENCY_MS = 50.0
+
+CONDITIONS = [("Clear", "clear sky"), ("Clouds", "scattered clouds"), ("Rain", "light rain"), ("Snow", "light snow"), ("Mist", "mist")]
+
+ResponseKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def response_key(endpoint: str, params: Dict[str, Any]) -> ResponseKey:
+    """Identify a response by its endpoint and query parameters, compared as strings."""
+    return endpoint, tuple(sorted((name, str(value)) for name, value in params.items() if name not in IGNORED_PARAMS))
+
+
+def coordinate_params(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Get the parameters of a coordinate request for the point a successful response describes."""
+    if record["status"] != 200:
+        return None
+    try:
+        body = json.loads(record["body"])
+    except ValueError:
+        return None
+    
+    coord = body.get("coord") or (body.get("city") or {}).get("coord") or {}
+    if coord.get("lat") is None or coord.get("lon") is None:
+        return None
+    params = {name: value for name, value in record["params"].items() if name != "q"}
+    return {**params, "lat": round(float(coord["lat"]), COORDINATE_DIGITS), "lon": round(float(coord["lon"]), COORDINATE_DIGITS)}
+
+
+def load_responses(path: str) -> Tuple[Dict[ResponseKey, List[Dict[str, Any]]], Dict[ResponseKey, List[Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+    """
+    Load the upstream records of a capture, grouped by request in capture order.
+    
+    Returns:
+        (responses by request, successful responses by the coordinates they
+        describe, coordinates of the names that resolved)
+    """
+    responses: Dict[ResponseKey, List[Dict[str, Any]]] = defaultdict(list)
+    by_point: Dict[ResponseKey, List[Dict[str, Any]]] = defaultdict(list)
+    places: Dict[str, Dict[str, Any]] = {}
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    
+    for record in sorted(records, key=lambda record: record["ts"]):
+        if record.get("type") != "upstream":
+            continue
+        responses[response_key(record["endpoint"], record["params"])].append(record)
+        point = coordinate_params(record)
+        if point is not None:
+            by_point[response_key(record["endpoint"], point)].append(record)
+            if "q" in record["params"]:
+                places[str(record["params"]["q"]).lower()] = {"lat": point["lat"], "lon": point["lon"]}
+    return responses, by_point, places
+
+
+def point_key(endpoint: str, params: Dict[str, Any], places: Dict[str, Dict[str, Any]]) -> Optional[ResponseKey]:
+    """Identify a request by the point it asks for, or None if the point is unknown."""
+    if "q" in params:
+        point = places.get(params["q"].lower())
+        if point is None:
+            return None
+        params = {**{name: value for name, value in params.items() if name != "q"}, **point}
+    
+    try:
+        lat, lon = float(params["lat"]), float(params["lon"])
+    except (KeyError, ValueError):
+        return None
+    return response_key(endpoint, {**params, "lat": round(lat, COORDINATE_DIGITS), "lon": round(lon, COORDINATE_DIGITS)})
+
+
+def _seed(text: str) -> int:
+    """Get a stable number for a text (hash() differs between runs)."""
+    return int.from_bytes(hashlib.sha1(text.lower().encode("utf-8")).digest()[:8], "big")
+
+
+def _conditions(seed: int, dt: int) -> Dict[str, Any]:
+    """Generate the readings of one point at one time."""
+    main, description = CONDITIONS[(seed + dt // 10800) % len(CONDITIONS)]
+    temp = round(-5 + (seed % 3000) / 100 + 4 * ((dt // 3600) % 6) / 6, 2)
+    return {
+        "main": {"temp": temp, "feels_like": round(temp - 1.5, 2), "humidity": 40 + seed % 50, "pressure": 1000 + seed % 30},
+        "weather": [{"id": 800, "main": main, "description": description, "icon": "01d"}],
+        "wind": {"speed": round((seed % 120) / 10, 1), "deg": seed % 360},
+        "clouds": {"all": seed % 100},
+        "dt": dt
+    }
+
+
+def synthetic_response(endpoint: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """
+    Generate an OpenWeatherMap response for any location.
+    
+    Names get stable coordinates derived from the name; about one name in
+    twenty does not exist. Readings change with the time of day.
+    
+    Returns:
+        (status, body)
+    """
+    if "q" in params:
+        name = str(params["q"]).split(",")[0].strip().title()
+        seed = _seed(name)
+        if seed % 20 == 0:
+            return 404, {"cod": "404", "message": "city not found"}
+        lat, lon = round((seed % 15000) / 100 - 75, 4), round((seed // 15000 % 36000) / 100 - 180, 4)
+    else:
+        try:
+            lat, lon = float(params["lat"]), float(params["lon"])
+        except (KeyError, ValueError):
+            return 400, {"cod": "400", "message": "Nothing to geocode"}
+        name = f"Place {lat:.2f},{lon:.2f}"
+        seed = _seed(f"{lat:.2f},{lon:.2f}")
+    
+    now = int(time.time())
+    coord = {"lat": lat, "lon": lon}
+    if endpoint == "forecast":
+        start = now - now % 10800 + 10800
+        entries = [
+            {**_conditions(seed, dt), "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt))}
+            for dt in range(start, start + 40 * 10800, 10800)
+        ]
+        return 200, {"cod": "200", "cnt": len(entries), "list": entries, "city": {"name": name, "coord": coord, "country": "XX"}}
+    
+    return 200, {"coord": coord, "name": name, "sys": {"country": "XX"}, "cod": 200, **_conditions(seed, now)}
+
+
+def create_app(
+    responses: Dict[ResponseKey, List[Dict[str, Any]]],
+    by_point: Dict[ResponseKey, List[Dict[str, Any]]],
+    places: Dict[str, Dict[str, Any]],
+    latency_scale: float,
+    synthetic: bool = False
+) -> FastAPI:
+    """Create the stand-in app for a set of recorded responses, generating the missing ones if synthetic."""
+    app = FastAPI(title="OpenWeatherMap stand-in")
+    served: Dict[ResponseKey, int] = defaultdict(int)
+    counts = {"requests": 0, "by_point": 0, "synthetic": 0, "misses": 0}
+    
+    @app.get("/_standin/stats")
+    async def stats():
+        """Requests served, answered by point, generated, and without a recorded response."""
+        return {**counts, "recorded": sum(len(records) for records in responses.values())}
+    
+    @app.post("/_standin/reset")
+    async def reset():
+        """Start serving every request's responses from the first one again."""
+        served.clear()
+        counts.update(requests=0, by_point=0, synthetic=0, misses=0)
+        return {"reset": True}
+    
+    @app.get("/{path:path}")
+    async def upstream(path: str, request: Request):
+        """Serve the next recorded response for a request."""
+        counts["requests"] += 1
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(request.query_params)
+        key = response_key(endpoint, params)
+        records = responses.get(key)
+        
+        if not records:
+            key = point_key(endpoint, params, places)
+            records = by_point.get(key) if key is not None else None
+            if not records and synthetic:
+                counts["synthetic"] += 1
+                if latency_scale > 0:
+                    await asyncio.sleep(SYNTHETIC_LATENCY_MS / 1000 * latency_scale)
+                status, body = synthetic_response(endpoint, params)
+                return JSONResponse(body, status_code=status)
+            if not records:
+                counts["misses"] += 1
+                return JSONResponse({"cod": "503", "message": "No recorded response"}, status_code=503)
+            counts["by_point"] += 1
+        
+        record = records[min(served[key], len(records) - 1)]
+        served[key] += 1
+        if latency_scale > 0:
+            await asyncio.sleep(record["latency_ms"] / 1000 * latency_scale)
+        return Response(content=record["body"], status_code=record["status"], media_type="application/json")
+    
+    return app
+
+
+def main() -> None:
+    """Load a capture and serve its upstream responses, or generated ones."""
+    parser = argparse.ArgumentParser(description="Serve the OpenWeatherMap responses recorded in a traffic capture")
+    parser.add_argument("capture", nargs="?", help="JSONL capture written with TRAFFIC_CAPTURE_ENABLED=true")
+    parser.add_argument("--synthetic", action="store_true", help="Generate responses for requests that were not recorded")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=1.0, help="Multiple of the recorded upstream latency to wait before answering (0 answers at once)")
+    args = parser.parse_args()
+    if not args.capture and not args.synthetic:
+        parser.error("give a capture, --synthetic, or both")
+    
+    responses, by_point, places = load_responses(args.capture) if args.capture else ({}, {}, {})
+    if args.capture:
+        print(f"Loaded {sum(len(records) for records in responses.values())} responses for {len(responses)} requests from {args.capture}")
+    uvicorn.run(create_app(responses, by_point, places, args.latency, args.synthetic), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Replay the tool calls of a traffic capture against a running server.
+
+Calls are re-sent with their captured arguments and API key labels, at the
+captured pace (`--speed 1`), N times faster (`--speed N`), or as fast as the
+server allows (`--speed max`). Paced replays keep the captured overlap of
+calls; `max` runs them in capture order with at most the capture's peak
+number of calls in flight. The report gives latency percentiles overall and
+per tool, status differences from the capture, tool cache hits and, with
+`--standin`, the upstream requests per call as a measure of cache
+effectiveness.
+
+For a deterministic replay, serve the recorded upstream responses with
+scripts/owm_standin.py and start the server with OPENWEATHERMAP_BASE_URL
+pointing at it, cold (SNAPSHOT_ENABLED=false).
+
+Usage: python scripts/replay.py CAPTURE [--url URL] [--speed 1|N|max] [--api-key KEY]
+                                [--key LABEL=KEY ...] [--source SOURCES] [--limit N]
+                                [--timeout SECONDS] [--standin URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+def load_capture(path: str, sources: List[str], limit: Optional[int]) -> Dict[str, List[Dict[str, Any]]]:
+    """Load the calls from the given sources, and the upstream records, in capture order."""
+    calls = []
+    upstream = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") == "call" and record.get("source") in sources:
+                calls.append(record)
+            elif record.get("type") == "upstream":
+                upstream.append(record)
+    
+    calls.sort(key=lambda record: record["ts"])
+    if limit:
+        calls = calls[:limit]
+    return {"calls": calls, "upstream": upstream}
+
+
+def peak_concurrency(calls: List[Dict[str, Any]]) -> int:
+    """Get the largest number of captured calls that were in flight at once."""
+    events = []
+    for call in calls:
+        events.append((call["ts"], 1))
+        events.append((call["ts"] + call["latency_ms"] / 1000, -1))
+    
+    peak = current = 0
+    # Ends sort before starts at the same instant
+    for _, change in sorted(events):
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+
+class Replayer:
+    """Re-drives captured calls against a server and collects their outcomes."""
+    
+    def __init__(self, url: str, keys: Dict[str, str], default_key: Optional[str], timeout: float):
+        """Initialize the replayer for a server and the API keys of the captured labels."""
+        self.url = url.rstrip("/")
+        self.keys = keys
+        self.default_key = default_key
+        self.timeout = timeout
+        self.results: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.peak = 0
+    
+    def api_key(self, label: Optional[str]) -> Optional[str]:
+        """Get the API key to send for a captured label."""
+        return self.keys.get(label or "", self.default_key)
+    
+    async def call(self, client: httpx.AsyncClient, record: Dict[str, Any]) -> None:
+        """Send one captured call and record its latency, status and size."""
+        headers = {}
+        key = self.api_key(record.get("label"))
+        if key:
+            headers["X-API-Key"] = key
+        
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        start = time.perf_counter()
+        try:
+            response = await client.post(f"{self.url}/tools/{record['tool']}", json=record["arguments"], headers=headers)
+            status, size = response.status_code, len(response.content)
+        except httpx.HTTPError:
+            status, size = 0, 0
+        finally:
+            self.in_flight -= 1
+        
+        self.results.append({
+            "tool": record["tool"],
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "status": status,
+            "bytes": size,
+            "captured_status": record["status"]
+        })
+    
+    async def run(self, calls: List[Dict[str, Any]], speed: Optional[float], max_in_flight: int) -> float:
+        """
+        Replay calls and return the elapsed seconds.
+        
+        Args:
+            calls: Captured calls in capture order
+            speed: Pace relative to the capture, or None for as fast as possible
+            max_in_flight: Calls in flight at once when speed is None
+        """
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=max(max_in_flight, 10))
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            
+            if speed is None:
+                semaphore = asyncio.Semaphore(max_in_flight)
+                
+                async def bounded(record: Dict[str, Any]) -> None:
+                    async with semaphore:
+                        await self.call(client, record)
+                
+                await asyncio.gather(*(bounded(record) for record in calls))
+            else:
+                first = calls[0]["ts"]
+                tasks = []
+                for record in calls:
+                    delay = (record["ts"] - first) / speed - (loop.time() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    tasks.append(asyncio.ensure_future(self.call(client, record)))
+                await asyncio.gather(*tasks)
+            
+            return loop.time() - start
+
+
+async def fetch_json(url: str, api_key: Optional[str] = None, method: str = "GET") -> Optional[Dict[str, Any]]:
+    """Fetch a JSON document, or None if it is unavailable."""
+    try:
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.request(method, url, headers={"X-API-Key": api_key} if api_key else {})
+            response.raise_for_status()
+            return response.json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def report(
+    capture: Dict[str, List[Dict[str, Any]]],
+    replayer: Replayer,
+    elapsed: float,
+    speed_label: str,
+    path: str,
+    metrics: List[Optional[Dict[str, Any]]],
+    standin: Optional[Dict[str, Any]]
+) -> None:
+    """Print latency distributions, status differences and cache effectiveness."""
+    calls = capture["calls"]
+    results = replayer.results
+    print(
+        f"Replayed {len(results)} calls from {path} at {speed_label} in {elapsed:.1f}s "
+        f"({len(results) / max(elapsed, 1e-9):.1f} calls/s); peak concurrency {replayer.peak} "
+        f"(captured {peak_concurrency(calls)})"
+    )
+    
+    replayed = defaultdict(list)
+    captured = defaultdict(list)
+    for result in results:
+        replayed["all"].append(result["latency_ms"])
+        replayed[result["tool"]].append(result["latency_ms"])
+    for call in calls:
+        captured["all"].append(call["latency_ms"])
+        captured[call["tool"]].append(call["latency_ms"])
+    
+    width = max(len(name) for name in replayed) + 2
+    print()
+    print(f"{'latency ms':<{width}}{'calls':>7}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'captured p50/p99':>20}")
+    for name in ["all"] + sorted(name for name in replayed if name != "all"):
+        values = sorted(replayed[name])
+        before = sorted(captured[name])
+        print(
+            f"{name:<{width}}{len(values):>7}"
+            f"{percentile(values, 0.5):>9.1f}{percentile(values, 0.9):>9.1f}"
+            f"{percentile(values, 0.99):>9.1f}{values[-1]:>9.1f}"
+            f"{percentile(before, 0.5):>12.1f}/{percentile(before, 0.99):.1f}"
+        )
+    
+    statuses = Counter(result["status"] for result in results)
+    differ = sum(1 for result in results if result["status"] != result["captured_status"])
+    print()
+    print(
+        "Status: " + ", ".join(f"{status} x {count}" for status, count in sorted(statuses.items()))
+        + f" ({differ} differ from the capture)"
+    )
+    
+    captured_hits = sum(1 for call in calls if call.get("cache") == "hit")
+    before, after = metrics
+    if before and after:
+        hits = after["tool_cache"].get("hits", 0) - before["tool_cache"].get("hits", 0)
+        print(f"Tool cache: {hits} hits ({hits / max(len(results), 1):.0%}), captured {captured_hits} ({captured_hits / max(len(calls), 1):.0%})")
+    else:
+        print(f"Tool cache: captured {captured_hits} hits ({captured_hits / max(len(calls), 1):.0%}); pass an API key to read /metrics")
+    
+    # Upstream requests made while the captured calls ran
+    if calls:
+        end = max(call["ts"] + call["latency_ms"] / 1000 for call in calls)
+        window = [record for record in capture["upstream"] if calls[0]["ts"] <= record["ts"] <= end]
+        captured_rate = len(window) / len(calls)
+        if standin is not None:
+            print(
+                f"Upstream: {standin['requests']} requests ({standin['requests'] / max(len(results), 1):.2f} per call), "
+                f"captured {len(window)} ({captured_rate:.2f} per call); {standin['by_point']} answered by point, "
+                f"{standin['misses']} without a recorded response"
+            )
+        else:
+            print(f"Upstream: captured {len(window)} requests ({captured_rate:.2f} per call); pass --standin to compare")
+
+
+async def replay(args: argparse.Namespace) -> None:
+    """Replay a capture as configured on the command line."""
+    sources = [source.strip() for source in args.source.split(",") if source.strip()]
+    capture = load_capture(args.capture, sources, args.limit)
+    if not capture["calls"]:
+        print(f"No calls from {', '.join(sources)} in {args.capture}")
+        return
+    
+    keys = dict(pair.split("=", 1) for pair in args.key)
+    replayer = Replayer(args.url, keys, args.api_key, args.timeout)
+    metrics_key = args.api_key or next(iter(keys.values()), None)
+    
+    speed = None if args.speed == "max" else float(args.speed)
+    speed_label = "max speed" if speed is None else f"{speed:g}x"
+    max_in_flight = max(peak_concurrency(capture["calls"]), 1)
+    
+    if args.standin:
+        await fetch_json(f"{args.standin.rstrip('/')}/_standin/reset", method="POST")
+    before = await fetch_json(f"{replayer.url}/metrics", metrics_key)
+    
+    elapsed = await replayer.run(capture["calls"], speed, max_in_flight)
+    
+    after = await fetch_json(f"{replayer.url}/metrics", metrics_key)
+    standin = await fetch_json(f"{args.standin.rstrip('/')}/_standin/stats") if args.standin else None
+    report(capture, replayer, elapsed, speed_label, args.capture, [before, after], standin)
+
+
+def main() -> None:
+    """Parse the command line and replay."""
+    parser = argparse.ArgumentParser(description="Replay the tool calls of a traffic capture against a server")
+    parser.add_argument("capture", help="JSONL capture written with TRAFFIC_CAPTURE_ENABLED=true")
+    parser.add_argument("--url", default=os.getenv("SERVER_URL", "http://localhost:8008"), help="Server to replay against")
+    parser.add_argument("--speed", default="1", help="Pace relative to the capture (1, N) or max")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"), help="API key for labels without their own --key")
+    parser.add_argument("--key", action="append", default=[], metavar="LABEL=KEY", help="API key to send for a captured label")
+    parser.add_argument("--source", default="http", help="Comma-separated sources of calls to replay: http, bridge, forwarded")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N calls")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each call")
+    parser.add_argument("--standin", default=None, help="URL of scripts/owm_standin.py, to count upstream requests")
+    args = parser.parse_args()
+    
+    if args.speed != "max" and float(args.speed) <= 0:
+        parser.error("--speed must be positive or max")
+    asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
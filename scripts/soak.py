@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+"""
+Soak test an entry point for hours and report how its memory grows.
+
+Starts the OpenWeatherMap stand-in (scripts/owm_standin.py, generating
+responses for any location), the entry point under test, and a steady
+load of tool calls:
+
+    http    the HTTP server (src.app), called over HTTP
+    stdio   the native MCP server (src.mcp_server), spoken to over stdin/stdout
+    bridge  the HTTP bridge (mcp_http_bridge.py) over stdin/stdout, with the
+            HTTP server it forwards to
+
+Calls spread over a pool of generated locations with a skewed popularity
+(names and coordinates, a few that do not exist), or loop over the calls
+of a traffic capture with `--capture`. Every `--sample` seconds the RSS of
+each process is read from /proc and, with allocation tracing on (the
+default), a tracemalloc snapshot is taken: from /debug/allocations for the
+HTTP server, from a SIGUSR1 dump for the stdio processes.
+
+The report gives, per process, the RSS and traced memory growth rates
+after warmup (least squares, in MB/hour), the allocation sites that grew
+most, a leak flag when growth above `--leak-threshold` is sustained into
+the last third of the run, and a suggested container memory limit: peak
+RSS plus the growth projected over `--horizon` hours, with `--headroom`.
+Tracing itself costs memory (reported as overhead) and time, so size
+limits from a run with `--no-tracemalloc`.
+
+Usage: python scripts/soak.py [--entry http|stdio|bridge] [--duration 3h] [--rate CALLS_PER_S]
+                              [--concurrency N] [--sample SECONDS] [--locations N] [--capture FILE]
+                              [--api-key KEY] [--no-tracemalloc] [--out REPORT.json]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from replay import load_capture, percentile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Relative call frequency of each tool in generated load
+TOOL_MIX = [("get_current_weather", 6), ("get_weather_forecast", 3), ("get_weather_overview", 1)]
+
+MIB = 1024 * 1024
+
+# Runs shorter than this (seconds) are dominated by caches filling up
+SHORT_RUN = 1800
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as 90, 90s, 30m or 3h into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def read_rss(pid: int) -> Optional[int]:
+    """Get the resident set size of a process in bytes, or None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    
+    # Platforms without /proc
+    try:
+        output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True, timeout=5).stdout
+        return int(output.strip()) * 1024 if output.strip() else None
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def slope_per_hour(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares growth of (seconds, bytes) points, in MB per hour."""
+    if len(points) < 2:
+        return None
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    spread = sum((t - mean_t) ** 2 for t, _ in points)
+    if spread == 0:
+        return None
+    slope = sum((t - mean_t) * (v - mean_v) for t, v in points) / spread
+    return slope * 3600 / MIB
+
+
+class Workload:
+    """The tool calls to send: generated over a location pool, or looped from a capture."""
+    
+    def __init__(self, locations: int, seed: int, captured: Optional[List[Dict[str, Any]]] = None):
+        """Initialize the workload; `captured` calls are replayed in order, over and over."""
+        self.random = random.Random(seed)
+        self.captured = captured
+        self.position = 0
+        
+        # One location in five is given as coordinates; popularity falls off like Zipf's law
+        self.locations = [
+            f"{self.random.uniform(-60, 70):.4f},{self.random.uniform(-180, 180):.4f}" if i % 5 == 4 else f"Soak City {i}"
+            for i in range(locations)
+        ]
+        weights = [1 / (rank + 1) ** 0.9 for rank in range(locations)]
+        self.cumulative = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self.cumulative.append(total)
+        
+        self.tools = [tool for tool, _ in TOOL_MIX]
+        self.tool_weights = [weight for _, weight in TOOL_MIX]
+    
+    def next(self) -> Tuple[str, Dict[str, Any]]:
+        """Get the tool and arguments of the next call."""
+        if self.captured:
+            record = self.captured[self.position % len(self.captured)]
+            self.position += 1
+            return record["tool"], record["arguments"]
+        
+        tool = self.random.choices(self.tools, self.tool_weights)[0]
+        location = self.random.choices(self.locations, cum_weights=self.cumulative)[0]
+        arguments: Dict[str, Any] = {"location": location}
+        if tool != "get_current_weather":
+            arguments["days"] = self.random.randint(1, 5)
+        return tool, arguments
+
+
+class Monitored:
+    """A process under test and the memory samples taken of it."""
+    
+    def __init__(self, name: str, pid: int, traced_by: str):
+        """Initialize for a process whose allocations are read over "http" or by "signal"."""
+        self.name = name
+        self.pid = pid
+        self.traced_by = traced_by
+        self.rss: List[Tuple[float, int]] = []
+        self.traced: List[Tuple[float, int]] = []
+        self.overhead: Optional[int] = None
+        self.sites: List[Tuple[float, Dict[str, int]]] = []
+        self.tools: Dict[str, Any] = {}
+
+
+class HttpEntry:
+    """Tool calls over HTTP to a server started for the soak."""
+    
+    def __init__(self, url: str, api_key: str, timeout: float):
+        """Initialize for a server at `url`."""
+        self.url = url
+        self.api_key = api_key
+        self.client = httpx.AsyncClient(base_url=url, timeout=timeout, headers={"X-API-Key": api_key})
+    
+    async def wait_ready(self, process: subprocess.Popen, timeout: float = 60) -> None:
+        """Wait until the server answers its health check."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with status {process.returncode}")
+            try:
+                if (await self.client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+        raise RuntimeError(f"Server at {self.url} did not become healthy")
+    
+    async def call(self, tool: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool and classify the outcome."""
+        response = await self.client.post(f"/tools/{tool}", json=arguments)
+        return "ok" if response.status_code == 200 else f"http {response.status_code}"
+    
+    async def allocations(self, limit: int) -> Optional[Dict[str, Any]]:
+        """Take an allocation snapshot through the debug endpoint."""
+        try:
+            response = await self.client.get("/debug/allocations", params={"limit": limit})
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError):
+            return None
+    
+    async def close(self) -> None:
+        """Close the connections to the server."""
+        await self.client.aclose()
+
+
+class StdioEntry:
+    """Tool calls as JSON-RPC over the stdin and stdout of a started process."""
+    
+    def __init__(self, command: List[str], env: Dict[str, str], stderr: Any):
+        """Initialize for a process to start with `command`."""
+        self.command = command
+        self.env = env
+        self.stderr = stderr
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.next_id = 0
+        self.reader: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+    
+    async def start(self) -> int:
+        """Start the process, run the MCP handshake and return its pid."""
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=self.stderr,
+            env=self.env,
+            cwd=PROJECT_DIR,
+            limit=16 * MIB
+        )
+        self.reader = asyncio.ensure_future(self._read())
+        await asyncio.wait_for(self.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "soak", "version": "1.0.0"}
+        }), timeout=60)
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return self.process.pid
+    
+    async def _send(self, message: Dict[str, Any]) -> None:
+        """Write one JSON-RPC message."""
+        async with self.lock:
+            self.process.stdin.write(json.dumps(message).encode("utf-8") + b"\n")
+            await self.process.stdin.drain()
+    
+    async def _read(self) -> None:
+        """Settle pending requests with the responses read from stdout."""
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            future = self.pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Process closed its output"))
+        self.pending.clear()
+    
+    async def request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and wait for its response."""
+        self.next_id += 1
+        request_id = self.next_id
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+        return await future
+    
+    async def call(self, tool: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool and classify the outcome."""
+        response = await self.request("tools/call", {"name": tool, "arguments": arguments})
+        if "error" in response:
+            return "rpc error"
+        return "tool error" if response["result"].get("isError") else "ok"
+    
+    async def close(self) -> None:
+        """Close stdin and wait for the process to exit."""
+        if self.process is None or self.process.returncode is not None:
+            return
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), timeout=15)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        if self.reader is not None:
+            self.reader.cancel()
+
+
+class Soak:
+    """Runs the load, takes the samples and builds the report."""
+    
+    def __init__(self, args: argparse.Namespace):
+        """Initialize from the command line."""
+        self.args = args
+        self.dump_dir = tempfile.mkdtemp(prefix="soak-")
+        self.logs = open(os.path.join(self.dump_dir, "processes.log"), "ab")
+        self.children: List[subprocess.Popen] = []
+        self.monitored: List[Monitored] = []
+        self.http: Optional[HttpEntry] = None
+        self.stdio: Optional[StdioEntry] = None
+        self.outcomes: Counter = Counter()
+        self.latencies: List[float] = []
+        self.started = 0.0
+    
+    def env(self) -> Dict[str, str]:
+        """Environment of the processes under test."""
+        env = dict(os.environ)
+        env.update({
+            "OPENWEATHERMAP_BASE_URL": f"http://127.0.0.1:{self.args.standin_port}/data/2.5",
+            "OPENWEATHERMAP_API_KEY": os.environ.get("OPENWEATHERMAP_API_KEY", "soak"),
+            "API_KEY": self.args.api_key,
+            "SERVER_URL": f"http://127.0.0.1:{self.args.port}",
+            "SNAPSHOT_ENABLED": "false",
+            "DEBUG_ENDPOINTS_ENABLED": "true",
+            "DEBUG_DUMP_PATH": self.dump_dir,
+            "DEBUG_SIGNAL_PROFILE_SECONDS": "0",
+            "ALLOC_TRACKING_ENABLED": "true" if self.args.tracemalloc else "false",
+            "PYTHONUNBUFFERED": "1"
+        })
+        return env
+    
+    def spawn(self, command: List[str]) -> subprocess.Popen:
+        """Start a child process with its output going to the soak log."""
+        process = subprocess.Popen(command, cwd=PROJECT_DIR, env=self.env(), stdout=self.logs, stderr=self.logs)
+        self.children.append(process)
+        return process
+    
+    async def start(self) -> None:
+        """Start the stand-in and the entry point under test."""
+        standin = [sys.executable, os.path.join(PROJECT_DIR, "scripts", "owm_standin.py"), "--synthetic", "--port", str(self.args.standin_port)]
+        if self.args.capture:
+            standin.insert(2, self.args.capture)
+        self.spawn(standin)
+        
+        if self.args.entry in ("http", "bridge"):
+            server = self.spawn([
+                sys.executable, "-m", "uvicorn", "src.app:app",
+                "--host", "127.0.0.1", "--port", str(self.args.port), "--log-level", "warning"
+            ])
+            self.http = HttpEntry(f"http://127.0.0.1:{self.args.port}", self.args.api_key, self.args.timeout)
+            await self.http.wait_ready(server)
+            self.monitored.append(Monitored("http server", server.pid, "http"))
+        
+        if self.args.entry in ("stdio", "bridge"):
+            command = [sys.executable, "-m", "src.mcp_server"] if self.args.entry == "stdio" else [sys.executable, "mcp_http_bridge.py"]
+            self.stdio = StdioEntry(command, self.env(), self.logs)
+            pid = await self.stdio.start()
+            self.monitored.append(Monitored("stdio server" if self.args.entry == "stdio" else "bridge", pid, "signal"))
+    
+    async def stop(self) -> None:
+        """Stop everything that was started."""
+        if self.stdio is not None:
+            await self.stdio.close()
+        if self.http is not None:
+            await self.http.close()
+        for process in reversed(self.children):
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        self.logs.close()
+    
+    async def one_call(self, workload: Workload, semaphore: asyncio.Semaphore) -> None:
+        """Send one call and record its outcome and latency."""
+        tool, arguments = workload.next()
+        entry = self.stdio if self.stdio is not None else self.http
+        start = time.perf_counter()
+        try:
+            outcome = await asyncio.wait_for(entry.call(tool, arguments), timeout=self.args.timeout)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+        except Exception as e:
+            outcome = f"failed ({type(e).__name__})"
+        finally:
+            semaphore.release()
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        self.outcomes[outcome] += 1
+    
+    async def drive(self, workload: Workload, deadline: float) -> None:
+        """Send calls at the configured rate, at most `concurrency` at once, until the deadline."""
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        tasks = set()
+        interval = 1 / self.args.rate
+        next_at = time.monotonic()
+        while time.monotonic() < deadline:
+            await semaphore.acquire()
+            task = asyncio.ensure_future(self.one_call(workload, semaphore))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            next_at = max(next_at + interval, time.monotonic() - 1)
+            await asyncio.sleep(max(0, next_at - time.monotonic()))
+        if tasks:
+            await asyncio.wait(tasks, timeout=self.args.timeout)
+    
+    async def signal_dump(self, pid: int) -> Optional[Dict[str, Any]]:
+        """Ask a process for a diagnostic dump with SIGUSR1 and read its allocation section."""
+        pattern = os.path.join(self.dump_dir, f"debug-{pid}-*.json")
+        before = {path: os.path.getmtime(path) for path in glob.glob(pattern)}
+        os.kill(pid, signal.SIGUSR1)
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.2)
+            for path in glob.glob(pattern):
+                if before.get(path) != os.path.getmtime(path):
+                    try:
+                        with open(path, encoding="utf-8") as f:
+                            return json.load(f).get("allocations")
+                    except ValueError:
+                        break  # Still being written
+        return None
+    
+    async def sample(self) -> None:
+        """Record the RSS and, when tracing, an allocation snapshot of every process."""
+        elapsed = time.monotonic() - self.started
+        for monitored in self.monitored:
+            rss = read_rss(monitored.pid)
+            if rss is not None:
+                monitored.rss.append((elapsed, rss))
+            if not self.args.tracemalloc:
+                continue
+            
+            if monitored.traced_by == "http":
+                snapshot = await self.http.allocations(self.args.sites)
+            else:
+                snapshot = await self.signal_dump(monitored.pid)
+            if snapshot and snapshot.get("tracing"):
+                monitored.traced.append((elapsed, snapshot["traced_bytes"]))
+                monitored.overhead = snapshot.get("overhead_bytes")
+                monitored.sites.append((elapsed, {site["site"]: site["size_bytes"] for site in snapshot["sites"]}))
+                monitored.tools = snapshot.get("tools", {})
+    
+    async def sampler(self, deadline: float) -> None:
+        """Sample every `--sample` seconds until the deadline, and once more at the end."""
+        while time.monotonic() < deadline:
+            await self.sample()
+            rss = ", ".join(f"{m.name} {m.rss[-1][1] / MIB:.1f} MB" for m in self.monitored if m.rss)
+            print(f"[{(time.monotonic() - self.started) / 60:6.1f} min] {sum(self.outcomes.values())} calls; RSS {rss}", flush=True)
+            await asyncio.sleep(min(self.args.sample, max(0, deadline - time.monotonic())))
+        await self.sample()
+    
+    async def run(self) -> Dict[str, Any]:
+        """Run the soak and return the report."""
+        captured = None
+        if self.args.capture:
+            captured = load_capture(self.args.capture, ["http", "bridge", "forwarded"], None)["calls"]
+        workload = Workload(self.args.locations, self.args.seed, captured)
+        
+        try:
+            await self.start()
+            self.started = time.monotonic()
+            deadline = self.started + self.args.duration
+            await asyncio.gather(self.drive(workload, deadline), self.sampler(deadline))
+            return self.report(time.monotonic() - self.started)
+        finally:
+            await self.stop()
+    
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize the calls and the memory of every process."""
+        warmup = elapsed * self.args.warmup
+        last_third = elapsed * 2 / 3
+        latencies = sorted(self.latencies)
+        calls = sum(self.outcomes.values())
+        report: Dict[str, Any] = {
+            "entry": self.args.entry,
+            "duration_s": round(elapsed, 1),
+            "calls": calls,
+            "calls_per_s": round(calls / max(elapsed, 1e-9), 2),
+            "outcomes": dict(self.outcomes),
+            "latency_ms": {"p50": percentile(latencies, 0.5), "p99": percentile(latencies, 0.99), "max": latencies[-1] if latencies else 0},
+            "processes": [],
+            "dumps": self.dump_dir
+        }
+        
+        for monitored in self.monitored:
+            settled = [(t, v) for t, v in monitored.rss if t >= warmup]
+            rss_growth = slope_per_hour(settled)
+            late_growth = slope_per_hour([(t, v) for t, v in monitored.rss if t >= last_third])
+            traced_growth = slope_per_hour([(t, v) for t, v in monitored.traced if t >= warmup])
+            peak = max((v for _, v in monitored.rss), default=0)
+            leak = (
+                rss_growth is not None and late_growth is not None
+                and rss_growth > self.args.leak_threshold and late_growth > self.args.leak_threshold
+            )
+            
+            projected = peak + max(rss_growth or 0, 0) * MIB * self.args.horizon
+            limit = projected * (1 + self.args.headroom)
+            report["processes"].append({
+                "name": monitored.name,
+                "pid": monitored.pid,
+                "rss_start_mb": round(monitored.rss[0][1] / MIB, 1) if monitored.rss else None,
+                "rss_end_mb": round(monitored.rss[-1][1] / MIB, 1) if monitored.rss else None,
+                "rss_peak_mb": round(peak / MIB, 1),
+                "rss_growth_mb_per_h": rss_growth,
+                "rss_growth_last_third_mb_per_h": late_growth,
+                "traced_end_mb": round(monitored.traced[-1][1] / MIB, 1) if monitored.traced else None,
+                "traced_growth_mb_per_h": traced_growth,
+                "tracemalloc_overhead_mb": round(monitored.overhead / MIB, 1) if monitored.overhead else None,
+                "leak_suspected": leak,
+                "suggested_limit_mb": int(-(-limit // (16 * MIB)) * 16),
+                "top_growing_sites": self.growing_sites(monitored, warmup, elapsed),
+                "tools": monitored.tools
+            })
+        return report
+    
+    def growing_sites(self, monitored: Monitored, warmup: float, elapsed: float) -> List[Dict[str, Any]]:
+        """The allocation sites that grew most between the first snapshot after warmup and the last."""
+        settled = [(t, sites) for t, sites in monitored.sites if t >= warmup]
+        if len(settled) < 2:
+            return []
+        (first_t, first), (last_t, last) = settled[0], settled[-1]
+        hours = max(last_t - first_t, 1e-9) / 3600
+        growth = sorted(((last.get(site, 0) - first.get(site, 0), site) for site in set(first) | set(last)), reverse=True)
+        return [
+            {"site": site, "growth_kb": round(grown / 1024, 1), "kb_per_h": round(grown / 1024 / hours, 1), "size_kb": round(last.get(site, 0) / 1024, 1)}
+            for grown, site in growth[:10] if grown > 0
+        ]
+
+
+def print_report(report: Dict[str, Any], args: argparse.Namespace) -> None:
+    """Print the report for a person."""
+    def rate(value: Optional[float]) -> str:
+        return "n/a" if value is None else f"{value:+.2f} MB/h"
+    
+    print()
+    print(
+        f"Soaked {report['entry']} for {report['duration_s'] / 60:.1f} min: {report['calls']} calls "
+        f"({report['calls_per_s']}/s), p50 {report['latency_ms']['p50']:.1f} ms, p99 {report['latency_ms']['p99']:.1f} ms"
+    )
+    print("Outcomes: " + ", ".join(f"{outcome} x {count}" for outcome, count in sorted(report["outcomes"].items())))
+    if args.tracemalloc:
+        print("Allocation tracing and its snapshots slow the server down: latencies are not representative")
+    if report["duration_s"] < SHORT_RUN:
+        print(f"Runs shorter than {SHORT_RUN // 60} min mostly measure caches filling: growth rates and limits are not meaningful")
+    
+    for process in report["processes"]:
+        print()
+        print(f"{process['name']} (pid {process['pid']})")
+        print(
+            f"  RSS {process['rss_start_mb']} -> {process['rss_end_mb']} MB, peak {process['rss_peak_mb']} MB; "
+            f"growth {rate(process['rss_growth_mb_per_h'])}, last third {rate(process['rss_growth_last_third_mb_per_h'])}"
+        )
+        if process["traced_end_mb"] is not None:
+            print(
+                f"  Traced {process['traced_end_mb']} MB, growth {rate(process['traced_growth_mb_per_h'])}; "
+                f"tracemalloc overhead {process['tracemalloc_overhead_mb']} MB"
+            )
+        if process["leak_suspected"]:
+            print(f"  LEAK SUSPECTED: RSS grows more than {args.leak_threshold} MB/h, into the last third of the run")
+        print(f"  Suggested memory limit: {process['suggested_limit_mb']} MB ({args.horizon:g}h of growth, {args.headroom:.0%} headroom)")
+        for site in process["top_growing_sites"]:
+            print(f"    +{site['growth_kb']:>9.1f} KB ({site['kb_per_h']:.1f} KB/h, now {site['size_kb']} KB)  {site['site']}")
+        for tool, counters in process["tools"].items():
+            print(f"    {tool}: {counters['calls']} calls, {counters['mean_net_bytes']} B net/call, peak {counters['max_peak_bytes'] / 1024:.0f} KB")
+    print()
+    print(f"Process output and dumps: {report['dumps']}")
+
+
+def main() -> None:
+    """Parse the command line and soak."""
+    parser = argparse.ArgumentParser(description="Soak test an entry point and report its memory growth")
+    parser.add_argument("--entry", choices=["http", "stdio", "bridge"], default="http")
+    parser.add_argument("--duration", default="1h", help="How long to run, e.g. 90s, 30m, 3h")
+    parser.add_argument("--rate", type=float, default=20, help="Calls per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="Calls in flight at most")
+    parser.add_argument("--sample", type=float, default=30, help="Seconds between memory samples")
+    parser.add_argument("--locations", type=int, default=2000, help="Generated locations to spread calls over")
+    parser.add_argument("--capture", default=None, help="Loop over the calls of a traffic capture instead")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--api-key", default=os.getenv("API_KEY"), help="API key of the server (also given to stdio entry points)")
+    parser.add_argument("--port", type=int, default=8018, help="Port of the HTTP server under test")
+    parser.add_argument("--standin-port", type=int, default=8091)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each call")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false", help="Sample RSS only, without allocation tracing")
+    parser.add_argument("--sites", type=int, default=50, help="Allocation sites per snapshot")
+    parser.add_argument("--warmup", type=float, default=0.1, help="Fraction of the run left out of growth rates")
+    parser.add_argument("--leak-threshold", type=float, default=5.0, help="Sustained RSS growth, in MB/hour, flagged as a leak")
+    parser.add_argument("--horizon", type=float, default=24.0, help="Hours of growth to allow for in the suggested limit")
+    parser.add_argument("--headroom", type=float, default=0.25, help="Fraction added on top of the suggested limit")
+    parser.add_argument("--out", default=None, help="Also write the report as JSON")
+    args = parser.parse_args()
+    
+    args.duration = parse_duration(args.duration)
+    if not args.api_key:
+        parser.error("an API key is needed: --api-key or API_KEY")
+    if args.rate <= 0 or args.concurrency <= 0:
+        parser.error("--rate and --concurrency must be positive")
+    
+    report = asyncio.run(Soak(args).run())
+    print_report(report, args)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,23 @@
 
 echo "🛑 Stopping MCP Server..."
 
-# Kill processes on port 8008
+# Ask processes on port 8008 to shut down gracefully, so they save their cache snapshot
 echo "🧹 Terminating server processes..."
+lsof -ti:8008 | xargs kill -TERM 2>/dev/null || true
+
+# Production workers finish their in-flight requests first (SERVER_GRACEFUL_TIMEOUT)
+deadline=$((SECONDS + ${SERVER_GRACEFUL_TIMEOUT:-30} + 5))
+while [ $SECONDS -lt $deadline ]; do
+    lsof -ti:8008 >/dev/null 2>&1 || break
+    sleep 0.5
+done
+
+# Force-kill anything still running
 lsof -ti:8008 | xargs kill -9 2>/dev/null || true
 
 # Also clean up any python processes running our server
 pkill -f "python.*run.py" 2>/dev/null || true
 pkill -f "uvicorn.*src.app:app" 2>/dev/null || true
+pkill -f "python.*-m src.serve" 2>/dev/null || true
 
 echo "✅ Server stopped"
\ No newline at end of file
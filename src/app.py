@@ -1,13 +1,38 @@
 """FastAPI application for MCP server."""
 
 from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, List, Literal, Optional
+import asyncio
+import contextlib
+import hashlib
 import logging
+import time
 
-from .utils.config import load_environment, setup_logging
+from .utils.config import get_catalog_config, get_snapshot_config, load_environment, setup_logging
 from .utils.client_loader import load_all_clients
 from .middleware.auth import validate_client_request
+from .core.admission import AdmissionRejected, get_admission_controller
+from .core.capture import get_traffic_capture
+from .core.catalog import CATALOG_CLIENT_NAME, CatalogClient, describe_matches
+from .core.diagnostics import Diagnostics, ProfilerBusyError, get_diagnostics
+from .core.executor import get_tool_executor, shutdown_tool_executor
+from .core.negotiation import get_response_encoder
+from .core.registry import ClientRegistry, InvalidCursorError
+from .core.sharding import FORWARDED_HEADER, get_shard_router
+from .core.snapshot import create_snapshot_manager
+from .core.tool_cache import get_tool_cache
+from .core.validation import ToolArgumentError
+from .types.common import ToolCallResponse, ToolDefinition, ToolInfo, ToolListResponse, ToolResult, ToolSearchResponse
+from .utils.codecs import negotiate_media_type
+from .utils.serialization import FastJSONResponse, dumps
+
+try:
+    from .mcp_http import MCPHttpTransport
+except ImportError:  # The mcp package requires Python 3.10+
+    MCPHttpTransport = None
 
 # Initialize logging
 setup_logging()
@@ -17,28 +42,92 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="MCP Server",
     description="Modular MCP server with FastAPI supporting multiple clients",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
-# Global clients storage
-clients: Dict[str, Any] = {}
+# Global clients storage, shared with the MCP Streamable HTTP transport
+registry = ClientRegistry()
+clients = registry.clients
+
+# MCP Streamable HTTP transport, created on first startup
+mcp_transport: Optional[Any] = None
+
+# Warm-cache snapshots, restored on startup and saved periodically and on shutdown
+snapshots: Optional[Any] = None
+
+# Media types that switch tool execution to a streamed response
+STREAM_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize clients on startup."""
+    global snapshots
     logger.info("Starting MCP Server...")
     
     # Load environment
     load_environment()
     
+    # Track task ages and event-loop lag from the start, for the debug endpoints
+    diagnostics = get_diagnostics()
+    if diagnostics.enabled:
+        diagnostics.start()
+    
     # Load all clients dynamically
     loaded_clients = load_all_clients(app)
-    clients.update(loaded_clients)
+    registry.update(loaded_clients)
+    registry.update({CATALOG_CLIENT_NAME: CatalogClient(registry)})
+    
+    # Warm the caches from the previous run before background work starts
+    snapshots = create_snapshot_manager(registry, get_snapshot_config())
+    if snapshots:
+        snapshots.load()
+        snapshots.start()
+    
+    await registry.start_all()
+    
+    # Serve native MCP over Streamable HTTP from the same registry
+    await start_mcp_transport()
     
     logger.info("Server startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close MCP sessions, stop clients and save a final snapshot on shutdown."""
+    if mcp_transport:
+        await mcp_transport.stop()
+    
+    await registry.close_all()
+    
+    if snapshots:
+        await snapshots.stop()
+    
+    router = get_shard_router()
+    if router is not None:
+        await router.close()
+    
+    await shutdown_tool_executor()
+    get_traffic_capture().close()
+    get_diagnostics().stop()
+
+
+async def start_mcp_transport() -> None:
+    """Start the MCP Streamable HTTP endpoint at /mcp, if the mcp package is available."""
+    global mcp_transport
+    
+    if MCPHttpTransport is None:
+        logger.info("mcp package not available - /mcp endpoint disabled")
+        return
+    
+    if mcp_transport is None:
+        mcp_transport = MCPHttpTransport(registry)
+        app.add_route("/mcp", mcp_transport, methods=["GET", "POST", "DELETE"], include_in_schema=False)
+    
+    await mcp_transport.start()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -58,48 +147,391 @@ async def health_check():
     }
 
 
-@app.get("/tools")
-async def list_tools():
-    """List all available tools."""
-    all_tools = []
+@app.get("/metrics")
+async def metrics(client_name: str = Depends(validate_client_request)):
+    """Admission, tool executor and tool cache metrics (queue depths, shed counts, queue times, slow callbacks, hits), response encoding, traffic capture, event-loop lag and isolated plugin workers."""
+    router = get_shard_router()
+    diagnostics = get_diagnostics()
+    return FastJSONResponse({
+        "admission": get_admission_controller().stats(),
+        "executor": get_tool_executor().stats(),
+        "tool_cache": get_tool_cache().stats(),
+        "responses": get_response_encoder().stats(),
+        "cluster": router.stats() if router is not None else None,
+        "capture": get_traffic_capture().stats(),
+        "loop_lag": diagnostics.lag.stats() if diagnostics.enabled else None,
+        "plugins": {name: client.worker_stats() for name, client in clients.items() if hasattr(client, "worker_stats")}
+    })
+
+
+def _enabled_diagnostics() -> Diagnostics:
+    """Get the process diagnostics, or 404 when the debug endpoints are disabled."""
+    diagnostics = get_diagnostics()
+    if not diagnostics.enabled:
+        raise HTTPException(status_code=404, detail="Debug endpoints are disabled")
+    return diagnostics
+
+
+async def validate_debug_request(request: Request) -> str:
+    """Authenticate a debug endpoint request; with DEBUG_API_KEYS set, only those keys are accepted."""
+    client_name = await validate_client_request(request)
+    api_keys = get_diagnostics().api_keys
+    if api_keys and request.state.api_key not in api_keys:
+        logger.warning(f"Client '{client_name}' denied access to {request.url.path}")
+        raise HTTPException(status_code=403, detail="This API key may not use the debug endpoints")
+    return client_name
+
+
+@app.get("/debug/profile")
+async def debug_profile(
+    seconds: float = 10,
+    interval_ms: Optional[float] = None,
+    threads: Literal["loop", "all"] = "loop",
+    client_name: str = Depends(validate_debug_request)
+):
+    """
+    Sample the running server's stacks for some seconds and return them as collapsed stacks.
+    
+    Each line is `outer;inner;leaf count`, ready for flamegraph.pl or
+    speedscope. `threads=loop` samples the event loop thread, `all` every
+    thread (stacks then start with the thread name). Sampling runs in a
+    background thread; one profile runs at a time.
+    """
+    diagnostics = _enabled_diagnostics()
+    if seconds <= 0:
+        raise HTTPException(status_code=422, detail="seconds must be positive")
+    
+    logger.info(f"Client '{client_name}' profiling {threads} threads for {seconds}s")
+    try:
+        collapsed, samples = await diagnostics.profiler.profile_async(
+            seconds,
+            interval=interval_ms / 1000 if interval_ms else None,
+            thread_ids=[diagnostics.loop_thread] if threads == "loop" else None
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return Response(content=collapsed, media_type="text/plain", headers={"X-Profile-Samples": str(samples)})
+
+
+@app.get("/debug/tasks")
+async def debug_tasks(limit: int = 100, depth: int = 10, client_name: str = Depends(validate_debug_request)):
+    """List the pending asyncio tasks, oldest first, with their age and the coroutines they are suspended in."""
+    diagnostics = _enabled_diagnostics()
+    return FastJSONResponse(diagnostics.tasks.dump(asyncio.get_running_loop(), limit=max(limit, 0), stack_depth=max(depth, 0)))
+
+
+@app.get("/debug/loop-lag")
+async def debug_loop_lag(client_name: str = Depends(validate_debug_request)):
+    """Event-loop lag percentiles over the recent window, in milliseconds."""
+    return FastJSONResponse(_enabled_diagnostics().lag.stats())
+
+
+@app.get("/debug/allocations")
+async def debug_allocations(
+    limit: int = 20,
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    client_name: str = Depends(validate_debug_request)
+):
+    """
+    The allocation sites holding the most memory and the per-tool allocation counters.
+    
+    Site growth is relative to the previous call of this endpoint, so
+    polling it shows which sites keep growing. Needs allocation tracing,
+    enabled with ALLOC_TRACKING_ENABLED or POST /debug/allocations. The
+    snapshot is taken in a thread, as it takes a while with many traces.
+    """
+    allocations = _enabled_diagnostics().allocations
+    sites = await asyncio.to_thread(allocations.top_sites, max(limit, 0), group_by)
+    return FastJSONResponse({
+        **sites,
+        "tools": allocations.stats()["tools"]
+    })
+
+
+@app.post("/debug/allocations")
+async def debug_allocations_tracing(enabled: bool, client_name: str = Depends(validate_debug_request)):
+    """Start or stop allocation tracing; tracing slows the server down while it is on."""
+    allocations = _enabled_diagnostics().allocations
+    if enabled:
+        allocations.start()
+    else:
+        allocations.stop()
+    logger.info(f"Client '{client_name}' turned allocation tracing {'on' if enabled else 'off'}")
+    return FastJSONResponse(allocations.stats())
+
+
+@app.get("/tools", response_model=ToolListResponse)
+async def list_tools(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    client: Optional[str] = None,
+    prefix: Optional[str] = None,
+    fields: Literal["names", "summary", "full"] = "full"
+):
+    """
+    List the available tools, ordered by name.
+    
+    Pass `limit` to page through the tools, following `next_cursor` until it
+    is null; without it every tool is returned. `client` and `prefix` filter
+    by client name and tool name prefix. `fields` selects `names` (name and
+    client only), `summary` (plus description) or `full` (plus input schema).
+    
+    The response is JSON, or MessagePack or CBOR per `Accept`, and is
+    compressed per `Accept-Encoding` when it is large.
+    """
+    if limit is not None:
+        if limit < 1:
+            raise HTTPException(status_code=422, detail="limit must be at least 1")
+        limit = min(limit, get_catalog_config()["max_page_size"])
+    
+    try:
+        page, next_cursor = registry.list_tools(cursor=cursor, limit=limit, client=client, prefix=prefix)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    for client_name, client in clients.items():
-        if client.is_enabled:
-            for tool in client.get_tools():
-                all_tools.append({
-                    "name": tool.name,
-                    "description": tool.description,
-                    "client": client_name,
-                    "input_schema": tool.inputSchema
-                })
+    return get_response_encoder().response(request, {
+        "tools": [_tool_info(client_name, tool, fields) for client_name, tool in page],
+        "next_cursor": next_cursor
+    }, key=("tools", registry.version, cursor, limit, client, prefix, fields))
+
+
+@app.get("/search/tools", response_model=ToolSearchResponse)
+async def search_tools(
+    q: str,
+    limit: int = 10,
+    client: Optional[str] = None,
+    fields: Literal["names", "summary", "full"] = "summary"
+):
+    """Find the tools that best match a free-text query, best match first."""
+    if limit < 1:
+        raise HTTPException(status_code=422, detail="limit must be at least 1")
+    
+    matches = registry.search_tools(q, limit=min(limit, get_catalog_config()["max_page_size"]), client=client)
+    return FastJSONResponse({"query": q, "tools": describe_matches(matches, fields)})
+
+
+@app.get("/tools/{tool_name}", response_model=ToolInfo)
+async def get_tool(tool_name: str, request: Request):
+    """Get one tool with its input schema, encoded like `/tools`."""
+    found = registry.find_tool(tool_name)
+    if found is None:
+        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
     
-    return {"tools": all_tools}
+    client_name, tool = found
+    return get_response_encoder().response(request, _tool_info(client_name, tool, "full"), key=("tool", registry.version, tool_name))
 
 
-@app.post("/tools/{tool_name}")
-async def execute_tool(tool_name: str, arguments: Dict[str, Any], client_name: str = Depends(validate_client_request)):
-    """Execute a specific tool."""
+def _tool_info(client_name: str, tool: ToolDefinition, fields: str) -> Dict[str, Any]:
+    """Describe a tool for the HTTP API with the requested fields."""
+    info: Dict[str, Any] = {"name": tool.name, "client": client_name}
+    if fields != "names":
+        info["description"] = tool.description
+    if fields == "full":
+        info["input_schema"] = tool.inputSchema
+    return info
+
+
+@app.post("/tools/{tool_name}", response_model=ToolCallResponse)
+async def execute_tool(tool_name: str, arguments: Dict[str, Any], request: Request, client_name: str = Depends(validate_client_request)):
+    """
+    Execute a specific tool.
+    
+    Send `Accept: application/x-ndjson` or `Accept: text/event-stream` to
+    receive partial results as they are produced instead of a single response.
+    Otherwise the response is JSON, or MessagePack or CBOR when `Accept`
+    asks for them, compressed with zstd or gzip per `Accept-Encoding` when
+    it is large; errors are always JSON.
+    """
+    capture = get_traffic_capture()
+    if not capture.enabled:
+        return await _execute_tool(tool_name, arguments, request, client_name)
+    
+    # Record the call as received, with its outcome, for replay
+    started = time.time()
+    start = time.perf_counter()
+    status = 500
+    size = None
+    try:
+        response = await _execute_tool(tool_name, arguments, request, client_name)
+        status = response.status_code
+        if not isinstance(response, StreamingResponse):
+            size = len(response.body)
+        return response
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    finally:
+        capture.record_call(
+            "forwarded" if FORWARDED_HEADER in request.headers else "http",
+            client_name,
+            tool_name,
+            arguments,
+            started,
+            time.perf_counter() - start,
+            status,
+            size,
+            cache=getattr(request.state, "tool_cache", None)
+        )
+
+
+async def _execute_tool(tool_name: str, arguments: Dict[str, Any], request: Request, client_name: str) -> Response:
+    """Execute a tool for an authenticated client and build the response."""
     logger.info(f"Client '{client_name}' executing tool: {tool_name} with arguments: {arguments}")
     
     # Find the client that has this tool
-    for client in clients.values():
-        if client.has_tool(tool_name):
-            try:
-                result = await client.execute_tool(tool_name, arguments)
-                
-                if result.isError:
-                    raise HTTPException(status_code=400, detail=result.content[0]["text"])
-                
-                return {
-                    "tool": tool_name,
-                    "result": result.content[0]["text"] if result.content else "No result"
-                }
-                
-            except Exception as e:
-                logger.error(f"Error executing tool {tool_name}: {e}")
-                raise HTTPException(status_code=500, detail=str(e))
-    
-    raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    client = registry.find_client(tool_name)
+    if client is None:
+        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    
+    # Reject invalid arguments before they reach the client (and its upstream)
+    try:
+        arguments = client.validate_arguments(tool_name, arguments)
+    except ToolArgumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # Tools with a cache policy answer repeated calls without running (or queueing)
+    tool = client.get_tool(tool_name)
+    tool_cache = get_tool_cache()
+    cache_key = tool_cache.key(tool, arguments, client_name)
+    cached = tool_cache.get(cache_key)
+    
+    media_type = _negotiate_stream_media_type(request)
+    if cached is not None:
+        request.state.tool_cache = "hit"
+        if media_type:
+            return StreamingResponse(
+                _stream_tool_events(_single_result(cached), tool_name, media_type, lambda: None),
+                media_type=media_type,
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+        if cached.isError:
+            raise HTTPException(status_code=400, detail=cached.content[0]["text"])
+        return _result_response(request, tool_name, cached.text, cached=True)
+    
+    # In a sharded cluster, the node that owns the call's key serves it from its caches
+    router = get_shard_router()
+    local_load: Any = contextlib.nullcontext()
+    if router is not None and not media_type and FORWARDED_HEADER not in request.headers:
+        shard_key = await client.route_key(tool_name, arguments) or cache_key
+        if shard_key is not None:
+            node = router.choose(shard_key)
+            if node != router.self_url:
+                response = await router.forward(
+                    node,
+                    tool_name,
+                    arguments,
+                    request.headers.get("X-API-Key"),
+                    accept=negotiate_media_type(request.headers.get("accept"))
+                )
+                if response is not None:
+                    return get_response_encoder().relay(
+                        request,
+                        response.content,
+                        response.headers.get("content-type"),
+                        response.status_code,
+                        headers={"X-MCP-Served-By": node}
+                    )
+            local_load = router.track(router.self_url)
+    
+    # Shed load with a fast 503 rather than queueing without limit
+    try:
+        ticket = await get_admission_controller().acquire(tool)
+    except AdmissionRejected as e:
+        logger.warning(f"Shed call to {tool_name} from client '{client_name}': {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    
+    if media_type:
+        # The stream holds its slots until it ends; the background task covers streams that never start
+        return StreamingResponse(
+            _stream_tool_events(client.run_tool_stream(tool_name, arguments), tool_name, media_type, ticket.release),
+            media_type=media_type,
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(ticket.release)
+        )
+    
+    try:
+        with local_load:
+            result = await tool_cache.run(cache_key, tool, lambda: client.run_tool(tool_name, arguments))
+        
+        if result.isError:
+            raise HTTPException(status_code=400, detail=result.content[0]["text"])
+        
+        return _result_response(request, tool_name, result.text, cached=tool.cache is not None)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error executing tool {tool_name}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ticket.release()
+
+
+def _result_response(request: Request, tool_name: str, text: str, cached: bool) -> Response:
+    """Encode a tool result as negotiated, reusing the encoded forms of results the tool cache keeps."""
+    content = {"tool": tool_name, "result": text}
+    # Key on a digest so the LRU does not keep a second copy of every cached result
+    key = ("result", tool_name, hashlib.blake2b(text.encode(), digest_size=16).digest()) if cached else None
+    return get_response_encoder().response(request, content, key=key)
+
+
+def _negotiate_stream_media_type(request: Request) -> Optional[str]:
+    """Return the streaming media type requested via the Accept header, if any."""
+    accept = request.headers.get("accept", "")
+    for media_type in STREAM_MEDIA_TYPES:
+        if media_type in accept:
+            return media_type
+    return None
+
+
+def _format_stream_event(event: str, payload: Dict[str, Any], media_type: str) -> bytes:
+    """Encode one stream event as an NDJSON line or an SSE frame."""
+    if media_type == "text/event-stream":
+        return b"event: " + event.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+    return dumps({"event": event, **payload}) + b"\n"
+
+
+async def _single_result(result: ToolResult) -> AsyncIterator[ToolResult]:
+    """Yield a complete result as a one-chunk stream."""
+    yield result
+
+
+async def _stream_tool_events(
+    partials: AsyncIterator[ToolResult],
+    tool_name: str,
+    media_type: str,
+    on_finish: Callable[[], None]
+) -> AsyncIterator[bytes]:
+    """
+    Stream a tool execution as `chunk` events followed by `done` or `error`.
+    
+    `partials` yields the partial results of the tool. Each chunk carries one
+    content item; concatenating the text of all chunks gives the same result
+    as the non-streamed endpoint. `on_finish` is called when the stream ends,
+    however it ends.
+    """
+    chunks = 0
+    try:
+        async for partial in partials:
+            if partial.isError:
+                detail = partial.content[0]["text"] if partial.content else "Tool execution failed"
+                yield _format_stream_event("error", {"tool": tool_name, "detail": detail}, media_type)
+                return
+            
+            for item in partial.content:
+                chunks += 1
+                yield _format_stream_event("chunk", {"tool": tool_name, "content": item}, media_type)
+    
+    except Exception as e:
+        logger.error(f"Error streaming tool {tool_name}: {e}")
+        yield _format_stream_event("error", {"tool": tool_name, "detail": str(e)}, media_type)
+        return
+    finally:
+        on_finish()
+    
+    yield _format_stream_event("done", {"tool": tool_name, "chunks": chunks}, media_type)
 
 
 if __name__ == "__main__":
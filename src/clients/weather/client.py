@@ -1,12 +1,47 @@
 """Weather client implementation using OpenWeatherMap API."""
 
+import asyncio
 import httpx
-from typing import Any, Dict, List, Optional
+import json
+import math
+import time
+import urllib.parse
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 import logging
 
 from ...core.base_client import BaseClient
+from ...core.cache import ResultCache, create_cache
+from ...core.capture import get_traffic_capture
 from ...types.common import ToolDefinition, ToolResult, ClientConfig
-from .types import WeatherConfig, WeatherData, WeatherForecast
+from ...utils.config import get_cache_config
+from .history import FORECAST, OBSERVED, HistoryStore
+from .locations import CoordinateGrid, LocationIndex, normalize_location, parse_coordinates
+from .prefetch import WeatherPrefetcher
+from .projection import WeatherRecord, decode_response, dump_record, restore_record
+from .types import CurrentWeather, ForecastItem, WeatherConfig, WeatherForecast
+
+
+# Upstream statuses that are deterministic for a given location and worth remembering
+NEGATIVE_CACHE_STATUSES = (400, 404)
+
+# Fixed upstream parameters per endpoint. Temperatures are always Celsius, and
+# forecasts always cover the full 5 days (8 forecasts per day, every 3 hours)
+# so one cached response serves every `days` value
+ENDPOINT_PARAMS = {
+    "weather": {"units": "metric"},
+    "forecast": {"units": "metric", "cnt": 40}
+}
+
+# Sections of get_weather_overview, in the order they are rendered
+OVERVIEW_SECTIONS = ("current", "forecast", "history")
+
+# Current weather resources, e.g. weather://current/London%2CUK
+CURRENT_RESOURCE_PREFIX = "weather://current/"
+
+
+class WeatherLookupError(Exception):
+    """Raised when OpenWeatherMap rejects a location."""
+    pass
 
 
 class WeatherClient(BaseClient):
@@ -28,9 +63,120 @@ class WeatherClient(BaseClient):
         self.api_key = weather_config.api_key
         self.base_url = weather_config.base_url
         self.geo_url = weather_config.geo_url
+        self.current_ttl = weather_config.current_ttl
+        self.forecast_ttl = weather_config.forecast_ttl
+        
+        # Upstream responses, shared across workers when the backend allows it
+        cache_config = get_cache_config()
+        self.cache: ResultCache = create_cache("weather", cache_config)
+        
+        # Rejected locations, remembered briefly in a separately bounded cache (its own
+        # namespace, so with a shared SQLite backend its bound never evicts responses)
+        self.negative_ttl = weather_config.negative_ttl
+        self.negative_cache: ResultCache = create_cache("weather-negative", {
+            **cache_config,
+            "max_entries": weather_config.negative_max_entries,
+            "max_bytes": weather_config.negative_max_entries * 512
+        })
+        
+        # Locations that resolved, for "did you mean" suggestions and grid keying
+        self.locations = LocationIndex()
+        
+        # Nearby coordinates share cache entries through grid cells
+        self.grid = CoordinateGrid(
+            mode=weather_config.grid_mode,
+            step=weather_config.grid_step,
+            precision=weather_config.geohash_precision
+        )
+        
+        # Keeps the most requested locations warm in the cache
+        self.prefetcher = WeatherPrefetcher(
+            self,
+            enabled=weather_config.prefetch_enabled,
+            top_k=weather_config.prefetch_top_k,
+            interval=weather_config.prefetch_interval,
+            refresh_ahead=weather_config.prefetch_ahead,
+            budget_per_minute=weather_config.prefetch_budget,
+            sketch_size=weather_config.prefetch_sketch_size
+        )
+        
+        # Every reading fetched from upstream, for history queries
+        self.history_retention = weather_config.history_retention_days * 86400
+        self.history = HistoryStore(
+            weather_config.history_path,
+            retention=self.history_retention,
+            compact_interval=weather_config.history_compact_interval,
+            enabled=weather_config.history_enabled
+        )
+        
+        # Upstream connections are pooled and kept alive across requests
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """Get the upstream HTTP client of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.is_closed or self._http_loop is not loop:
+            self._http = httpx.AsyncClient()
+            self._http_loop = loop
+        return self._http
+    
+    async def start(self) -> None:
+        """Start the background prefetcher and history compaction."""
+        self.prefetcher.start()
+        self.history.start()
+    
+    async def close(self) -> None:
+        """Stop the background prefetcher and history compaction, and close upstream connections."""
+        await self.prefetcher.stop()
+        await self.history.stop()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def snapshot(self) -> Dict[str, Iterable[Tuple[str, Any, float]]]:
+        """Get the caches, geocoded locations and popularity counts to keep across restarts."""
+        return {
+            "cache": ((key, dump_record(value), expires_at) for key, value, expires_at in self.cache.dump()),
+            "negative": self.negative_cache.dump(),
+            "locations": self.locations.dump(),
+            "popularity": self.prefetcher.dump()
+        }
+    
+    def restore(self, section: str, records: Iterable[Tuple[str, Any, float]]) -> int:
+        """Restore a section of a previous run's snapshot."""
+        restorers = {
+            "cache": lambda key, value, expires_at: self.cache.restore(key, restore_record(key.split(":", 1)[0], value), expires_at),
+            "negative": self.negative_cache.restore,
+            "locations": lambda key, value, expires_at: self.locations.restore(key, value),
+            "popularity": lambda key, value, expires_at: self.prefetcher.restore(key, value)
+        }
+        restore = restorers.get(section)
+        if restore is None:
+            return 0
+        
+        restored = 0
+        for key, value, expires_at in records:
+            restore(key, value, expires_at)
+            restored += 1
+        return restored
+    
+    def shard_key(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Shard by location, so every tool for a place is served from one node's caches."""
+        location = arguments.get("location")
+        if not location:
+            return None
+        
+        coordinates = parse_coordinates(location)
+        if coordinates:
+            return f"weather:cell:{self.grid.snap(*coordinates)['cell']}"
+        return f"weather:q:{normalize_location(location)}"
     
     def _initialize_tools(self) -> None:
         """Initialize weather-specific tools."""
+        # No CachePolicy: the client caches upstream responses per place and grid
+        # cell, which also serves aliases and nearby points that a result cache
+        # keyed by arguments would miss, and history results change with every fetch
         self.register_tool(ToolDefinition(
             name="get_current_weather",
             description="Get current weather conditions for a specific location (temperature in Celsius)",
@@ -39,6 +185,7 @@ class WeatherClient(BaseClient):
                 "properties": {
                     "location": {
                         "type": "string",
+                        "minLength": 1,
                         "description": "The location to get weather for (city name, city,country, or coordinates)"
                     },
                     "units": {
@@ -60,6 +207,7 @@ class WeatherClient(BaseClient):
                 "properties": {
                     "location": {
                         "type": "string",
+                        "minLength": 1,
                         "description": "The location to get forecast for"
                     },
                     "days": {
@@ -80,6 +228,91 @@ class WeatherClient(BaseClient):
             }
         ))
         
+        self.register_tool(ToolDefinition(
+            name="get_weather_history",
+            description="Summarize the weather recorded for a location over the last hours or days (temperature in Celsius), from locally stored readings without contacting the weather service",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "minLength": 1,
+                        "description": "A location whose weather was fetched before (city name, city,country, or coordinates)"
+                    },
+                    "hours": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": 8760,
+                        "default": 24,
+                        "description": "How many hours back to look (e.g. 168 for a week)"
+                    },
+                    "bucket": {
+                        "type": "string",
+                        "enum": ["none", "hour", "day"],
+                        "default": "none",
+                        "description": "Also break the summary down per hour or per day (UTC)"
+                    },
+                    "include_forecasts": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Use earlier forecasts for the period instead of observed conditions, which are only recorded when current weather is requested"
+                    }
+                },
+                "required": ["location"]
+            }
+        ))
+        
+        self.register_tool(ToolDefinition(
+            name="get_weather_overview",
+            description="Get current conditions and a daily forecast for a location in one call (temperature in Celsius)",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "minLength": 1,
+                        "description": "The location to get weather for (city name, city,country, or coordinates)"
+                    },
+                    "include": {
+                        "type": "array",
+                        "items": {"type": "string", "enum": list(OVERVIEW_SECTIONS)},
+                        "default": ["current", "forecast"],
+                        "description": "Sections to include: current conditions, a daily forecast and/or a summary of the last 24 hours of recorded history"
+                    },
+                    "days": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": 5,
+                        "default": 3,
+                        "description": "Number of forecast days (1-5)"
+                    }
+                },
+                "required": ["location"]
+            }
+        ))
+    
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        """Get the subscribable current weather resource."""
+        return [{
+            "uriTemplate": f"{CURRENT_RESOURCE_PREFIX}{{location}}",
+            "name": "Current weather",
+            "description": "Current weather conditions for a location (URL-encoded, as accepted by get_current_weather); subscribe to be notified when they change",
+            "mimeType": "text/plain"
+        }]
+    
+    async def read_resource(self, uri: str) -> Optional[str]:
+        """Read `weather://current/{location}` through the same caches as get_current_weather."""
+        if not uri.startswith(CURRENT_RESOURCE_PREFIX):
+            return None
+        
+        location = urllib.parse.unquote(uri[len(CURRENT_RESOURCE_PREFIX):]).strip()
+        if not location:
+            raise ValueError(f"No location in resource URI: {uri}")
+        
+        result = await self.run_tool("get_current_weather", {"location": location, "units": "metric"})
+        if result.isError:
+            raise ValueError(result.content[0]["text"])
+        return result.content[0]["text"]
     
     def get_help_text(self) -> str:
         """Get help text for weather tools."""
@@ -96,9 +329,20 @@ Available Tools:
    - Same location options as current weather
    - Temperature always in Celsius
 
+3. get_weather_history(location, hours=24, bucket=none, include_forecasts=false)
+   - Summarize the weather recorded over the last hours or days
+   - Answered from readings stored locally when weather was fetched
+   - Bucket: none, hour or day
+
+4. get_weather_overview(location, include=[current, forecast], days=3)
+   - Current conditions and a one-line-per-day forecast in one call
+   - Sections: current, forecast and history (last 24 hours)
+
 Examples:
 - get_current_weather("New York")
 - get_weather_forecast("London,UK", 5)
+- get_weather_history("London,UK", 168, "day")
+- get_weather_overview("Paris", ["current", "forecast"], 2)
 
 All weather data is provided by OpenWeatherMap."""
     
@@ -109,6 +353,10 @@ All weather data is provided by OpenWeatherMap."""
                 return await self._get_current_weather(arguments)
             elif tool_name == "get_weather_forecast":
                 return await self._get_weather_forecast(arguments)
+            elif tool_name == "get_weather_history":
+                return await self._get_weather_history(arguments)
+            elif tool_name == "get_weather_overview":
+                return await self._get_weather_overview(arguments)
             else:
                 return ToolResult(
                     content=[{"type": "text", "text": f"Unknown tool: {tool_name}"}],
@@ -121,39 +369,46 @@ All weather data is provided by OpenWeatherMap."""
                 isError=True
             )
     
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """Execute a weather tool, streaming the forecast one day at a time."""
+        if tool_name != "get_weather_forecast":
+            async for chunk in super().stream_tool(tool_name, arguments):
+                yield chunk
+            return
+        
+        try:
+            async for text in self._render_weather_forecast(arguments):
+                yield ToolResult(content=[{"type": "text", "text": text}])
+        except Exception as e:
+            self.logger.error(f"Error streaming tool {tool_name}: {e}")
+            yield ToolResult(
+                content=[{"type": "text", "text": f"Error: {str(e)}"}],
+                isError=True
+            )
+    
     async def _get_current_weather(self, arguments: Dict[str, Any]) -> ToolResult:
         """Get current weather for a location."""
         location = arguments["location"]
-        units = "metric"  # Always use Celsius
         
-        url = f"{self.base_url}/weather"
-        params = {
-            "q": location,
-            "appid": self.api_key,
-            "units": units
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            self.logger.info(f"Current weather API response for {location}: {data}")
-        
-        weather_data = WeatherData(
-            location=f"{data['name']}, {data['sys']['country']}",
-            temperature=data["main"]["temp"],
-            description=data["weather"][0]["description"].title(),
-            humidity=data["main"].get("humidity"),
-            wind_speed=data.get("wind", {}).get("speed"),
-            pressure=data["main"].get("pressure"),
-            visibility=data.get("visibility")
-        )
+        data, snap = await self._load("weather", location)
+        self.prefetcher.record_current(location)
         
+        return ToolResult(content=[{"type": "text", "text": self._render_current(data, snap)}])
+    
+    def _render_current(self, data: CurrentWeather, snap: Optional[Dict[str, Any]]) -> str:
+        """Render current conditions."""
+        result_text = f"Current weather in {data.name}, {data.country}:\n"
+        if snap:
+            result_text += self._describe_snap(snap)
+        return result_text + self._describe_conditions(data)
+    
+    @staticmethod
+    def _describe_conditions(weather_data: CurrentWeather) -> str:
+        """Describe the temperature, condition, humidity, wind and pressure of current conditions."""
         unit_symbol = "°C"  # Always Celsius
         
-        result_text = f"Current weather in {weather_data.location}:\n"
-        result_text += f"Temperature: {weather_data.temperature}{unit_symbol}\n"
-        result_text += f"Condition: {weather_data.description}\n"
+        result_text = f"Temperature: {weather_data.temperature}{unit_symbol}\n"
+        result_text += f"Condition: {weather_data.description.title()}\n"
         if weather_data.humidity:
             result_text += f"Humidity: {weather_data.humidity}%\n"
         if weather_data.wind_speed:
@@ -161,47 +416,422 @@ All weather data is provided by OpenWeatherMap."""
         if weather_data.pressure:
             result_text += f"Pressure: {weather_data.pressure} hPa\n"
         
+        return result_text
+    
+    async def _get_weather_overview(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Get current conditions, a daily forecast and recent history for a location at once."""
+        location = arguments["location"]
+        days = arguments.get("days", 3)
+        include = [section for section in OVERVIEW_SECTIONS if section in arguments.get("include", ["current", "forecast"])]
+        if not include:
+            return ToolResult(content=[{"type": "text", "text": f"Include at least one of: {', '.join(OVERVIEW_SECTIONS)}"}], isError=True)
+        
+        # Resolve the location once, then fetch both endpoints concurrently
+        resolved = self._location_params(location)
+        endpoints = [endpoint for section, endpoint in (("current", "weather"), ("forecast", "forecast")) if section in include]
+        loaded = await asyncio.gather(
+            *(self._load(endpoint, location, resolved=resolved) for endpoint in endpoints),
+            return_exceptions=True
+        )
+        results = dict(zip(endpoints, loaded))
+        
+        # One failed section is reported in place; a location both endpoints reject is an error
+        for result in loaded:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        if loaded and all(isinstance(result, Exception) for result in loaded):
+            raise loaded[0]
+        
+        if "weather" in endpoints:
+            self.prefetcher.record_current(location)
+        if "forecast" in endpoints:
+            self.prefetcher.record(location)
+        
+        current = results.get("weather")
+        forecast = results.get("forecast")
+        snap = resolved[2]
+        if isinstance(current, tuple):
+            name = f"{current[0].name}, {current[0].country}"
+        elif isinstance(forecast, tuple):
+            name = f"{forecast[0].name}, {forecast[0].country}"
+        else:
+            name = self._history_location(location)[1]
+        
+        result_text = f"Weather overview for {name}:\n"
+        if snap:
+            result_text += self._describe_snap(snap)
+        
+        if current is not None:
+            result_text += "\nNow:\n"
+            if isinstance(current, tuple):
+                result_text += self._describe_conditions(current[0])
+            else:
+                result_text += f"Unavailable ({current})\n"
+        
+        if forecast is not None:
+            result_text += f"\nNext {days} day{'s' if days != 1 else ''}:\n"
+            if isinstance(forecast, tuple):
+                result_text += self._render_daily_forecast(forecast[0], days)
+            else:
+                result_text += f"Unavailable ({forecast})\n"
+        
+        if "history" in include:
+            result_text += "\nLast 24 hours:\n"
+            if self.history.enabled:
+                end = time.time()
+                summary, _ = await self.history.summarize_async(self._history_location(location)[0], end - 86400, end)
+                result_text += self._describe_history(summary) if summary else "No readings recorded\n"
+            else:
+                result_text += "History is disabled\n"
+        
         return ToolResult(content=[{"type": "text", "text": result_text}])
     
+    @staticmethod
+    def _render_daily_forecast(data: WeatherForecast, days: int) -> str:
+        """Render one line per forecast day: temperature range and the most frequent condition."""
+        daily: Dict[str, List[ForecastItem]] = {}
+        for item in data.items[:days * 8]:
+            daily.setdefault(item.dt_txt.split(" ")[0], []).append(item)
+        
+        lines = []
+        for date, items in daily.items():
+            temperatures = [item.temperature for item in items]
+            conditions = [item.description.title() for item in items]
+            condition = max(conditions, key=conditions.count)
+            lines.append(f"{date}: {min(temperatures)} to {max(temperatures)}°C, {condition}\n")
+        return "".join(lines)
+    
     async def _get_weather_forecast(self, arguments: Dict[str, Any]) -> ToolResult:
         """Get weather forecast for a location."""
+        result_text = "".join([text async for text in self._render_weather_forecast(arguments)])
+        return ToolResult(content=[{"type": "text", "text": result_text}])
+    
+    async def _render_weather_forecast(self, arguments: Dict[str, Any]) -> AsyncIterator[str]:
+        """Yield the forecast text: a header followed by one block per day."""
         location = arguments["location"]
-        days = int(arguments.get("days", 3))  # Ensure days is an integer
-        units = "metric"  # Always use Celsius
-        
-        url = f"{self.base_url}/forecast"
-        params = {
-            "q": location,
-            "appid": self.api_key,
-            "units": units,
-            "cnt": days * 8  # 8 forecasts per day (every 3 hours)
-        }
+        days = arguments.get("days", 3)  # Validated as an integer in 1-5
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            self.logger.info(f"Weather forecast API response for {location}: {data}")
+        data, snap = await self._load("forecast", location)
+        self.prefetcher.record(location)
         
         unit_symbol = "°C"  # Always Celsius
         
-        result_text = f"Weather forecast for {data['city']['name']}, {data['city']['country']}:\n\n"
+        header = f"Weather forecast for {data.name}, {data.country}:\n"
+        if snap:
+            header += self._describe_snap(snap)
+        yield header + "\n"
         
         current_date = None
-        for item in data["list"][:days * 8]:
-            date_time = item["dt_txt"]
+        day_text = ""
+        for item in data.items[:days * 8]:
+            date_time = item.dt_txt
             date = date_time.split(" ")[0]
             time = date_time.split(" ")[1]
             
             if date != current_date:
                 if current_date is not None:
-                    result_text += "\n"
-                result_text += f"Date: {date}\n"
+                    yield day_text
+                    day_text = "\n"
+                day_text += f"Date: {date}\n"
                 current_date = date
             
-            temp = item["main"]["temp"]
-            desc = item["weather"][0]["description"].title()
-            result_text += f"  {time}: {temp}{unit_symbol}, {desc}\n"
+            temp = item.temperature
+            desc = item.description.title()
+            day_text += f"  {time}: {temp}{unit_symbol}, {desc}\n"
+        
+        if day_text:
+            yield day_text
+    
+    async def _get_weather_history(self, arguments: Dict[str, Any]) -> ToolResult:
+        """Summarize the stored readings of a location."""
+        location = arguments["location"]
+        hours = arguments.get("hours", 24)
+        bucket = arguments.get("bucket", "none")
+        kind = FORECAST if arguments.get("include_forecasts", False) else OBSERVED
+        
+        if not self.history.enabled:
+            return ToolResult(content=[{"type": "text", "text": "Weather history is disabled on this server"}], isError=True)
+        
+        key, name = self._history_location(location)
+        end = time.time()
+        summary, buckets = await self.history.summarize_async(
+            key,
+            end - min(hours * 3600, self.history_retention),
+            end,
+            kind,
+            bucket={"hour": 3600, "day": 86400}.get(bucket)
+        )
+        
+        period = f"{hours // 24} days" if hours % 24 == 0 and hours > 24 else f"{hours} hours"
+        if summary is None:
+            text = f"No weather history for {name} in the last {period}. "
+            text += "Readings are recorded whenever weather for a location is fetched"
+            if kind == OBSERVED:
+                text += "; try include_forecasts=true to use earlier forecasts"
+            return ToolResult(content=[{"type": "text", "text": text + "."}])
+        
+        source = "forecast" if kind == FORECAST else "observation"
+        plural = "" if summary["count"] == 1 else "s"
+        result_text = f"Weather history for {name} (last {period}, {summary['count']} {source}{plural}):\n"
+        result_text += self._describe_history(summary)
+        result_text += f"From: {self._format_time(summary['start'])} to {self._format_time(summary['end'])}\n"
+        
+        if bucket != "none":
+            result_text += "\n"
+            for row in buckets:
+                label = self._format_time(row["bucket"])[:10 if bucket == "day" else 16]
+                temperature = row["temperature"]
+                result_text += (
+                    f"{label}: {temperature['min']:.1f} to {temperature['max']:.1f}°C, "
+                    f"mean {temperature['mean']:.1f}°C ({row['count']} readings)\n"
+                )
         
         return ToolResult(content=[{"type": "text", "text": result_text}])
     
+    def _history_location(self, location: str) -> Tuple[str, str]:
+        """Resolve a location to its history key and display name without calling upstream."""
+        coordinates = parse_coordinates(location)
+        if coordinates:
+            snap = self.grid.snap(*coordinates)
+            return snap["cell"], f"{snap['lat']}, {snap['lon']}"
+        
+        known = self.locations.lookup(location)
+        name = known["name"] if known else location
+        return self._place_key(name), name
+    
+    @staticmethod
+    def _place_key(name: str) -> str:
+        """Get the history key of a place named "City, CC"."""
+        return f"place:{normalize_location(name)}"
+    
+    def _record_history(self, endpoint: str, params: Dict[str, Any], key_params: Dict[str, Any], data: WeatherRecord) -> None:
+        """
+        Append the readings of a fresh upstream response to the history store.
+        
+        Coordinate requests are keyed by their grid cell and named ones by the
+        place OWM resolved them to, so current weather and forecasts of a
+        place land in the same series.
+        """
+        try:
+            key = key_params["cell"] if "lat" in params else self._place_key(f"{data.name}, {data.country}")
+            
+            if endpoint == "weather":
+                self.history.append(key, OBSERVED, [self._reading(data)])
+            else:
+                self.history.append(key, FORECAST, [self._reading(item) for item in data.items])
+        except (TypeError, ValueError, OSError) as e:
+            self.logger.warning(f"Could not record weather history for {params}: {e}")
+    
+    @staticmethod
+    def _reading(item: Union[CurrentWeather, ForecastItem]) -> Tuple[float, ...]:
+        """Extract (time, temperature, humidity, pressure, wind speed) from current conditions or a forecast item."""
+        return (
+            float(item.dt),
+            float(item.temperature),
+            float(item.humidity) if item.humidity is not None else math.nan,
+            float(item.pressure) if item.pressure is not None else math.nan,
+            float(item.wind_speed) if item.wind_speed is not None else math.nan
+        )
+    
+    @staticmethod
+    def _describe_history(summary: Dict[str, Any]) -> str:
+        """Describe the aggregates of a history summary."""
+        temperature = summary["temperature"]
+        trend = summary["last_temperature"] - summary["first_temperature"]
+        text = (
+            f"Temperature: {temperature['min']:.1f} to {temperature['max']:.1f}°C, "
+            f"mean {temperature['mean']:.1f}°C (change {trend:+.1f}°C)\n"
+        )
+        if summary["humidity"]:
+            text += f"Humidity: mean {summary['humidity']['mean']:.0f}%\n"
+        if summary["pressure"]:
+            text += f"Pressure: mean {summary['pressure']['mean']:.0f} hPa\n"
+        if summary["wind_speed"]:
+            text += f"Wind Speed: mean {summary['wind_speed']['mean']:.1f} m/s, max {summary['wind_speed']['max']:.1f} m/s\n"
+        return text
+    
+    @staticmethod
+    def _format_time(timestamp: float) -> str:
+        """Format an epoch time as UTC."""
+        return time.strftime("%Y-%m-%d %H:%M UTC", time.gmtime(timestamp))
+    
+    def _request_params(
+        self,
+        endpoint: str,
+        location: str,
+        resolved: Optional[Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Build upstream params, cache key params and grid snap for an endpoint and location."""
+        location_params, key_params, snap = resolved or self._location_params(location)
+        endpoint_params = ENDPOINT_PARAMS[endpoint]
+        return {**location_params, **endpoint_params}, {**key_params, **endpoint_params}, snap
+    
+    async def _load(
+        self,
+        endpoint: str,
+        location: str,
+        refresh: bool = False,
+        resolved: Optional[Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]] = None
+    ) -> Tuple[WeatherRecord, Optional[Dict[str, Any]]]:
+        """
+        Load the OWM data of an endpoint for a location.
+        
+        Args:
+            endpoint: "weather" or "forecast"
+            location: Location as passed to the tools
+            refresh: Fetch from upstream even if a cached entry exists
+            resolved: Result of `_location_params(location)`, when already computed
+        
+        Returns:
+            (record of the response, grid snap for coordinate locations or None)
+        """
+        params, key_params, snap = self._request_params(endpoint, location, resolved)
+        ttl = self.current_ttl if endpoint == "weather" else self.forecast_ttl
+        data = await self._fetch(endpoint, params, ttl, key_params, refresh=refresh)
+        
+        if snap is None:
+            self._record_location(location, f"{data.name}, {data.country}", {"lat": data.lat, "lon": data.lon}, endpoint, key_params, data, ttl)
+        
+        return data, snap
+    
+    def expires_in(self, endpoint: str, location: str) -> Optional[float]:
+        """Get the seconds until the cached payload of an endpoint and location expires, or None if not cached."""
+        _, key_params, _ = self._request_params(endpoint, location)
+        return self.cache.expires_in(self._cache_key(endpoint, key_params))
+    
+    async def refresh(self, endpoint: str, location: str) -> None:
+        """Re-fetch the payload of an endpoint and location from upstream into the cache."""
+        await self._load(endpoint, location, refresh=True)
+    
+    async def _fetch(self, endpoint: str, params: Dict[str, Any], ttl: float, key_params: Optional[Dict[str, Any]] = None, refresh: bool = False) -> WeatherRecord:
+        """
+        Get an OpenWeatherMap response, serving it from the cache when possible.
+        
+        Responses are decoded into records of the fields the tools use (see
+        `projection`), and only those are cached. Locations that OWM rejected
+        with a deterministic 4xx (e.g. "city not found") are remembered in the
+        negative cache and fail immediately.
+        
+        Args:
+            endpoint: API path below the base URL ("weather" or "forecast")
+            params: Query parameters, without the API key
+            ttl: Seconds to cache a successful response
+            key_params: Parameters identifying the response in the cache,
+                if different from `params` (e.g. a grid cell)
+            refresh: Skip the cache lookup (used by the prefetcher)
+        
+        Returns:
+            The record of the response
+        """
+        cache_key = self._cache_key(endpoint, key_params or params)
+        data = None if refresh else self.cache.get(cache_key)
+        if data is not None:
+            self.logger.info(f"Cache hit for {endpoint} {params}")
+            return restore_record(endpoint, data)
+        
+        # Rejections depend only on the location, whichever endpoint was asked
+        negative_key = self._cache_key("location", {key: params[key] for key in ("q", "lat", "lon") if key in params})
+        failure = self.negative_cache.get(negative_key)
+        if failure is not None:
+            self.logger.info(f"Negative cache hit for {endpoint} {params}")
+            raise WeatherLookupError(self._describe_failure(params, failure))
+        
+        started = time.time()
+        response = await self._http_client().get(f"{self.base_url}/{endpoint}", params={**params, "appid": self.api_key})
+        capture = get_traffic_capture()
+        if capture.upstream:
+            capture.record_upstream(endpoint, params, started, time.time() - started, response.status_code, response.text)
+        
+        if response.status_code in NEGATIVE_CACHE_STATUSES:
+            failure = {"status": response.status_code, "message": self._upstream_message(response)}
+            self.negative_cache.set(negative_key, failure, self.negative_ttl)
+            raise WeatherLookupError(self._describe_failure(params, failure))
+        
+        response.raise_for_status()
+        data = decode_response(endpoint, response.content)
+        self.logger.info(f"Weather {endpoint} API response for {params}: {len(response.content)} bytes")
+        
+        self._record_history(endpoint, params, key_params or params, data)
+        self.cache.set(cache_key, data, ttl)
+        return data
+    
+    def _location_params(self, location: str) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Resolve a location into upstream and cache-key parameters.
+        
+        Coordinates are snapped to their grid cell and requested at the cell
+        center. Names are requested as given, but once geocoded they are keyed
+        by the cell of their coordinates so aliases share an entry.
+        
+        Returns:
+            (upstream params, cache key params, grid snap for coordinates or None)
+        """
+        coordinates = parse_coordinates(location)
+        if coordinates:
+            snap = self.grid.snap(*coordinates)
+            return {"lat": snap["lat"], "lon": snap["lon"]}, {"cell": snap["cell"]}, snap
+        
+        known = self.locations.lookup(location)
+        if known and known["lat"] is not None and known["lon"] is not None:
+            return {"q": location}, {"cell": self.grid.snap(known["lat"], known["lon"])["cell"]}, None
+        
+        return {"q": location}, {"q": location}, None
+    
+    def _record_location(
+        self,
+        location: str,
+        name: str,
+        coordinates: Dict[str, Optional[float]],
+        endpoint: str,
+        key_params: Dict[str, Any],
+        data: WeatherRecord,
+        ttl: float
+    ) -> None:
+        """
+        Record a geocoded name, caching its fresh response under its grid cell too.
+        
+        Later queries for the same name, its aliases and nearby coordinates
+        are keyed by that cell, so they hit the entry fetched by name.
+        """
+        self.locations.record(location, name, **coordinates)
+        
+        if "q" in key_params and coordinates["lat"] is not None and coordinates["lon"] is not None:
+            cell = self.grid.snap(coordinates["lat"], coordinates["lon"])["cell"]
+            cell_params = {key: value for key, value in key_params.items() if key != "q"}
+            self.cache.set(self._cache_key(endpoint, {**cell_params, "cell": cell}), data, ttl)
+    
+    @staticmethod
+    def _describe_snap(snap: Dict[str, Any]) -> str:
+        """Describe the grid point whose data answers a coordinate query."""
+        return f"Grid Point: {snap['lat']}, {snap['lon']} ({snap['error_m']:.0f} m from requested coordinates)\n"
+    
+    def _describe_failure(self, params: Dict[str, Any], failure: Dict[str, Any]) -> str:
+        """Describe a rejected location, suggesting similar known locations."""
+        location = params.get("q") or f"{params.get('lat')},{params.get('lon')}"
+        
+        if failure["status"] == 404:
+            message = f"Location '{location}' not found"
+        else:
+            message = f"OpenWeatherMap rejected location '{location}' ({failure['status']}: {failure['message']})"
+        
+        suggestions = self.locations.suggest(location) if "q" in params else []
+        if suggestions:
+            message += f". Did you mean: {'; '.join(suggestions)}?"
+        return message
+    
+    @staticmethod
+    def _upstream_message(response: httpx.Response) -> str:
+        """Extract OWM's error message from a response."""
+        try:
+            return str(response.json().get("message", response.reason_phrase))
+        except ValueError:
+            return response.reason_phrase
+    
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Build a cache key that ignores case and spacing in the location."""
+        normalized = {
+            key: normalize_location(value) if key == "q" else value
+            for key, value in sorted(params.items())
+        }
+        return f"{endpoint}:{json.dumps(normalized, separators=(',', ':'))}"
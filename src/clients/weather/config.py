@@ -7,10 +7,41 @@ from dotenv import load_dotenv
 from .types import WeatherConfig
 
 
-# OpenWeatherMap API Constants
+# OpenWeatherMap API Constants; the base URL can point at a stand-in for replays
 DEFAULT_BASE_URL = "https://api.openweathermap.org/data/2.5"
 DEFAULT_GEO_URL = "https://api.openweathermap.org/geo/1.0"
 
+# Cache lifetimes (seconds); OWM refreshes current conditions about every 10 minutes
+DEFAULT_CURRENT_TTL = "600"
+DEFAULT_FORECAST_TTL = "1800"
+
+# Rejected locations ("city not found") are remembered briefly in their own bounded cache
+DEFAULT_NEGATIVE_TTL = "300"
+DEFAULT_NEGATIVE_MAX_ENTRIES = "512"
+
+# Coordinates are snapped to a grid for caching: "degrees" (0.01° is about 1.1 km) or "geohash"
+DEFAULT_GRID_MODE = "degrees"
+DEFAULT_GRID_STEP = "0.01"
+DEFAULT_GEOHASH_PRECISION = "6"
+
+# Hot locations are refreshed in the background before their entries expire, within a per-minute budget
+DEFAULT_PREFETCH_ENABLED = "true"
+DEFAULT_PREFETCH_TOP_K = "20"
+DEFAULT_PREFETCH_INTERVAL = "30"
+DEFAULT_PREFETCH_AHEAD = "60"
+DEFAULT_PREFETCH_BUDGET = "10"
+DEFAULT_PREFETCH_SKETCH_SIZE = "256"
+
+# Fetched readings are kept on disk for history queries, compacted periodically
+DEFAULT_HISTORY_ENABLED = "true"
+DEFAULT_HISTORY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    ".cache",
+    "history"
+)
+DEFAULT_HISTORY_RETENTION_DAYS = "30"
+DEFAULT_HISTORY_COMPACT_INTERVAL = "300"
+
 
 def get_env_var(key: str, default: Optional[str] = None, required: bool = False) -> Optional[str]:
     """Get an environment variable with optional default and required validation."""
@@ -29,6 +60,23 @@ def get_weather_config() -> WeatherConfig:
     
     return WeatherConfig(
         api_key=get_env_var("OPENWEATHERMAP_API_KEY", required=True),
-        base_url=DEFAULT_BASE_URL,
-        geo_url=DEFAULT_GEO_URL
+        base_url=get_env_var("OPENWEATHERMAP_BASE_URL", DEFAULT_BASE_URL).rstrip("/"),
+        geo_url=DEFAULT_GEO_URL,
+        current_ttl=float(get_env_var("WEATHER_CURRENT_TTL", DEFAULT_CURRENT_TTL)),
+        forecast_ttl=float(get_env_var("WEATHER_FORECAST_TTL", DEFAULT_FORECAST_TTL)),
+        negative_ttl=float(get_env_var("WEATHER_NEGATIVE_TTL", DEFAULT_NEGATIVE_TTL)),
+        negative_max_entries=int(get_env_var("WEATHER_NEGATIVE_MAX_ENTRIES", DEFAULT_NEGATIVE_MAX_ENTRIES)),
+        grid_mode=get_env_var("WEATHER_GRID_MODE", DEFAULT_GRID_MODE).lower(),
+        grid_step=float(get_env_var("WEATHER_GRID_STEP", DEFAULT_GRID_STEP)),
+        geohash_precision=int(get_env_var("WEATHER_GEOHASH_PRECISION", DEFAULT_GEOHASH_PRECISION)),
+        prefetch_enabled=get_env_var("WEATHER_PREFETCH_ENABLED", DEFAULT_PREFETCH_ENABLED).lower() == "true",
+        prefetch_top_k=int(get_env_var("WEATHER_PREFETCH_TOP_K", DEFAULT_PREFETCH_TOP_K)),
+        prefetch_interval=float(get_env_var("WEATHER_PREFETCH_INTERVAL", DEFAULT_PREFETCH_INTERVAL)),
+        prefetch_ahead=float(get_env_var("WEATHER_PREFETCH_AHEAD", DEFAULT_PREFETCH_AHEAD)),
+        prefetch_budget=float(get_env_var("WEATHER_PREFETCH_BUDGET", DEFAULT_PREFETCH_BUDGET)),
+        prefetch_sketch_size=int(get_env_var("WEATHER_PREFETCH_SKETCH_SIZE", DEFAULT_PREFETCH_SKETCH_SIZE)),
+        history_enabled=get_env_var("WEATHER_HISTORY_ENABLED", DEFAULT_HISTORY_ENABLED).lower() == "true",
+        history_path=get_env_var("WEATHER_HISTORY_PATH", DEFAULT_HISTORY_PATH),
+        history_retention_days=float(get_env_var("WEATHER_HISTORY_RETENTION_DAYS", DEFAULT_HISTORY_RETENTION_DAYS)),
+        history_compact_interval=float(get_env_var("WEATHER_HISTORY_COMPACT_INTERVAL", DEFAULT_HISTORY_COMPACT_INTERVAL))
     )
\ No newline at end of file
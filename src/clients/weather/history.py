@@ -0,0 +1,582 @@
+"""Local time series of the weather readings fetched from OpenWeatherMap."""
+
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import bisect
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+# Values of a reading besides its time; missing values are stored as NaN
+FIELDS = ("temperature", "humidity", "pressure", "wind_speed")
+COLUMNS = ("time",) + FIELDS
+
+# Readings are either observed conditions or forecasts for a time
+OBSERVED = 0
+FORECAST = 1
+SEGMENT_FILES = {OBSERVED: "observed.seg", FORECAST: "forecast.seg"}
+
+LOG_FILE = "log.rows"
+LOCK_FILE = "lock"
+
+# Log rows: kind, time, FIELDS, as native float64
+_ROW = struct.Struct(f"={2 + len(FIELDS)}d")
+
+# Segments: magic, row count and block size, then one native float64 column per
+# COLUMNS entry, then the min, max, sum and count of every block of every field
+_MAGIC = b"WHS2"
+_HEADER = struct.Struct("=4s4xQQ")
+_BLOCK_STATS = ("min", "max", "sum", "count")
+
+# Rows per block; range aggregates scan at most two partial blocks
+BLOCK_ROWS = 64
+
+# Memory-mapped segments kept open at once
+MAX_OPEN_SEGMENTS = 256
+
+# Aggregate of no values: (min, max, sum, count)
+_EMPTY = (math.inf, -math.inf, 0.0, 0)
+
+
+def _scan(values: Any) -> Tuple[float, float, float, int]:
+    """Aggregate a column slice into (min, max, sum, count), skipping missing values."""
+    total = sum(values)
+    if total != total:
+        values = [value for value in values if value == value]
+        total = sum(values)
+    if not len(values):
+        return _EMPTY
+    return min(values), max(values), total, len(values)
+
+
+def _combine(parts: Iterable[Tuple[float, float, float, int]]) -> Tuple[float, float, float, int]:
+    """Combine (min, max, sum, count) aggregates."""
+    lows, highs, sums, counts = zip(*parts)
+    return min(lows), max(highs), sum(sums), sum(counts)
+
+
+class Columns:
+    """Time-ordered readings held in memory, with the aggregation interface of a segment."""
+    
+    def __init__(self, columns: Dict[str, Any]):
+        """Wrap columns keyed by COLUMNS."""
+        self.columns = columns
+        self.count = len(columns["time"])
+    
+    def aggregate(self, name: str, first: int, last: int) -> Tuple[float, float, float, int]:
+        """Aggregate a field over rows [first, last)."""
+        return _scan(self.columns[name][first:last])
+
+
+class Segment(Columns):
+    """A sealed columnar segment of one kind of readings, memory-mapped and ordered by time."""
+    
+    def __init__(self, path: str):
+        """Map a segment file."""
+        self._mmap: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+        self.blocks: Dict[str, Dict[str, memoryview]] = {}
+        columns: Dict[str, Any] = {name: () for name in COLUMNS}
+        
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            if stat.st_size > _HEADER.size:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if self._mmap is not None:
+            magic, count, block_rows = _HEADER.unpack_from(self._mmap)
+            blocks = -(-count // block_rows) if block_rows else 0
+            size = _HEADER.size + (count * len(COLUMNS) + blocks * len(FIELDS) * len(_BLOCK_STATS)) * 8
+            if magic != _MAGIC or block_rows != BLOCK_ROWS or stat.st_size != size:
+                self._mmap.close()
+                raise ValueError(f"Corrupt or outdated history segment: {path}")
+            
+            values = memoryview(self._mmap)[_HEADER.size:].cast("d")
+            self._views.append(values)
+            offset = 0
+            for name in COLUMNS:
+                columns[name] = self._view(values, offset, count)
+                offset += count
+            for name in FIELDS:
+                self.blocks[name] = {}
+                for stat_name in _BLOCK_STATS:
+                    self.blocks[name][stat_name] = self._view(values, offset, blocks)
+                    offset += blocks
+        
+        super().__init__(columns)
+    
+    def _view(self, values: memoryview, offset: int, length: int) -> memoryview:
+        """Slice a view of the mapping, remembering it so close() can release it."""
+        view = values[offset:offset + length]
+        self._views.append(view)
+        return view
+    
+    def aggregate(self, name: str, first: int, last: int) -> Tuple[float, float, float, int]:
+        """Aggregate a field over rows [first, last), using the block aggregates for whole blocks."""
+        low = -(-first // BLOCK_ROWS)
+        high = last // BLOCK_ROWS
+        if low >= high:
+            return super().aggregate(name, first, last)
+        
+        column = self.columns[name]
+        blocks = self.blocks[name]
+        return _combine((
+            _scan(column[first:low * BLOCK_ROWS]),
+            _scan(column[high * BLOCK_ROWS:last]),
+            (min(blocks["min"][low:high]), max(blocks["max"][low:high]), sum(blocks["sum"][low:high]), int(sum(blocks["count"][low:high])))
+        ))
+    
+    def rows(self) -> Iterator[Tuple[float, ...]]:
+        """Iterate over the readings as (time, *FIELDS) tuples."""
+        return zip(*(self.columns[name] for name in COLUMNS))
+    
+    def close(self) -> None:
+        """Unmap the segment."""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def _write_segment(path: str, rows: List[Tuple[float, ...]]) -> None:
+    """Atomically replace a segment with time-ordered (time, *FIELDS) rows."""
+    data = array("d")
+    for i in range(len(COLUMNS)):
+        data.extend(row[i] for row in rows)
+    
+    for i in range(1, len(COLUMNS)):
+        column = data[i * len(rows):(i + 1) * len(rows)]
+        aggregates = [_scan(column[start:start + BLOCK_ROWS]) for start in range(0, len(rows), BLOCK_ROWS)]
+        for stat_index in range(len(_BLOCK_STATS)):
+            data.extend(aggregate[stat_index] for aggregate in aggregates)
+    
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(rows), BLOCK_ROWS))
+        data.tofile(f)
+    os.replace(temporary, path)
+
+
+class Series:
+    """
+    Readings of one location and kind in a time range: consecutive row
+    ranges of a segment and of the readings not compacted yet.
+    
+    Only valid until the next query of the store, which may remap segments.
+    """
+    
+    def __init__(self, parts: List[Tuple[Columns, int, int]]):
+        """Wrap (columns, first row, row after the last) parts, in time order."""
+        self.parts = [part for part in parts if part[2] > part[1]]
+    
+    def __len__(self) -> int:
+        return sum(last - first for _, first, last in self.parts)
+    
+    def summarize(self, start: float = -math.inf, end: float = math.inf) -> Optional[Dict[str, Any]]:
+        """
+        Aggregate the readings in [start, end).
+        
+        Returns:
+            None if there are none, else the reading count, first and last
+            time and temperature, and min/max/mean of every field with values
+        """
+        ranges = []
+        for columns, first, last in self.parts:
+            times = columns.columns["time"]
+            if start > -math.inf:
+                first = bisect.bisect_left(times, start, first, last)
+            if end < math.inf:
+                last = bisect.bisect_left(times, end, first, last)
+            if last > first:
+                ranges.append((columns, first, last))
+        if not ranges:
+            return None
+        
+        head, head_first, _ = ranges[0]
+        tail, _, tail_last = ranges[-1]
+        summary: Dict[str, Any] = {
+            "count": sum(last - first for _, first, last in ranges),
+            "start": head.columns["time"][head_first],
+            "end": tail.columns["time"][tail_last - 1],
+            "first_temperature": head.columns["temperature"][head_first],
+            "last_temperature": tail.columns["temperature"][tail_last - 1]
+        }
+        for name in FIELDS:
+            low, high, total, count = _combine(columns.aggregate(name, first, last) for columns, first, last in ranges)
+            summary[name] = {"min": low, "max": high, "mean": total / count} if count else None
+        return summary
+    
+    def buckets(self, size: float) -> List[Dict[str, Any]]:
+        """Aggregate the readings per bucket of `size` seconds aligned to the epoch, skipping empty buckets."""
+        summary = self.summarize()
+        if summary is None:
+            return []
+        
+        buckets = []
+        edge = summary["start"] // size * size
+        while edge <= summary["end"]:
+            bucket = self.summarize(edge, edge + size)
+            if bucket is not None:
+                buckets.append({"bucket": edge, **bucket})
+            edge += size
+        return buckets
+
+
+class HistoryStore:
+    """
+    On-disk time series of the weather readings fetched for each location.
+    
+    Readings are appended to a per-location log as they are fetched.
+    Compaction folds the log into sealed columnar segments, one per kind of
+    reading, ordered by time, deduplicated (a re-fetched reading replaces
+    the earlier one) and trimmed to the retention period. Queries map the
+    segments into memory, find their time range by bisection and copy out
+    whole column slices, so they never call upstream. A lock file per
+    location keeps the workers of a prefork server consistent.
+    
+    On the event loop, appending a log row is the only work done inline:
+    compaction, appends that would wait for a compaction and queries
+    (`summarize_async`) run in the default executor.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        retention: float,
+        compact_interval: float = 300.0,
+        compact_rows: int = 4096,
+        enabled: bool = True
+    ):
+        """
+        Initialize the store.
+        
+        Args:
+            path: Directory holding one subdirectory per location
+            retention: Seconds of readings to keep
+            compact_interval: Seconds between compactions of every location
+            compact_rows: Log length at which a location is compacted right away
+            enabled: Whether readings are recorded at all
+        """
+        self.path = path
+        self.retention = retention
+        self.compact_interval = compact_interval
+        self.compact_rows = compact_rows
+        self.enabled = enabled
+        self._segments: "OrderedDict[str, Segment]" = OrderedDict()
+        self._task: Optional["asyncio.Task[None]"] = None
+        # Queries remap segments, so they run one at a time
+        self._query_lock = threading.Lock()
+        self._compacting: Set[str] = set()
+        self._background: Set["asyncio.Future[None]"] = set()
+        self.appended = 0
+        self.compactions = 0
+    
+    def _directory(self, key: str) -> str:
+        """Get the directory of a location."""
+        return os.path.join(self.path, urllib.parse.quote(key, safe=""))
+    
+    @contextmanager
+    def _locked(self, directory: str, operation: int) -> Iterator[None]:
+        """Hold a location's lock, shared for appends and reads, exclusive for compaction."""
+        fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            os.close(fd)
+    
+    def append(self, key: str, kind: int, readings: Iterable[Tuple[float, ...]]) -> None:
+        """
+        Record readings for a location.
+        
+        Args:
+            key: Location key
+            kind: OBSERVED or FORECAST
+            readings: (time, *FIELDS) tuples, with NaN for missing values
+        """
+        if not self.enabled:
+            return
+        
+        data = b"".join(_ROW.pack(kind, *reading) for reading in readings)
+        if not data:
+            return
+        
+        directory = self._directory(key)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            size = self._write_log(directory, data, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            # The location is being compacted; append once it is done, off the event loop
+            self._run_in_background(self._append_waiting, key, directory, data)
+            return
+        
+        if size >= self.compact_rows * _ROW.size and key not in self._compacting:
+            self._compacting.add(key)
+            self._run_in_background(self._compact_pending, key)
+    
+    def _write_log(self, directory: str, data: bytes, operation: int) -> int:
+        """Append rows to a location's log under its shared lock, returning the log size."""
+        with self._locked(directory, operation):
+            # Appends of whole rows with O_APPEND do not interleave between workers
+            fd = os.open(os.path.join(directory, LOG_FILE), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+        
+        self.appended += len(data) // _ROW.size
+        return size
+    
+    def _append_waiting(self, key: str, directory: str, data: bytes) -> None:
+        """Append rows once the location's compaction releases its lock, compacting if the log is full."""
+        if self._write_log(directory, data, fcntl.LOCK_SH) >= self.compact_rows * _ROW.size:
+            self.compact(key)
+    
+    def _compact_pending(self, key: str) -> None:
+        """Compact a location whose log reached `compact_rows`."""
+        try:
+            self.compact(key)
+        finally:
+            self._compacting.discard(key)
+    
+    def _run_in_background(self, function: Callable[..., None], *args: Any) -> None:
+        """Run blocking work in the default executor, or right away when there is no event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._run_logged(function, *args)
+            return
+        
+        future = loop.run_in_executor(None, self._run_logged, function, *args)
+        self._background.add(future)
+        future.add_done_callback(self._background.discard)
+    
+    @staticmethod
+    def _run_logged(function: Callable[..., None], *args: Any) -> None:
+        """Run work on the history of a location, logging storage errors instead of raising them."""
+        try:
+            function(*args)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not update weather history of {args[0]}: {e}")
+    
+    @staticmethod
+    def _read_log(path: str) -> List[Tuple[float, ...]]:
+        """Read the (kind, time, *FIELDS) rows of a log, ignoring a torn last row."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        return list(_ROW.iter_unpack(memoryview(data)[:len(data) - len(data) % _ROW.size]))
+    
+    def _segment(self, path: str) -> Optional[Segment]:
+        """Get the current mapping of a segment, remapping it if compaction replaced the file."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stale = self._segments.pop(path, None)
+            if stale is not None:
+                stale.close()
+            return None
+        
+        segment = self._segments.get(path)
+        if segment is not None and segment.identity == (stat.st_ino, stat.st_mtime_ns):
+            self._segments.move_to_end(path)
+            return segment
+        
+        if segment is not None:
+            segment.close()
+        segment = self._segments[path] = Segment(path)
+        while len(self._segments) > MAX_OPEN_SEGMENTS:
+            self._segments.popitem(last=False)[1].close()
+        return segment
+    
+    def query(self, key: str, start: float, end: float, kind: int = OBSERVED) -> Series:
+        """
+        Get the readings of a location in a time range.
+        
+        Args:
+            key: Location key
+            start: Earliest reading time (epoch seconds)
+            end: Latest reading time (epoch seconds)
+            kind: OBSERVED or FORECAST
+        
+        Returns:
+            The readings, to summarize before the next query; `summarize`
+            does both under the query lock
+        """
+        directory = self._directory(key)
+        if not os.path.isdir(directory):
+            return Series([])
+        
+        with self._locked(directory, fcntl.LOCK_SH):
+            segment = self._segment(os.path.join(directory, SEGMENT_FILES[kind]))
+            log = self._read_log(os.path.join(directory, LOG_FILE))
+        
+        parts: List[Tuple[Columns, int, int]] = []
+        if segment is not None and segment.count:
+            times = segment.columns["time"]
+            parts.append((segment, bisect.bisect_left(times, start), bisect.bisect_right(times, end)))
+        
+        # Readings not compacted yet; the latest of each time wins
+        pending = {row[1]: row[1:] for row in log if row[0] == kind and start <= row[1] <= end}
+        if not pending:
+            return Series(parts)
+        
+        rows = [pending[reading_time] for reading_time in sorted(pending)]
+        if parts and parts[0][2] > parts[0][1] and rows[0][0] <= parts[0][0].columns["time"][parts[0][2] - 1]:
+            # They overlap the compacted readings, so merge both in memory
+            segment, first, last = parts.pop()
+            merged = {row[0]: row for row in zip(*(segment.columns[name][first:last] for name in COLUMNS))}
+            merged.update((row[0], row) for row in rows)
+            rows = [merged[reading_time] for reading_time in sorted(merged)]
+        
+        columns = Columns({name: array("d", (row[i] for row in rows)) for i, name in enumerate(COLUMNS)})
+        parts.append((columns, 0, columns.count))
+        return Series(parts)
+    
+    def summarize(
+        self,
+        key: str,
+        start: float,
+        end: float,
+        kind: int = OBSERVED,
+        bucket: Optional[float] = None
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Aggregate the readings of a location in a time range.
+        
+        Args:
+            key: Location key
+            start: Earliest reading time (epoch seconds)
+            end: Latest reading time (epoch seconds)
+            kind: OBSERVED or FORECAST
+            bucket: Also aggregate per bucket of this many seconds
+        
+        Returns:
+            (summary or None if there are no readings, buckets; empty without `bucket`)
+        """
+        with self._query_lock:
+            series = self.query(key, start, end, kind)
+            summary = series.summarize()
+            return summary, series.buckets(bucket) if bucket and summary is not None else []
+    
+    async def summarize_async(
+        self,
+        key: str,
+        start: float,
+        end: float,
+        kind: int = OBSERVED,
+        bucket: Optional[float] = None
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Aggregate the readings of a location in a thread, so waiting for a compaction's lock does not stall the event loop."""
+        return await asyncio.to_thread(self.summarize, key, start, end, kind, bucket)
+    
+    def compact(self, key: str) -> bool:
+        """
+        Fold a location's log into its segments, dropping readings past the retention period.
+        
+        Returns:
+            Whether anything was rewritten
+        """
+        directory = self._directory(key)
+        cutoff = time.time() - self.retention
+        
+        with self._locked(directory, fcntl.LOCK_EX):
+            log_path = os.path.join(directory, LOG_FILE)
+            log = self._read_log(log_path)
+            changed = False
+            
+            for kind, filename in SEGMENT_FILES.items():
+                path = os.path.join(directory, filename)
+                pending = [row[1:] for row in log if row[0] == kind]
+                existing = Segment(path) if os.path.exists(path) else None
+                try:
+                    expired = existing is not None and existing.count and existing.columns["time"][0] < cutoff
+                    if not pending and not expired:
+                        continue
+                    
+                    readings = {row[0]: row for row in existing.rows()} if existing is not None else {}
+                finally:
+                    if existing is not None:
+                        existing.close()
+                
+                readings.update((row[0], row) for row in pending)
+                rows = [readings[reading_time] for reading_time in sorted(readings) if reading_time >= cutoff]
+                if rows:
+                    _write_segment(path, rows)
+                elif os.path.exists(path):
+                    os.remove(path)
+                changed = True
+            
+            if log:
+                os.truncate(log_path, 0)
+        
+        if changed:
+            self.compactions += 1
+        return changed
+    
+    def compact_all(self) -> int:
+        """Compact every location, returning how many were rewritten."""
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return 0
+        
+        compacted = 0
+        for name in names:
+            try:
+                if self.compact(urllib.parse.unquote(name)):
+                    compacted += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not compact weather history of {urllib.parse.unquote(name)}: {e}")
+        return compacted
+    
+    def start(self) -> None:
+        """Start compacting periodically on the running event loop."""
+        if self._task is None and self.enabled and self.compact_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop compacting, wait for background appends and compactions, and unmap every segment."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await asyncio.to_thread(self._close_segments)
+    
+    def _close_segments(self) -> None:
+        """Unmap every segment once no query is using them."""
+        with self._query_lock:
+            while self._segments:
+                self._segments.popitem()[1].close()
+    
+    async def _run(self) -> None:
+        """Compact every interval, off the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            compacted = await loop.run_in_executor(None, self.compact_all)
+            if compacted:
+                logger.info(f"Compacted weather history of {compacted} locations")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of readings appended and compactions run by this process."""
+        return {"appended": self.appended, "compactions": self.compactions, "open_segments": len(self._segments)}
@@ -0,0 +1,162 @@
+"""Local index of locations resolved by OpenWeatherMap."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import difflib
+import math
+import re
+
+
+_COORDINATES = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_EARTH_RADIUS_M = 6371000.0
+
+
+def normalize_location(location: str) -> str:
+    """Normalize a location query for lookups (case and whitespace insensitive)."""
+    return " ".join(location.replace(",", ", ").split()).lower().replace(" ,", ",")
+
+
+def parse_coordinates(location: str) -> Optional[Tuple[float, float]]:
+    """Parse a "lat,lon" location, returning None for anything else."""
+    match = _COORDINATES.match(location)
+    if not match:
+        return None
+    
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return lat, lon
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def geohash_cell(lat: float, lon: float, precision: int) -> Tuple[str, float, float]:
+    """Encode a point as a geohash, returning the hash and its cell center."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, lon) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits = 0
+            value = 0
+    
+    return "".join(chars), (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+class CoordinateGrid:
+    """
+    Snaps coordinates onto grid cells so nearby points share cache entries.
+    
+    Two modes are supported: "degrees" rounds to a fixed step in degrees and
+    "geohash" uses the cells of a geohash precision. Upstream data is
+    requested for the cell center, so every point in a cell gets identical data.
+    """
+    
+    def __init__(self, mode: str = "degrees", step: float = 0.01, precision: int = 6):
+        """Initialize the grid."""
+        if mode not in ("degrees", "geohash"):
+            raise ValueError(f"Unknown coordinate grid mode: {mode}")
+        self.mode = mode
+        self.step = step
+        self.precision = precision
+    
+    def snap(self, lat: float, lon: float) -> Dict[str, Any]:
+        """
+        Snap a point to its grid cell.
+        
+        Returns:
+            The cell id, the cell center (lat, lon) and the distance in meters
+            from the point to the center (the quantization error)
+        """
+        if self.mode == "geohash":
+            geohash, cell_lat, cell_lon = geohash_cell(lat, lon, self.precision)
+            cell = f"geohash:{geohash}"
+        else:
+            cell_lat = round(round(lat / self.step) * self.step, 6)
+            cell_lon = round(round(lon / self.step) * self.step, 6)
+            cell = f"deg{self.step:g}:{cell_lat:.6f},{cell_lon:.6f}"
+        
+        return {
+            "cell": cell,
+            "lat": round(cell_lat, 6),
+            "lon": round(cell_lon, 6),
+            "error_m": distance_m(lat, lon, cell_lat, cell_lon)
+        }
+
+
+class LocationIndex:
+    """
+    Bounded record of location queries that resolved successfully.
+    
+    Each entry maps a normalized query to the place OWM returned for it,
+    so misspelled queries can be answered with "did you mean" suggestions
+    without another upstream call.
+    """
+    
+    def __init__(self, max_entries: int = 4096):
+        """Initialize the index."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def record(self, query: str, name: str, lat: Optional[float] = None, lon: Optional[float] = None) -> None:
+        """Record that a query resolved to a named place."""
+        key = normalize_location(query)
+        self._entries[key] = {"name": name, "lat": lat, "lon": lon}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Get the place a query resolved to, if known."""
+        return self._entries.get(normalize_location(query))
+    
+    def dump(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        """Iterate over the entries as snapshot records, least recently recorded first."""
+        for key, entry in self._entries.items():
+            yield key, entry, 0.0
+    
+    def restore(self, key: str, entry: Dict[str, Any]) -> None:
+        """Put back an entry from a snapshot."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def suggest(self, query: str, limit: int = 3) -> List[str]:
+        """Suggest known place names close to a query that did not resolve."""
+        names = {entry["name"].lower(): entry["name"] for entry in self._entries.values()}
+        candidates = list(names) + list(self._entries)
+        
+        suggestions = []
+        for match in difflib.get_close_matches(normalize_location(query), candidates, n=limit * 2, cutoff=0.75):
+            name = names.get(match) or self._entries[match]["name"]
+            if name not in suggestions:
+                suggestions.append(name)
+        return suggestions[:limit]
+    
+    def __len__(self) -> int:
+        """Get the number of recorded queries."""
+        return len(self._entries)
@@ -0,0 +1,202 @@
+"""Background refresh of popular weather locations."""
+
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple
+import asyncio
+import time
+
+from ...core.popularity import HeavyHitters
+from .locations import normalize_location
+
+
+class WeatherPrefetcher:
+    """
+    Keeps the most requested locations warm in the weather cache.
+    
+    Request frequency per location is tracked in a bounded heavy-hitters
+    sketch. Every `interval` seconds, the top-K locations whose entries
+    expire within `refresh_ahead` seconds are re-fetched, and a current
+    weather request for a hot location also co-fetches its forecast. The
+    top-K is recomputed on each of those cycles, so requests only look up
+    a cached hot set. All upstream calls made here draw from a token bucket
+    of `budget_per_minute`, so prefetching stays within quota.
+    
+    Each worker process of the prefork server runs its own prefetcher with
+    its own sketch and bucket, so the budget applies per worker: the
+    upstream calls of a host can reach workers x `budget_per_minute`.
+    """
+    
+    # A location must be requested this many times (after decay) to be refreshed
+    MIN_HITS = 2.0
+    
+    # Halve all popularity counts every N refresh cycles
+    DECAY_EVERY = 10
+    
+    def __init__(
+        self,
+        client: Any,
+        enabled: bool = True,
+        top_k: int = 20,
+        interval: float = 30.0,
+        refresh_ahead: float = 60.0,
+        budget_per_minute: float = 10.0,
+        sketch_size: int = 256
+    ):
+        """Initialize the prefetcher for a weather client."""
+        self.client = client
+        self.enabled = enabled
+        self.top_k = top_k
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.budget_per_minute = budget_per_minute
+        self.logger = client.logger
+        
+        self.sketch = HeavyHitters(sketch_size)
+        self._endpoints: Dict[str, Set[str]] = {}
+        self._tokens = budget_per_minute
+        self._last_refill = time.monotonic()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._pending: Set["asyncio.Task[None]"] = set()
+        self._inflight: Set[Tuple[str, str]] = set()
+        self._hot: List[str] = []
+        self._hot_keys: FrozenSet[str] = frozenset()
+        
+        self.refreshes = 0
+        self.failures = 0
+        self.over_budget = 0
+    
+    def record(self, location: str, endpoint: str = "forecast") -> None:
+        """Count a request for a location."""
+        key = normalize_location(location)
+        self.sketch.add(key)
+        self._endpoints.setdefault(key, set()).add(endpoint)
+    
+    def record_current(self, location: str) -> None:
+        """Count a current weather request, co-fetching the forecast of hot locations."""
+        self.record(location, "weather")
+        if not self.enabled:
+            return
+        
+        key = normalize_location(location)
+        if (key, "forecast") in self._inflight or not self.is_hot(key):
+            return
+        if self.client.expires_in("forecast", key) is None and self._take_token():
+            self._endpoints[key].add("forecast")
+            self._inflight.add((key, "forecast"))
+            self._spawn(self._refresh(key, "forecast"))
+    
+    def is_hot(self, key: str) -> bool:
+        """Check whether a normalized location was among the top-K at the last refresh cycle."""
+        return key in self._hot_keys
+    
+    def update_hot(self) -> List[Tuple[str, float]]:
+        """Recompute the top-K locations, returning them with their counts."""
+        hot = [(key, count) for key, count in self.sketch.top(self.top_k) if count >= self.MIN_HITS]
+        self._hot = [key for key, _ in hot]
+        self._hot_keys = frozenset(self._hot)
+        return hot
+    
+    def start(self) -> None:
+        """Start the refresh loop on the running event loop."""
+        if self.enabled and self._task is None:
+            self.update_hot()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            self.logger.info(f"Prefetcher started (top {self.top_k}, {self.budget_per_minute}/min budget)")
+    
+    async def stop(self) -> None:
+        """Stop the refresh loop and any in-flight refreshes."""
+        tasks = list(self._pending)
+        if self._task:
+            tasks.append(self._task)
+            self._task = None
+        
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def refresh_hot(self) -> None:
+        """Refresh the entries of hot locations that are missing or about to expire."""
+        hot = self.update_hot()
+        
+        # Forget endpoint sets of locations the sketch no longer tracks
+        for key in [key for key in self._endpoints if key not in self.sketch]:
+            del self._endpoints[key]
+        
+        for key, _ in hot:
+            for endpoint in sorted(self._endpoints.get(key, ())):
+                remaining = self.client.expires_in(endpoint, key)
+                if remaining is not None and remaining > self.refresh_ahead:
+                    continue
+                if not self._take_token():
+                    return
+                await self._refresh(key, endpoint)
+    
+    def dump(self) -> Iterator[Tuple[str, Dict[str, Any], float]]:
+        """Iterate over the popularity of tracked locations as snapshot records."""
+        for key, count in self.sketch.counts.items():
+            yield key, {
+                "count": count,
+                "error": self.sketch.errors.get(key, 0.0),
+                "endpoints": sorted(self._endpoints.get(key, ()))
+            }, 0.0
+    
+    def restore(self, key: str, popularity: Dict[str, Any]) -> None:
+        """Put back the popularity of a location from a snapshot."""
+        self.sketch.restore(key, popularity["count"], popularity.get("error", 0.0))
+        if key in self.sketch:
+            self._endpoints.setdefault(key, set()).update(popularity.get("endpoints", ()))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get prefetcher statistics."""
+        return {
+            "enabled": self.enabled,
+            "tracked": len(self.sketch),
+            "hot": list(self._hot),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "over_budget": self.over_budget
+        }
+    
+    async def _run(self) -> None:
+        """Refresh hot locations every interval, decaying popularity periodically."""
+        cycles = 0
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_hot()
+            except Exception as e:
+                self.logger.error(f"Prefetch cycle failed: {e}")
+            
+            cycles += 1
+            if cycles % self.DECAY_EVERY == 0:
+                self.sketch.decay()
+    
+    async def _refresh(self, key: str, endpoint: str) -> None:
+        """Re-fetch one entry, logging rather than raising on failure."""
+        self._inflight.add((key, endpoint))
+        try:
+            await self.client.refresh(endpoint, key)
+            self.refreshes += 1
+        except Exception as e:
+            self.failures += 1
+            self.logger.warning(f"Prefetch of {endpoint} for '{key}' failed: {e}")
+        finally:
+            self._inflight.discard((key, endpoint))
+    
+    def _spawn(self, coro: Any) -> None:
+        """Run a refresh in the background, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    def _take_token(self) -> bool:
+        """Take one upstream call from the budget, refilling it at `budget_per_minute`."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.budget_per_minute, self._tokens + elapsed * self.budget_per_minute / 60.0)
+        
+        if self._tokens < 1.0:
+            self.over_budget += 1
+            return False
+        self._tokens -= 1.0
+        return True
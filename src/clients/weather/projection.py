@@ -0,0 +1,109 @@
+"""
+Projection of OpenWeatherMap responses onto the fields the weather tools use.
+
+OWM payloads carry many fields that are never read (a forecast is 40
+verbose entries). Responses are decoded straight into compact records and
+the full payload is dropped, so the cache, history and in-flight requests
+only hold what the tools, the history store and the location index read.
+Records are tuples, so caches that store JSON (SQLite, snapshots) keep them
+as arrays: `dump_record` turns them into plain lists for encoders that do
+not accept NamedTuples (orjson), and `restore_record` turns arrays back
+into records.
+"""
+
+from typing import Any, Dict, Union
+
+from ...utils.serialization import loads
+from .types import CurrentWeather, ForecastItem, WeatherForecast
+
+WeatherRecord = Union[CurrentWeather, WeatherForecast]
+
+
+def project_current(payload: Dict[str, Any]) -> CurrentWeather:
+    """Project an OWM current weather payload, coercing numbers as the rendered text expects."""
+    main = payload["main"]
+    coord = payload.get("coord") or {}
+    wind_speed = (payload.get("wind") or {}).get("speed")
+    return CurrentWeather(
+        name=payload["name"],
+        country=payload["sys"]["country"],
+        lat=coord.get("lat"),
+        lon=coord.get("lon"),
+        dt=payload["dt"],
+        temperature=float(main["temp"]),
+        description=payload["weather"][0]["description"],
+        humidity=None if main.get("humidity") is None else int(main["humidity"]),
+        wind_speed=None if wind_speed is None else float(wind_speed),
+        pressure=None if main.get("pressure") is None else float(main["pressure"]),
+        visibility=None if payload.get("visibility") is None else float(payload["visibility"])
+    )
+
+
+def project_forecast(payload: Dict[str, Any]) -> WeatherForecast:
+    """Project an OWM forecast payload, keeping numbers as OWM sent them."""
+    city = payload["city"]
+    coord = city.get("coord") or {}
+    return WeatherForecast(
+        name=city["name"],
+        country=city["country"],
+        lat=coord.get("lat"),
+        lon=coord.get("lon"),
+        items=tuple(
+            ForecastItem(
+                dt=item["dt"],
+                dt_txt=item["dt_txt"],
+                temperature=item["main"]["temp"],
+                description=item["weather"][0]["description"],
+                humidity=item["main"].get("humidity"),
+                wind_speed=(item.get("wind") or {}).get("speed"),
+                pressure=item["main"].get("pressure")
+            )
+            for item in payload["list"]
+        )
+    )
+
+
+PROJECTIONS = {
+    "weather": project_current,
+    "forecast": project_forecast
+}
+
+
+def decode_response(endpoint: str, body: bytes) -> WeatherRecord:
+    """
+    Decode an upstream response body into the record of its endpoint.
+    
+    Args:
+        endpoint: "weather" or "forecast"
+        body: Response body (JSON)
+    
+    Returns:
+        The projected record; the parsed payload is not kept
+    """
+    return PROJECTIONS[endpoint](loads(body))
+
+
+def dump_record(value: Any) -> Any:
+    """Turn a record into JSON-native arrays; other values are returned as they are."""
+    if isinstance(value, WeatherForecast):
+        return [*value[:4], [list(item) for item in value.items]]
+    if isinstance(value, CurrentWeather):
+        return list(value)
+    return value
+
+
+def restore_record(endpoint: str, value: Any) -> WeatherRecord:
+    """
+    Turn a cached value back into the record of its endpoint.
+    
+    Records are returned as they are. Arrays are records that went through
+    JSON, and objects are full payloads cached by earlier versions, which
+    are projected.
+    """
+    if isinstance(value, tuple):
+        return value
+    if isinstance(value, dict):
+        return PROJECTIONS[endpoint](value)
+    if endpoint == "weather":
+        return CurrentWeather(*value)
+    return WeatherForecast(*value[:4], tuple(ForecastItem(*item) for item in value[4]))
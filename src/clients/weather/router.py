@@ -3,6 +3,8 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Any
 
+from ...core.validation import ToolArgumentError
+
 # Create weather router
 weather_router = APIRouter(prefix="/weather", tags=["weather"])
 
@@ -17,17 +19,27 @@ def set_weather_client(client):
     weather_client = client
 
 
+def validate_arguments(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate arguments against the tool schema, raising HTTP 422 if they are invalid."""
+    try:
+        return weather_client.validate_arguments(tool_name, arguments)
+    except ToolArgumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @weather_router.post("/current")
 async def get_current_weather(location: str):
     """Get current weather for a location (always in Celsius)."""
     if not weather_client:
         raise HTTPException(status_code=500, detail="Weather client not initialized")
     
+    arguments = validate_arguments("get_current_weather", {
+        "location": location, 
+        "units": "metric"
+    })
+    
     try:
-        result = await weather_client.execute_tool("get_current_weather", {
-            "location": location, 
-            "units": "metric"
-        })
+        result = await weather_client.run_tool("get_current_weather", arguments)
         
         if result.isError:
             raise HTTPException(status_code=400, detail=result.content[0]["text"])
@@ -47,12 +59,14 @@ async def get_weather_forecast(location: str, days: int = 3):
     if not weather_client:
         raise HTTPException(status_code=500, detail="Weather client not initialized")
     
+    arguments = validate_arguments("get_weather_forecast", {
+        "location": location, 
+        "days": days, 
+        "units": "metric"
+    })
+    
     try:
-        result = await weather_client.execute_tool("get_weather_forecast", {
-            "location": location, 
-            "days": days, 
-            "units": "metric"
-        })
+        result = await weather_client.run_tool("get_weather_forecast", arguments)
         
         if result.isError:
             raise HTTPException(status_code=400, detail=result.content[0]["text"])
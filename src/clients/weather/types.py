@@ -1,6 +1,6 @@
 """Weather client type definitions."""
 
-from typing import Any, Dict, List, Optional
+from typing import NamedTuple, Optional, Tuple
 from pydantic import BaseModel
 
 
@@ -9,22 +9,55 @@ class WeatherConfig(BaseModel):
     api_key: str
     base_url: str
     geo_url: str
-
-
-class WeatherData(BaseModel):
-    """Weather data structure."""
-    location: str
-    temperature: float
-    description: str
-    humidity: Optional[int] = None
-    wind_speed: Optional[float] = None
-    pressure: Optional[float] = None
-    visibility: Optional[float] = None
-
-
-class WeatherForecast(BaseModel):
-    """Weather forecast data structure."""
-    location: str
-    forecasts: List[Dict[str, Any]]
-
-
+    current_ttl: float = 600.0
+    forecast_ttl: float = 1800.0
+    negative_ttl: float = 300.0
+    negative_max_entries: int = 512
+    grid_mode: str = "degrees"
+    grid_step: float = 0.01
+    geohash_precision: int = 6
+    prefetch_enabled: bool = True
+    prefetch_top_k: int = 20
+    prefetch_interval: float = 30.0
+    prefetch_ahead: float = 60.0
+    prefetch_budget: float = 10.0
+    prefetch_sketch_size: int = 256
+    history_enabled: bool = True
+    history_path: str = ".cache/history"
+    history_retention_days: float = 30.0
+    history_compact_interval: float = 300.0
+
+
+class CurrentWeather(NamedTuple):
+    """The fields of an OWM current weather response that are used."""
+    name: str                    # Rendering, history key and location index
+    country: str
+    lat: Optional[float]         # Location index
+    lon: Optional[float]
+    dt: float                    # History
+    temperature: float           # Rendering and history
+    description: str             # Rendering
+    humidity: Optional[int]      # Rendering and history
+    wind_speed: Optional[float]
+    pressure: Optional[float]
+    visibility: Optional[float]
+
+
+class ForecastItem(NamedTuple):
+    """The fields of one 3-hour OWM forecast entry that are used, numbers as OWM sent them."""
+    dt: float                    # History
+    dt_txt: str                  # Rendering (date and time of day)
+    temperature: float           # Rendering and history
+    description: str             # Rendering
+    humidity: Optional[float]    # History
+    wind_speed: Optional[float]
+    pressure: Optional[float]
+
+
+class WeatherForecast(NamedTuple):
+    """The fields of an OWM forecast response that are used."""
+    name: str                    # Rendering, history key and location index
+    country: str
+    lat: Optional[float]         # Location index
+    lon: Optional[float]
+    items: Tuple[ForecastItem, ...]
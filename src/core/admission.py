@@ -0,0 +1,228 @@
+"""Admission control and load shedding for tool calls."""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+import asyncio
+import math
+import time
+
+from ..types.common import ToolDefinition
+from ..utils.config import get_admission_config
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call is shed because its tool or the server is at capacity."""
+    
+    def __init__(self, tool_name: str, scope: str, retry_after: int):
+        """Initialize the rejection with the saturated scope ("tool" or "global")."""
+        self.tool_name = tool_name
+        self.scope = scope
+        self.retry_after = retry_after
+        limit = f"tool {tool_name}" if scope == "tool" else "server"
+        super().__init__(f"Server busy: {limit} is at capacity, retry after {retry_after}s")
+
+
+class _Gate:
+    """
+    In-flight limit with a bounded FIFO queue.
+    
+    Callers beyond `limit` wait in the queue; when the queue is full, or a
+    caller has waited `queue_timeout` seconds, the call is rejected.
+    """
+    
+    # Weight of the latest call in the moving average of call durations
+    EWMA_ALPHA = 0.2
+    
+    def __init__(self, limit: int, max_queue: int):
+        """Initialize the gate."""
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.avg_duration = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+    
+    @property
+    def waiting(self) -> int:
+        """Get the number of queued callers."""
+        return len(self._waiters)
+    
+    def retry_after(self) -> int:
+        """Estimate the seconds until a queued slot frees up, from recent call durations."""
+        return max(1, math.ceil(self.avg_duration * (self.waiting + 1) / max(1, self.limit)))
+    
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting in the queue if needed; returns False if the call is shed."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        
+        if len(self._waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait timed out
+                self.admitted += 1
+                return True
+            waiter.cancel()
+            self.shed += 1
+            self.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        
+        self.admitted += 1
+        return True
+    
+    def release(self, duration: Optional[float]) -> None:
+        """Free a slot, handing it to the next queued caller."""
+        if duration is not None:
+            self.avg_duration += self.EWMA_ALPHA * (duration - self.avg_duration)
+        
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter without becoming free
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the gate's counters."""
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "avg_ms": round(self.avg_duration * 1000, 3)
+        }
+
+
+class AdmissionTicket:
+    """Slots held by one admitted call; released exactly once."""
+    
+    def __init__(self, gates: List[_Gate]):
+        """Initialize the ticket for the acquired gates."""
+        self._gates = gates
+        self._started = time.perf_counter()
+        self._released = False
+    
+    def release(self) -> None:
+        """Give the slots back."""
+        if self._released:
+            return
+        self._released = True
+        duration = time.perf_counter() - self._started
+        for gate in self._gates:
+            gate.release(duration)
+
+
+class AdmissionController:
+    """
+    Per-tool and global in-flight limits in front of tool execution.
+    
+    A call first takes a slot of its tool, then a global slot. Each limit
+    has a short FIFO queue; calls that find it full, or wait longer than
+    `queue_timeout`, are rejected with AdmissionRejected, which carries a
+    Retry-After estimate. Tools set their own limits with the
+    `max_concurrency` and `max_queue` of their ToolDefinition.
+    """
+    
+    def __init__(
+        self,
+        max_in_flight: int = 256,
+        max_queue: int = 128,
+        tool_concurrency: int = 64,
+        tool_queue: int = 32,
+        queue_timeout: float = 5.0
+    ):
+        """Initialize the controller."""
+        self.tool_concurrency = tool_concurrency
+        self.tool_queue = tool_queue
+        self.queue_timeout = queue_timeout
+        self._global = _Gate(max_in_flight, max_queue)
+        self._tools: Dict[str, _Gate] = {}
+    
+    def _tool_gate(self, tool: ToolDefinition) -> _Gate:
+        """Get the gate of a tool, creating it with the tool's limits on first use."""
+        gate = self._tools.get(tool.name)
+        if gate is None:
+            gate = self._tools[tool.name] = _Gate(
+                tool.max_concurrency or self.tool_concurrency,
+                self.tool_queue if tool.max_queue is None else tool.max_queue
+            )
+        return gate
+    
+    async def acquire(self, tool: ToolDefinition) -> AdmissionTicket:
+        """Admit a call, raising AdmissionRejected if it is shed."""
+        deadline = time.monotonic() + self.queue_timeout
+        
+        tool_gate = self._tool_gate(tool)
+        if not await tool_gate.acquire(self.queue_timeout):
+            raise AdmissionRejected(tool.name, "tool", tool_gate.retry_after())
+        
+        try:
+            admitted = await self._global.acquire(max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            tool_gate.release(None)
+            raise
+        if not admitted:
+            tool_gate.release(None)
+            raise AdmissionRejected(tool.name, "global", self._global.retry_after())
+        
+        return AdmissionTicket([self._global, tool_gate])
+    
+    @asynccontextmanager
+    async def admit(self, tool: ToolDefinition) -> AsyncIterator[AdmissionTicket]:
+        """Hold slots for a call for the duration of the block."""
+        ticket = await self.acquire(tool)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the global and per-tool queue depths, in-flight counts and shed counts."""
+        return {
+            "queue_timeout_s": self.queue_timeout,
+            "global": self._global.stats(),
+            "tools": {name: gate.stats() for name, gate in self._tools.items()}
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide admission controller, creating it from the environment on first use."""
+    global _controller
+    if _controller is None:
+        config = get_admission_config()
+        _controller = AdmissionController(
+            max_in_flight=config["max_in_flight"],
+            max_queue=config["max_queue"],
+            tool_concurrency=config["tool_concurrency"],
+            tool_queue=config["tool_queue"],
+            queue_timeout=config["queue_timeout"]
+        )
+    return _controller
@@ -0,0 +1,176 @@
+"""Allocation accounting with tracemalloc: per-tool counters and top allocation sites."""
+
+from typing import Any, Dict, Optional, Tuple
+import linecache
+import logging
+import time
+import tracemalloc
+
+from ..utils.config import get_allocation_config
+
+logger = logging.getLogger(__name__)
+
+
+class _ToolAllocations:
+    """Allocation counters of one tool."""
+    
+    __slots__ = ("calls", "net_bytes", "max_net_bytes", "max_peak_bytes")
+    
+    def __init__(self):
+        self.calls = 0
+        self.net_bytes = 0
+        self.max_net_bytes = 0
+        self.max_peak_bytes = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the counters with the mean net bytes per call."""
+        return {
+            "calls": self.calls,
+            "mean_net_bytes": round(self.net_bytes / self.calls) if self.calls else 0,
+            "max_net_bytes": self.max_net_bytes,
+            "max_peak_bytes": self.max_peak_bytes,
+            "total_net_bytes": self.net_bytes
+        }
+
+
+class AllocationTracker:
+    """
+    Per-tool allocation counters and allocation-site snapshots, from tracemalloc.
+    
+    While tracing, the tool executor measures every step of a coroutine tool
+    (the code between two awaits, which runs alone on the event loop): the
+    change in traced memory is charged to the tool as net bytes (what the
+    call left allocated, e.g. cache entries or a leak) and the peak above
+    the step's start as its transient working set. Thread and process tools
+    run alongside other code and are not counted.
+    
+    Tracing slows allocations down noticeably, so it is off unless enabled
+    by configuration or at runtime.
+    """
+    
+    def __init__(self, frames: int = 1):
+        """
+        Initialize the tracker.
+        
+        Args:
+            frames: Stack frames stored per allocation (more frames attribute
+                sites better and cost more memory)
+        """
+        self.frames = frames
+        self.started_at: Optional[float] = None
+        self._tools: Dict[str, _ToolAllocations] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether allocations are being traced."""
+        return tracemalloc.is_tracing()
+    
+    def start(self) -> None:
+        """Start tracing allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.started_at = time.time()
+            self._baseline = None
+            logger.info(f"Tracing allocations ({self.frames} frames)")
+    
+    def stop(self) -> None:
+        """Stop tracing and forget the traces; counters are kept."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            self.started_at = None
+            self._baseline = None
+            logger.info("Stopped tracing allocations")
+    
+    def begin_step(self) -> int:
+        """Mark the start of a step, returning the traced memory to pass to end_step."""
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+    
+    def end_step(self, started: int) -> Tuple[int, int]:
+        """Get the net and peak bytes a step allocated since begin_step."""
+        current, peak = tracemalloc.get_traced_memory()
+        return current - started, max(peak - started, 0)
+    
+    def record(self, label: str, net_bytes: int, peak_bytes: int) -> None:
+        """Charge a finished call to its tool."""
+        counters = self._tools.get(label)
+        if counters is None:
+            counters = self._tools[label] = _ToolAllocations()
+        counters.calls += 1
+        counters.net_bytes += net_bytes
+        counters.max_net_bytes = max(counters.max_net_bytes, net_bytes)
+        counters.max_peak_bytes = max(counters.max_peak_bytes, peak_bytes)
+    
+    def top_sites(self, limit: int = 20, group_by: str = "lineno") -> Dict[str, Any]:
+        """
+        Get the allocation sites holding the most memory, and their growth.
+        
+        Growth is measured against the previous call, so calling this
+        periodically shows which sites keep growing.
+        
+        Args:
+            limit: Sites to list
+            group_by: "lineno", "filename" or "traceback"
+        
+        Returns:
+            Traced memory, and per site its size, block count and growth since the previous call
+        """
+        if not tracemalloc.is_tracing():
+            return {"tracing": False, "sites": []}
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, linecache.__file__)
+        ))
+        current = tracemalloc.get_traced_memory()[0]
+        
+        if self._baseline is not None:
+            stats = snapshot.compare_to(self._baseline, group_by)
+            sites = [_describe_site(stat.traceback, stat.size, stat.count, stat.size_diff) for stat in stats[:limit]]
+        else:
+            stats = snapshot.statistics(group_by)
+            sites = [_describe_site(stat.traceback, stat.size, stat.count, None) for stat in stats[:limit]]
+        
+        previous = self._baseline
+        self._baseline = snapshot
+        return {
+            "tracing": True,
+            "traced_bytes": current,
+            "overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "since": self.started_at,
+            "compared_to_previous": previous is not None,
+            "sites": sites
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get whether tracing is on, the traced memory and the per-tool counters."""
+        return {
+            "tracing": self.enabled,
+            "traced_bytes": tracemalloc.get_traced_memory()[0] if self.enabled else None,
+            "tools": {label: counters.to_dict() for label, counters in sorted(self._tools.items())}
+        }
+
+
+def _describe_site(traceback: tracemalloc.Traceback, size: int, count: int, growth: Optional[int]) -> Dict[str, Any]:
+    """Describe an allocation site by its innermost frames."""
+    return {
+        "site": " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in reversed(list(traceback)[-3:])),
+        "size_bytes": size,
+        "blocks": count,
+        "growth_bytes": growth
+    }
+
+
+_tracker: Optional[AllocationTracker] = None
+
+
+def get_allocation_tracker() -> AllocationTracker:
+    """Get the process-wide allocation tracker, tracing from first use if configured."""
+    global _tracker
+    if _tracker is None:
+        config = get_allocation_config()
+        _tracker = AllocationTracker(frames=config["frames"])
+        if config["enabled"]:
+            _tracker.start()
+    return _tracker
@@ -1,20 +1,36 @@
 """Base client abstract class for all MCP clients."""
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 import logging
 
 from ..types.common import ToolDefinition, ToolResult, ClientConfig
+from .executor import get_tool_executor
+from .validation import ArgumentValidator, compile_schema
+
+# Methods that implement the tools of each execution mode besides "async"
+EXECUTION_HOOKS = {"thread": "execute_tool_sync", "process": "execute_tool_in_process"}
 
 
 class BaseClient(ABC):
-    """Abstract base class for all MCP clients."""
+    """
+    Abstract base class for all MCP clients.
+    
+    Tools declared with `execution="thread"` are implemented in an
+    `execute_tool_sync(tool_name, arguments)` method, which runs in the
+    shared thread pool and may block. Tools declared with
+    `execution="process"` are implemented in an
+    `execute_tool_in_process(tool_name, arguments)` classmethod, which runs
+    in the shared process pool without a client instance, so its arguments
+    and ToolResult must be picklable and it must not rely on client state.
+    """
     
     def __init__(self, config: ClientConfig):
         """Initialize the client with configuration."""
         self.config = config
         self.logger = logging.getLogger(f"{__name__}.{config.name}")
         self._tools: Dict[str, ToolDefinition] = {}
+        self._validators: Dict[str, ArgumentValidator] = {}
         self._initialize_tools()
     
     @abstractmethod
@@ -24,18 +40,126 @@ class BaseClient(ABC):
     
     @abstractmethod
     async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
-        """Execute a tool with the given arguments."""
+        """Execute an "async" tool with the given arguments."""
+        pass
+    
+    async def run_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute a tool in its declared execution mode; the entry point used by the front ends."""
+        return await get_tool_executor().run(self, tool_name, arguments)
+    
+    async def run_tool_stream(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """Stream a tool in its declared execution mode; the entry point used by the front ends."""
+        async for partial in get_tool_executor().stream(self, tool_name, arguments):
+            yield partial
+    
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """
+        Execute a tool, yielding partial results as they become available.
+        
+        Clients whose tools produce output incrementally override this with an
+        async generator. The default yields the result of `execute_tool` as a
+        single chunk. A chunk with `isError` set ends the stream.
+        """
+        yield await self.execute_tool(tool_name, arguments)
+    
+    async def start(self) -> None:
+        """Start background work; called by the front ends once the event loop is running."""
+        pass
+    
+    async def close(self) -> None:
+        """Stop background work and release resources on shutdown."""
         pass
     
+    def snapshot(self) -> Dict[str, Iterable[Tuple[str, Any, float]]]:
+        """
+        Get state worth keeping across restarts, such as warm caches.
+        
+        Returns:
+            Named sections of (key, JSON-native value, wall-clock expiry or 0) records
+        """
+        return {}
+    
+    def restore(self, section: str, records: Iterable[Tuple[str, Any, float]]) -> int:
+        """
+        Restore a section returned by `snapshot()` in a previous run.
+        
+        Returns:
+            The number of records restored
+        """
+        return 0
+    
+    def get_tool(self, tool_name: str) -> ToolDefinition:
+        """Get the definition of a tool."""
+        return self._tools[tool_name]
+    
     def get_tools(self) -> List[ToolDefinition]:
         """Get all available tools for this client."""
         return list(self._tools.values())
     
     def register_tool(self, tool: ToolDefinition) -> None:
-        """Register a tool with this client."""
+        """
+        Register a tool with this client, compiling its input schema once.
+        
+        Raises ValueError if the client does not define the method that runs
+        the tool's execution mode (see EXECUTION_HOOKS).
+        """
+        hook = EXECUTION_HOOKS.get(tool.execution)
+        if hook is not None and not callable(getattr(type(self), hook, None)):
+            raise ValueError(f"Tool {tool.name} runs in execution mode \"{tool.execution}\", but {type(self).__name__} does not define {hook}")
+        
         self._tools[tool.name] = tool
+        self._validators[tool.name] = compile_schema(tool.name, tool.inputSchema)
         self.logger.info(f"Registered tool: {tool.name}")
     
+    def validate_arguments(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate tool arguments against the tool's input schema.
+        
+        Returns the arguments coerced to their schema types with defaults
+        applied; raises ToolArgumentError if they are invalid.
+        """
+        return self._validators[tool_name](arguments)
+    
+    def shard_key(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the key that decides which node of a sharded cluster serves a call.
+        
+        Calls with the same key go to the same node, so its caches serve them
+        all. The default of None routes calls by their tool result cache key,
+        if the tool has one, and otherwise serves them on any node.
+        """
+        return None
+    
+    async def route_key(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Get the shard key of a call from the server; proxies of clients in other processes override this."""
+        return self.shard_key(tool_name, arguments)
+    
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        """
+        Get the URI templates of the resources this client serves through `read_resource`.
+        
+        Returns:
+            MCP resource templates: dicts with uriTemplate, name, description and mimeType
+        """
+        return []
+    
+    async def read_resource(self, uri: str) -> Optional[str]:
+        """
+        Read a resource of this client, whose URIs use the client name as scheme.
+        
+        Resources are also what MCP clients subscribe to: the server polls
+        them and notifies subscribers when the returned text changes.
+        
+        Returns:
+            The resource text, or None if the client does not serve the URI;
+            raises ValueError if the URI names something that does not exist
+        """
+        return None
+    
+    def get_execution_mode(self, tool_name: str) -> str:
+        """Get how a tool runs: "async", "thread" or "process"."""
+        return self._tools[tool_name].execution
+    
     def has_tool(self, tool_name: str) -> bool:
         """Check if the client has a specific tool."""
         return tool_name in self._tools
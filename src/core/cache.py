@@ -0,0 +1,307 @@
+"""Result cache backends shared by clients."""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache(ABC):
+    """
+    Key/value cache with per-entry TTL.
+    
+    Values must be JSON-serializable so every backend can store them.
+    Expiry times are wall-clock timestamps, which keeps entries meaningful
+    across processes and restarts.
+    """
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if it is missing or expired."""
+        pass
+    
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+        pass
+    
+    @abstractmethod
+    def expires_in(self, key: str) -> Optional[float]:
+        """Get the seconds until a value expires, or None if it is missing or expired."""
+        pass
+    
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove a value."""
+        pass
+    
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all values."""
+        pass
+    
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        pass
+    
+    def dump(self) -> Iterator[Tuple[str, Any, float]]:
+        """
+        Iterate over live entries as (key, value, expires_at) for warm-cache snapshots.
+        
+        Persistent backends already survive restarts and yield nothing.
+        """
+        return iter(())
+    
+    def restore(self, key: str, value: Any, expires_at: float) -> None:
+        """Put back an entry from a snapshot, keeping its original expiry."""
+        pass
+
+
+class MemoryCache(ResultCache):
+    """In-process LRU cache bounded by entry count."""
+    
+    def __init__(self, max_entries: int = 1024):
+        """Initialize the cache."""
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds, evicting the least recently used entry when full."""
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def expires_in(self, key: str) -> Optional[float]:
+        """Get the seconds until a value expires, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.time()
+        return remaining if remaining > 0 else None
+    
+    def delete(self, key: str) -> None:
+        """Remove a value."""
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove all values."""
+        self._entries.clear()
+    
+    def dump(self) -> Iterator[Tuple[str, Any, float]]:
+        """Iterate over live entries, least recently used first."""
+        now = time.time()
+        for key, (expires_at, value) in self._entries.items():
+            if expires_at > now:
+                yield key, value, expires_at
+    
+    def restore(self, key: str, value: Any, expires_at: float) -> None:
+        """Put back an entry from a snapshot unless it has expired since."""
+        if expires_at <= time.time():
+            return
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class SQLiteCache(ResultCache):
+    """
+    Cache shared by all processes on a host, stored in a SQLite database in WAL mode.
+    
+    Each entry is written by a single INSERT OR REPLACE, so readers in other
+    workers never see partial values. WAL lets reads proceed without taking
+    the write lock, and reads never write (no access-time bookkeeping), so
+    eviction is oldest-written-first once the namespace exceeds `max_bytes`.
+    Each namespace is bounded on its own, so one owner's writes never evict
+    another's entries.
+    """
+    
+    # Check the on-disk footprint every N writes rather than on each one
+    EVICTION_CHECK_INTERVAL = 64
+    
+    def __init__(self, path: str, namespace: str = "default", max_bytes: int = 64 * 1024 * 1024):
+        """Open (or create) the cache database."""
+        self.path = path
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._local = threading.local()
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " size INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_created ON cache_entries (created_at)")
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def _key(self, key: str) -> str:
+        """Prefix a key with the namespace."""
+        return f"{self.namespace}:{key}"
+    
+    def _bounds(self) -> Tuple[str, str]:
+        """Get the key range of the namespace, for `key >= ? AND key < ?` (";" follows ":")."""
+        return f"{self.namespace}:", f"{self.namespace};"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if it is missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (self._key(key), time.time())
+        ).fetchone()
+        
+        if row is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return json.loads(row[0])
+    
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        now = time.time()
+        
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, created_at, size) VALUES (?, ?, ?, ?, ?)",
+            (self._key(key), payload, now + ttl, now, len(payload))
+        )
+        
+        self._writes += 1
+        if self._writes % self.EVICTION_CHECK_INTERVAL == 0:
+            self.evict()
+    
+    def expires_in(self, key: str) -> Optional[float]:
+        """Get the seconds until a value expires, or None if it is missing or expired."""
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (self._key(key), now)
+        ).fetchone()
+        return row[0] - now if row else None
+    
+    def delete(self, key: str) -> None:
+        """Remove a value."""
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (self._key(key),))
+    
+    def clear(self) -> None:
+        """Remove all values in this namespace."""
+        self._connection().execute("DELETE FROM cache_entries WHERE key >= ? AND key < ?", self._bounds())
+    
+    def evict(self) -> None:
+        """Drop expired entries of the namespace, then its oldest ones until it fits in `max_bytes`."""
+        conn = self._connection()
+        bounds = self._bounds()
+        conn.execute("DELETE FROM cache_entries WHERE key >= ? AND key < ? AND expires_at <= ?", (*bounds, time.time()))
+        
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE key >= ? AND key < ?", bounds).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entries WHERE key >= ? AND key < ? ORDER BY created_at", bounds):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+        logger.info(f"Evicted {len(doomed)} {self.namespace} cache entries ({freed} bytes) from {self.path}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get backend statistics."""
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE key >= ? AND key < ?",
+            self._bounds()
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+def create_cache(namespace: str, cache_config: Dict[str, Any]) -> ResultCache:
+    """
+    Create the configured cache backend for a namespace.
+    
+    Args:
+        namespace: Keeps entries of different owners apart in shared backends
+        cache_config: Settings from `get_cache_config()`
+    
+    Returns:
+        A MemoryCache, or a SQLiteCache shared across worker processes
+    """
+    backend = cache_config["backend"]
+    
+    if backend == "sqlite":
+        return SQLiteCache(cache_config["path"], namespace=namespace, max_bytes=cache_config["max_bytes"])
+    if backend == "memory":
+        return MemoryCache(max_entries=cache_config["max_entries"])
+    
+    raise ValueError(f"Unknown cache backend: {backend}")
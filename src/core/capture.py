@@ -0,0 +1,167 @@
+"""Capture of tool-call and upstream traffic for replay."""
+
+from typing import Any, Dict, Optional
+import json
+import logging
+import os
+import threading
+
+from ..utils.config import get_capture_config
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficCapture:
+    """
+    Appends tool calls, and the upstream responses they caused, to a JSONL file.
+    
+    Each line is one JSON object with a `type` of "call" or "upstream" and a
+    wall-clock `ts` (seconds). Lines are written with a single append, so the
+    workers of the production server can share one file. `scripts/replay.py`
+    re-drives the calls against a server, and `scripts/owm_standin.py` serves
+    the recorded upstream responses so the replay is deterministic.
+    """
+    
+    def __init__(self, path: str, enabled: bool = False, upstream: bool = True, max_bytes: int = 1024 * 1024 * 1024):
+        """
+        Initialize the capture.
+        
+        Args:
+            path: JSONL file to append to
+            enabled: Whether anything is recorded
+            upstream: Whether upstream responses are recorded along with the calls
+            max_bytes: File size after which recording stops
+        """
+        self.path = path
+        self.enabled = enabled
+        self.upstream = enabled and upstream
+        self.max_bytes = max_bytes
+        self.records = 0
+        self.dropped = 0
+        self._fd: Optional[int] = None
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def record_call(
+        self,
+        source: str,
+        label: Optional[str],
+        tool: str,
+        arguments: Dict[str, Any],
+        started: float,
+        latency: float,
+        status: int,
+        size: Optional[int],
+        cache: Optional[str] = None
+    ) -> None:
+        """
+        Record a tool call.
+        
+        Args:
+            source: Where the call was received ("http", "forwarded", "bridge")
+            label: Name of the caller's API key
+            tool: Tool name
+            arguments: Arguments as received
+            started: Wall-clock time the call started
+            latency: Seconds until the response was ready
+            status: HTTP status of the response
+            size: Response body bytes, or None for streamed responses
+            cache: "hit" when answered by the tool result cache
+        """
+        if not self.enabled:
+            return
+        self._write({
+            "type": "call",
+            "ts": round(started, 6),
+            "source": source,
+            "label": label,
+            "tool": tool,
+            "arguments": arguments,
+            "latency_ms": round(latency * 1000, 3),
+            "status": status,
+            "bytes": size,
+            "cache": cache
+        })
+    
+    def record_upstream(self, endpoint: str, params: Dict[str, Any], started: float, latency: float, status: int, body: str) -> None:
+        """
+        Record an upstream response.
+        
+        Args:
+            endpoint: API path below the upstream base URL (e.g. "weather")
+            params: Query parameters, without credentials
+            started: Wall-clock time the request was sent
+            latency: Seconds until the response arrived
+            status: HTTP status of the response
+            body: Response body
+        """
+        if not self.upstream:
+            return
+        self._write({
+            "type": "upstream",
+            "ts": round(started, 6),
+            "endpoint": endpoint,
+            "params": params,
+            "latency_ms": round(latency * 1000, 3),
+            "status": status,
+            "body": body
+        })
+    
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Append one record as a line, stopping once the file reaches max_bytes."""
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        
+        with self._lock:
+            try:
+                if self._fd is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                    self._size = os.fstat(self._fd).st_size
+                
+                if self._size + len(line) > self.max_bytes:
+                    if not self.dropped:
+                        logger.warning(f"Traffic capture {self.path} reached {self.max_bytes} bytes, recording stopped")
+                    self.dropped += 1
+                    return
+                
+                os.write(self._fd, line)
+                self._size += len(line)
+                self.records += 1
+            except OSError as e:
+                self.dropped += 1
+                logger.warning(f"Traffic capture write failed: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the capture file, records written and records dropped."""
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "records": self.records,
+            "dropped": self.dropped
+        }
+    
+    def close(self) -> None:
+        """Close the capture file."""
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+_traffic_capture: Optional[TrafficCapture] = None
+
+
+def get_traffic_capture() -> TrafficCapture:
+    """Get the process-wide traffic capture, as configured by the environment."""
+    global _traffic_capture
+    if _traffic_capture is None:
+        config = get_capture_config()
+        _traffic_capture = TrafficCapture(
+            config["path"],
+            enabled=config["enabled"],
+            upstream=config["upstream"],
+            max_bytes=config["max_bytes"]
+        )
+        if _traffic_capture.enabled:
+            logger.info(f"Capturing traffic to {_traffic_capture.path}")
+    return _traffic_capture
@@ -0,0 +1,85 @@
+"""Built-in client exposing the tool catalog to agents."""
+
+from typing import Any, Dict, List
+
+from ..types.common import ClientConfig, ToolDefinition, ToolResult
+from ..utils.serialization import dumps
+from .base_client import BaseClient
+
+# Name under which the catalog client is registered
+CATALOG_CLIENT_NAME = "catalog"
+
+SEARCH_TOOLS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "minLength": 1,
+            "description": "What the tool should do, in a few words (e.g. 'weather forecast for a city')"
+        },
+        "limit": {
+            "type": "integer",
+            "minimum": 1,
+            "maximum": 50,
+            "default": 5,
+            "description": "Maximum number of tools to return"
+        },
+        "client": {
+            "type": "string",
+            "description": "Only search the tools of this client"
+        },
+        "fields": {
+            "type": "string",
+            "enum": ["names", "summary", "full"],
+            "default": "full",
+            "description": "Return names only, names and descriptions, or also input schemas"
+        }
+    },
+    "required": ["query"]
+}
+
+
+def describe_matches(matches: List[Any], fields: str) -> List[Dict[str, Any]]:
+    """Describe search results with the requested fields."""
+    described = []
+    for score, client_name, tool in matches:
+        info: Dict[str, Any] = {"name": tool.name, "client": client_name, "score": round(score, 3)}
+        if fields != "names":
+            info["description"] = tool.description
+        if fields == "full":
+            info["input_schema"] = tool.inputSchema
+        described.append(info)
+    return described
+
+
+class CatalogClient(BaseClient):
+    """Serves `search_tools`, so agents can find relevant tools without listing the whole catalog."""
+    
+    def __init__(self, registry: Any):
+        """Initialize the client over a registry."""
+        self.registry = registry
+        super().__init__(ClientConfig(
+            name=CATALOG_CLIENT_NAME,
+            description="Search the tools offered by this server"
+        ))
+    
+    def _initialize_tools(self) -> None:
+        """Initialize the catalog tools."""
+        self.register_tool(ToolDefinition(
+            name="search_tools",
+            description="Find the tools best suited to a task by searching tool names, descriptions and parameters",
+            inputSchema=SEARCH_TOOLS_SCHEMA
+        ))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute a catalog tool."""
+        if tool_name != "search_tools":
+            raise ValueError(f"Unknown tool: {tool_name}")
+        
+        matches = self.registry.search_tools(
+            arguments["query"],
+            limit=arguments.get("limit", 5),
+            client=arguments.get("client")
+        )
+        payload = {"tools": describe_matches(matches, arguments.get("fields", "full"))}
+        return ToolResult(content=[{"type": "text", "text": dumps(payload).decode("utf-8")}])
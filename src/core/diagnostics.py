@@ -0,0 +1,406 @@
+"""Live diagnostics: sampling profiler, asyncio task dump and event-loop lag."""
+
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import weakref
+
+from .allocations import get_allocation_tracker
+from ..utils.config import get_diagnostics_config
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+    pass
+
+
+def _frame_label(frame: Any) -> str:
+    """Label a frame by its function and where the function is defined."""
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stack(frame: Any) -> List[str]:
+    """Get the labels of a frame and its callers, outermost first."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _await_chain(coro: Any, depth: int) -> List[str]:
+    """
+    Follow a suspended coroutine through what it awaits, outermost first.
+    
+    A task's own stack ends at its coroutine; the awaited coroutines show
+    where it is actually waiting, down to the future it waits on.
+    """
+    chain = []
+    while coro is not None and len(chain) < depth:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            chain.append(f"<{type(coro).__name__}>")
+            break
+        chain.append(f"{_frame_label(frame)} line {frame.f_lineno}")
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return chain
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stacks of running threads.
+    
+    A background thread reads every sampled thread's current frame at a fixed
+    interval, so the profiled code runs unmodified and the cost is one stack
+    walk per sample. Samples are folded into collapsed stacks
+    (`outer;inner;leaf count` per line), the input of flamegraph.pl,
+    speedscope and similar tools. Only one profile runs at a time.
+    """
+    
+    def __init__(self, interval: float = 0.01, max_seconds: float = 60.0):
+        """
+        Initialize the profiler.
+        
+        Args:
+            interval: Default seconds between samples
+            max_seconds: Longest profile that may be requested
+        """
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.profiles = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        """Whether a profile is being taken."""
+        return self._lock.locked()
+    
+    def profile(self, seconds: float, interval: Optional[float] = None, thread_ids: Optional[List[int]] = None) -> Tuple[str, int]:
+        """
+        Sample stacks for a number of seconds, blocking the calling thread.
+        
+        Args:
+            seconds: Duration, capped at max_seconds
+            interval: Seconds between samples (default: the profiler's)
+            thread_ids: Threads to sample (default: every thread but this one);
+                when several are sampled, stacks start with the thread name
+        
+        Returns:
+            (collapsed stacks, number of samples)
+        
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        
+        try:
+            seconds = min(max(seconds, 0.0), self.max_seconds)
+            interval = max(interval or self.interval, 0.001)
+            own = threading.get_ident()
+            label_threads = thread_ids is None or len(thread_ids) > 1
+            stacks: Counter = Counter()
+            samples = 0
+            
+            deadline = time.monotonic() + seconds
+            while True:
+                names = {thread.ident: thread.name for thread in threading.enumerate()} if label_threads else {}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own or (thread_ids is not None and ident not in thread_ids):
+                        continue
+                    labels = _stack(frame)
+                    if label_threads:
+                        labels.insert(0, names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(labels)] += 1
+                samples += 1
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(interval, remaining))
+            
+            self.profiles += 1
+            collapsed = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+            return collapsed, samples
+        finally:
+            self._lock.release()
+    
+    async def profile_async(self, seconds: float, interval: Optional[float] = None, thread_ids: Optional[List[int]] = None) -> Tuple[str, int]:
+        """Take a profile from a background thread without blocking the event loop."""
+        if self.running:
+            raise ProfilerBusyError("A profile is already running")
+        
+        loop = asyncio.get_running_loop()
+        result: "asyncio.Future[Tuple[str, int]]" = loop.create_future()
+        
+        def run() -> None:
+            try:
+                outcome = self.profile(seconds, interval, thread_ids)
+            except BaseException as e:
+                loop.call_soon_threadsafe(_settle, result, None, e)
+            else:
+                loop.call_soon_threadsafe(_settle, result, outcome, None)
+        
+        threading.Thread(target=run, name="sampling-profiler", daemon=True).start()
+        return await result
+
+
+def _settle(future: "asyncio.Future[Any]", result: Any, error: Optional[BaseException]) -> None:
+    """Complete a future from the loop thread, unless its waiter went away."""
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class TaskTracker:
+    """
+    Records when each asyncio task was created, for task dumps with ages.
+    
+    Installed as the loop's task factory, wrapping any factory already set.
+    Tasks created before installation are listed without an age.
+    """
+    
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self._created: "weakref.WeakKeyDictionary[asyncio.Task, float]" = weakref.WeakKeyDictionary()
+    
+    def install(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install the tracker as the task factory of a loop."""
+        previous = loop.get_task_factory()
+        if getattr(previous, "tracker", None) is self:
+            return
+        
+        def factory(loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any) -> "asyncio.Future[Any]":
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            try:
+                self._created[task] = time.monotonic()
+            except TypeError:
+                pass
+            return task
+        
+        factory.tracker = self  # type: ignore[attr-defined]
+        loop.set_task_factory(factory)
+    
+    def dump(self, loop: asyncio.AbstractEventLoop, limit: int = 100, stack_depth: int = 10) -> Dict[str, Any]:
+        """
+        Describe the loop's pending tasks, oldest first.
+        
+        Must be called from the loop's thread.
+        
+        Args:
+            loop: Event loop whose tasks are listed
+            limit: Most tasks to describe
+            stack_depth: Coroutines of each await chain to include (0 for none)
+        
+        Returns:
+            Total pending tasks and, per task, its name, coroutine, age in
+            seconds and the chain of coroutines it is suspended in
+        """
+        now = time.monotonic()
+        ages = {}
+        for task in asyncio.all_tasks(loop):
+            if not task.done():
+                created = self._created.get(task)
+                ages[task] = round(now - created, 3) if created is not None else None
+        
+        # Oldest first, then the tasks created before the tracker was installed
+        tasks = sorted(ages, key=lambda task: (ages[task] is None, -(ages[task] or 0.0)))
+        described = []
+        for task in tasks[:limit]:
+            coro = task.get_coro()
+            entry = {
+                "name": task.get_name(),
+                "coroutine": getattr(coro, "__qualname__", repr(coro)),
+                "age_s": ages[task]
+            }
+            if stack_depth:
+                entry["awaiting"] = _await_chain(coro, stack_depth)
+            described.append(entry)
+        
+        return {"pending": len(tasks), "tasks": described}
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic timer fires.
+    
+    A timer is scheduled every interval; the delay between when it should
+    have fired and when it did is time the loop spent on other callbacks.
+    Percentiles cover the samples of the last window seconds.
+    """
+    
+    def __init__(self, interval: float = 0.1, window: float = 60.0):
+        """
+        Initialize the monitor.
+        
+        Args:
+            interval: Seconds between timer samples
+            window: Seconds of samples kept for percentiles
+        """
+        self.interval = interval
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=max(int(window / interval), 1))
+        self.worst = 0.0
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    @property
+    def running(self) -> bool:
+        """Whether the loop is being sampled."""
+        return self._handle is not None
+    
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Start sampling on a loop (default: the running loop)."""
+        if self._handle is not None:
+            return
+        self._loop = loop or asyncio.get_running_loop()
+        self._schedule()
+    
+    def _schedule(self) -> None:
+        """Schedule the next timer sample."""
+        assert self._loop is not None
+        expected = self._loop.time() + self.interval
+        self._handle = self._loop.call_at(expected, self._sample, expected)
+    
+    def _sample(self, expected: float) -> None:
+        """Record how late the timer fired and schedule the next one."""
+        assert self._loop is not None
+        lag = max(self._loop.time() - expected, 0.0)
+        self.samples.append((time.time(), lag))
+        self.worst = max(self.worst, lag)
+        self._schedule()
+    
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get lag percentiles in milliseconds over the window, and the worst lag since start."""
+        lags = sorted(lag for _, lag in self.samples)
+        
+        def percentile(fraction: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * fraction))] * 1000, 3) if lags else 0.0
+        
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": len(lags),
+            "lag_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99), "max": percentile(1.0)},
+            "worst_ms": round(self.worst * 1000, 3)
+        }
+
+
+class Diagnostics:
+    """The profiler, task tracker, lag monitor and allocation snapshots of one process."""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize the diagnostics from `get_diagnostics_config()`."""
+        self.enabled = config["enabled"]
+        # API keys allowed on the debug endpoints; empty allows every valid key
+        self.api_keys = frozenset(config["api_keys"])
+        self.dump_path = config["dump_path"]
+        self.signal_profile_seconds = config["signal_profile_seconds"]
+        self.profiler = SamplingProfiler(interval=config["profile_interval_ms"] / 1000, max_seconds=config["profile_max_seconds"])
+        self.tasks = TaskTracker()
+        self.lag = LoopLagMonitor(interval=config["lag_interval_ms"] / 1000, window=config["lag_window"])
+        self.allocations = get_allocation_tracker()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+    
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None, monitor_lag: bool = True) -> None:
+        """Track tasks and, unless the loop blocks by design, its lag."""
+        self.loop = loop or asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.tasks.install(self.loop)
+        if monitor_lag:
+            self.lag.start(self.loop)
+    
+    def stop(self) -> None:
+        """Stop monitoring lag."""
+        self.lag.stop()
+    
+    def install_signal_handler(self, signum: Optional[int] = None) -> bool:
+        """
+        Write a diagnostic dump when the process receives a signal (SIGUSR1 by default).
+        
+        The handler runs on the main thread between bytecodes, so it also
+        fires while the loop is blocked, e.g. in a blocking stdin read. It
+        writes the pending tasks, lag and, while allocations are traced, the
+        top allocation sites (with their growth since the previous dump) to
+        `debug-<pid>-<time>.json` under dump_path, then profiles every thread
+        for signal_profile_seconds (unless 0) in the background into
+        `profile-<pid>-<time>.collapsed`.
+        
+        Returns:
+            Whether the handler was installed (not on platforms without the signal)
+        """
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        
+        signal.signal(signum, lambda received, frame: self.dump_to_files())
+        logger.info(f"Diagnostic dumps on signal {signum} to {self.dump_path}")
+        return True
+    
+    def dump_to_files(self) -> List[str]:
+        """Write a task, lag and allocation dump, and start a profile written to a file when done."""
+        os.makedirs(self.dump_path, exist_ok=True)
+        stamp = f"{os.getpid()}-{time.strftime('%Y%m%dT%H%M%S')}"
+        dump_file = os.path.join(self.dump_path, f"debug-{stamp}.json")
+        profile_file = os.path.join(self.dump_path, f"profile-{stamp}.collapsed")
+        
+        dump: Dict[str, Any] = {"pid": os.getpid(), "time": time.time()}
+        if self.lag.running:
+            dump["lag"] = self.lag.stats()
+        if self.loop is not None and threading.get_ident() == self.loop_thread:
+            dump["tasks"] = self.tasks.dump(self.loop)
+        if self.allocations.enabled:
+            dump["allocations"] = {**self.allocations.top_sites(), "tools": self.allocations.stats()["tools"]}
+        with open(dump_file, "w", encoding="utf-8") as f:
+            json.dump(dump, f, indent=2)
+        logger.info(f"Wrote diagnostic dump to {dump_file}")
+        
+        if self.signal_profile_seconds <= 0:
+            return [dump_file]
+        
+        def profile() -> None:
+            try:
+                collapsed, samples = self.profiler.profile(self.signal_profile_seconds)
+            except ProfilerBusyError:
+                logger.warning("Skipped signal profile: a profile is already running")
+                return
+            with open(profile_file, "w", encoding="utf-8") as f:
+                f.write(collapsed)
+            logger.info(f"Wrote {samples} profile samples to {profile_file}")
+        
+        threading.Thread(target=profile, name="signal-profiler", daemon=True).start()
+        return [dump_file, profile_file]
+
+
+_diagnostics: Optional[Diagnostics] = None
+
+
+def get_diagnostics() -> Diagnostics:
+    """Get the process-wide diagnostics, as configured by the environment."""
+    global _diagnostics
+    if _diagnostics is None:
+        _diagnostics = Diagnostics(get_diagnostics_config())
+    return _diagnostics
@@ -0,0 +1,276 @@
+"""Shared execution of tools off the event loop."""
+
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Generator, Optional
+import asyncio
+import logging
+import time
+
+from ..types.common import ToolResult
+from .allocations import AllocationTracker, get_allocation_tracker
+from ..utils.config import get_executor_config
+
+logger = logging.getLogger(__name__)
+
+class _PoolStats:
+    """Counters and recent queue times of one pool."""
+    
+    # Queue times kept for percentiles
+    WINDOW = 1024
+    
+    def __init__(self, workers: int, max_queue: int):
+        """Initialize the counters."""
+        self.workers = workers
+        self.max_queue = max_queue
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.waiting = 0
+        self.in_flight = 0
+        self.queue_times: Deque[float] = deque(maxlen=self.WINDOW)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the counters with queue-time percentiles in milliseconds."""
+        times = sorted(self.queue_times)
+        
+        def percentile(fraction: float) -> float:
+            return round(times[min(len(times) - 1, int(len(times) * fraction))] * 1000, 3) if times else 0.0
+        
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "queue_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)}
+        }
+
+
+class _TimedStep:
+    """
+    Awaitable that drives a coroutine and times each synchronous step.
+    
+    Every step between two suspension points runs on the event loop without
+    yielding; steps longer than the threshold are reported to `on_slow`.
+    While allocations are traced, each step's allocations are also charged
+    to the call, and the call's totals recorded when it finishes.
+    """
+    
+    def __init__(
+        self,
+        coro: Any,
+        threshold: float,
+        on_slow: Callable[[float], None],
+        allocations: Optional[AllocationTracker] = None,
+        label: str = ""
+    ):
+        self.coro = coro
+        self.threshold = threshold
+        self.on_slow = on_slow
+        self.allocations = allocations
+        self.label = label
+        self.net_bytes = 0
+        self.peak_bytes = 0
+    
+    def __await__(self) -> Generator[Any, Any, Any]:
+        send_value: Any = None
+        error: Optional[BaseException] = None
+        
+        while True:
+            started = time.perf_counter()
+            traced = self.allocations.begin_step() if self.allocations is not None else 0
+            try:
+                if error is not None:
+                    yielded = self.coro.throw(error)
+                else:
+                    yielded = self.coro.send(send_value)
+            except StopIteration as stop:
+                self._check(started, traced, done=True)
+                return stop.value
+            except BaseException:
+                self._check(started, traced, done=True)
+                raise
+            self._check(started, traced)
+            
+            try:
+                send_value = yield yielded
+                error = None
+            except BaseException as e:
+                send_value = None
+                error = e
+    
+    def _check(self, started: float, traced: int, done: bool = False) -> None:
+        elapsed = time.perf_counter() - started
+        if self.threshold > 0 and elapsed > self.threshold:
+            self.on_slow(elapsed)
+        
+        if self.allocations is not None:
+            net, peak = self.allocations.end_step(traced)
+            self.net_bytes += net
+            self.peak_bytes = max(self.peak_bytes, peak)
+            if done:
+                self.allocations.record(self.label, self.net_bytes, self.peak_bytes)
+
+
+class ToolExecutor:
+    """
+    Runs tools according to their declared execution mode.
+    
+    "async" tools are awaited on the event loop, with a warning whenever one
+    holds the loop longer than `slow_callback` seconds without yielding.
+    "thread" tools (blocking I/O, sync SDKs) run in a shared thread pool and
+    "process" tools (CPU-bound work) in a shared process pool, created on
+    first use. Each pool admits at most its workers plus `max_queue` calls;
+    further callers wait for a slot, which pushes back on the front ends
+    instead of growing an unbounded queue. Queue time is measured from
+    submission until a worker starts the call.
+    """
+    
+    def __init__(
+        self,
+        thread_workers: int = 8,
+        process_workers: int = 2,
+        max_queue: int = 64,
+        slow_callback: float = 0.1,
+        allocations: Optional[AllocationTracker] = None
+    ):
+        """Initialize the executor; pools are created lazily."""
+        self.slow_callback = slow_callback
+        self.slow_callbacks = 0
+        self.allocations = allocations or get_allocation_tracker()
+        
+        self._workers = {"thread": thread_workers, "process": process_workers}
+        self._pools: Dict[str, Executor] = {}
+        self._stats = {mode: _PoolStats(workers, max_queue) for mode, workers in self._workers.items()}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._max_queue = max_queue
+    
+    async def run(self, client: Any, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute a tool of a client in its declared execution mode."""
+        mode = client.get_execution_mode(tool_name)
+        
+        if mode == "thread":
+            return await self._submit("thread", client.execute_tool_sync, tool_name, arguments)
+        if mode == "process":
+            return await self._submit("process", type(client).execute_tool_in_process, tool_name, arguments)
+        return await self.timed(client.execute_tool(tool_name, arguments), f"{client.name}.{tool_name}")
+    
+    async def stream(self, client: Any, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """Stream a tool; tools that run in a pool yield their whole result as one chunk."""
+        if client.get_execution_mode(tool_name) != "async":
+            yield await self.run(client, tool_name, arguments)
+            return
+        
+        label = f"{client.name}.{tool_name}"
+        iterator = client.stream_tool(tool_name, arguments).__aiter__()
+        while True:
+            try:
+                partial = await self.timed(iterator.__anext__(), label)
+            except StopAsyncIteration:
+                return
+            yield partial
+    
+    def timed(self, awaitable: Awaitable[Any], label: str) -> Awaitable[Any]:
+        """Wrap a coroutine so that steps holding the loop too long are logged and, while tracing, allocations counted."""
+        allocations = self.allocations if self.allocations.enabled else None
+        if self.slow_callback <= 0 and allocations is None:
+            return awaitable
+        
+        def on_slow(elapsed: float) -> None:
+            self.slow_callbacks += 1
+            logger.warning(f"Slow callback: {label} held the event loop for {elapsed * 1000:.1f} ms")
+        
+        return _TimedStep(awaitable, self.slow_callback, on_slow, allocations, label)
+    
+    async def _submit(self, mode: str, function: Callable[..., ToolResult], *args: Any) -> ToolResult:
+        """Run a function in a pool once a slot is free, recording queue time."""
+        stats = self._stats[mode]
+        slots = self._slots.get(mode)
+        if slots is None:
+            slots = self._slots[mode] = asyncio.Semaphore(self._workers[mode] + self._max_queue)
+        
+        stats.submitted += 1
+        submitted = time.perf_counter()
+        
+        stats.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            stats.waiting -= 1
+        
+        stats.in_flight += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool(mode), _call_timed, function, args)
+            started, result = await future
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            slots.release()
+        
+        # perf_counter is a system-wide monotonic clock on Linux and macOS, so worker timestamps compare
+        stats.queue_times.append(max(0.0, started - submitted))
+        stats.completed += 1
+        return result
+    
+    def _pool(self, mode: str) -> Executor:
+        """Get the pool of a mode, creating it on first use."""
+        pool = self._pools.get(mode)
+        if pool is None:
+            workers = self._workers[mode]
+            if mode == "process":
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tool")
+            self._pools[mode] = pool
+            logger.info(f"Started {mode} pool with {workers} workers")
+        return pool
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get per-pool counters and queue times, and the slow callback count."""
+        return {
+            "pools": {mode: stats.to_dict() for mode, stats in self._stats.items()},
+            "slow_callback_ms": self.slow_callback * 1000,
+            "slow_callbacks": self.slow_callbacks,
+            "allocations": self.allocations.stats()
+        }
+    
+    async def shutdown(self) -> None:
+        """Shut down the pools, letting running calls finish; the wait runs off the event loop."""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        await asyncio.gather(*(asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True) for pool in pools))
+
+
+def _call_timed(function: Callable[..., ToolResult], args: Any) -> Any:
+    """Call a function in a worker, returning when it started along with its result."""
+    return time.perf_counter(), function(*args)
+
+
+_executor: Optional[ToolExecutor] = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Get the process-wide tool executor, creating it from the environment on first use."""
+    global _executor
+    if _executor is None:
+        config = get_executor_config()
+        _executor = ToolExecutor(
+            thread_workers=config["thread_workers"],
+            process_workers=config["process_workers"],
+            max_queue=config["max_queue"],
+            slow_callback=config["slow_callback_ms"] / 1000.0
+        )
+    return _executor
+
+
+async def shutdown_tool_executor() -> None:
+    """Shut down the process-wide tool executor, if it was created."""
+    global _executor
+    if _executor is not None:
+        executor, _executor = _executor, None
+        await executor.shutdown()
@@ -0,0 +1,49 @@
+"""Framed messages between the server and plugin worker processes."""
+
+from typing import Any, Dict
+import asyncio
+import struct
+
+from ..types.common import ToolResult
+from ..utils.serialization import dumps, loads
+
+# Each frame is a 4-byte big-endian payload length followed by a JSON object
+_LENGTH = struct.Struct("!I")
+
+# Frames larger than this are rejected as corrupt
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class FrameError(ConnectionError):
+    """Raised when a peer sends a malformed frame."""
+    pass
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """Read one message; raises asyncio.IncompleteReadError when the peer closes the connection."""
+    header = await reader.readexactly(_LENGTH.size)
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise FrameError(f"Frame of {length} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    return loads(await reader.readexactly(length))
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Encode one message as a frame."""
+    payload = dumps(message)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    """Queue one message on a stream; callers drain the writer when they need back-pressure."""
+    writer.write(encode_frame(message))
+
+
+def result_to_message(result: ToolResult) -> Dict[str, Any]:
+    """Encode a tool result for the wire."""
+    return {"content": result.content, "isError": result.isError}
+
+
+def result_from_message(message: Dict[str, Any]) -> ToolResult:
+    """Decode a tool result from the wire."""
+    return ToolResult(content=message["content"], isError=message["isError"])
@@ -0,0 +1,154 @@
+"""Content negotiation of HTTP API responses: MessagePack or CBOR bodies, gzip or zstd compression."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from ..utils.codecs import compress, encode, negotiate_encoding, negotiate_media_type
+from ..utils.config import get_response_config
+
+# Responses differ by these request headers, for shared caches
+VARY = "Accept, Accept-Encoding"
+
+
+class ResponseEncoder:
+    """
+    Encodes API responses in the format and compression the client accepts.
+    
+    The format comes from `Accept` (JSON, or MessagePack and CBOR when their
+    packages are installed); bodies of at least `min_bytes` are compressed
+    with zstd or gzip per `Accept-Encoding`. Responses whose content is
+    identified by a key (catalog pages, cached tool results) keep their
+    encoded bodies in a bounded LRU, so repeated requests skip encoding and
+    compression.
+    """
+    
+    def __init__(self, min_bytes: int = 1024, gzip_level: int = 6, zstd_level: int = 3, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize the encoder.
+        
+        Args:
+            min_bytes: Smallest body that is compressed
+            gzip_level: gzip compression level (1-9)
+            zstd_level: zstd compression level (1-22)
+            max_entries: Encoded bodies kept
+            max_bytes: Total size of the encoded bodies kept
+        """
+        self.min_bytes = min_bytes
+        self.levels = {"gzip": gzip_level, "zstd": zstd_level}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._bodies: "OrderedDict[Tuple[Hashable, str, Optional[str]], Tuple[bytes, Optional[str]]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+    
+    def encode(self, content: Any, media_type: str, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """
+        Encode content, compressing it if it is large enough.
+        
+        Returns:
+            (body, content encoding or None if uncompressed)
+        """
+        return self._compress(encode(content, media_type), encoding)
+    
+    def _compress(self, body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Compress a body if a compression was accepted and it is large enough."""
+        self.bytes_in += len(body)
+        if encoding is not None and len(body) >= self.min_bytes:
+            body = compress(body, encoding, self.levels[encoding])
+        else:
+            encoding = None
+        self.bytes_out += len(body)
+        return body, encoding
+    
+    def response(self, request: Request, content: Any, key: Optional[Hashable] = None, headers: Optional[Dict[str, str]] = None) -> Response:
+        """
+        Build the response for a request's Accept and Accept-Encoding headers.
+        
+        Args:
+            request: Request being answered
+            content: JSON-native content
+            key: Identifies the content completely, to reuse its encoded
+                bodies; None for content that is not worth caching
+            headers: Extra response headers
+        """
+        media_type = negotiate_media_type(request.headers.get("accept"))
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        
+        if key is None:
+            body, used = self.encode(content, media_type, encoding)
+        else:
+            body, used = self._cached(key, content, media_type, encoding)
+        return self._build(body, media_type, used, 200, headers)
+    
+    def relay(self, request: Request, body: bytes, media_type: str, status_code: int, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Answer with a body already in its final format (e.g. from another node), compressing it if accepted."""
+        body, encoding = self._compress(body, negotiate_encoding(request.headers.get("accept-encoding")))
+        return self._build(body, media_type, encoding, status_code, headers)
+    
+    @staticmethod
+    def _build(body: bytes, media_type: str, encoding: Optional[str], status_code: int, headers: Optional[Dict[str, str]]) -> Response:
+        """Build a response with its content headers."""
+        response_headers = {"Vary": VARY, **(headers or {})}
+        if encoding is not None:
+            response_headers["Content-Encoding"] = encoding
+        return Response(content=body, status_code=status_code, media_type=media_type, headers=response_headers)
+    
+    def _cached(self, key: Hashable, content: Any, media_type: str, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Get an encoded body from the LRU, encoding and storing it on a miss."""
+        cache_key = (key, media_type, encoding)
+        cached = self._bodies.get(cache_key)
+        if cached is not None:
+            self._bodies.move_to_end(cache_key)
+            self.hits += 1
+            return cached
+        
+        self.misses += 1
+        encoded = self.encode(content, media_type, encoding)
+        if len(encoded[0]) <= self.max_bytes // 4:
+            self._bodies[cache_key] = encoded
+            self._bytes += len(encoded[0])
+            while len(self._bodies) > self.max_entries or self._bytes > self.max_bytes:
+                _, (evicted, _) = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted)
+        return encoded
+    
+    def clear(self) -> None:
+        """Forget the encoded bodies, e.g. when the catalog changes."""
+        self._bodies.clear()
+        self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hits, the bodies kept and the compression achieved."""
+        return {
+            "entries": len(self._bodies),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "encoded_bytes": self.bytes_in,
+            "sent_bytes": self.bytes_out,
+            "compression_ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None
+        }
+
+
+_encoder: Optional[ResponseEncoder] = None
+
+
+def get_response_encoder() -> ResponseEncoder:
+    """Get the process-wide response encoder, as configured by the environment."""
+    global _encoder
+    if _encoder is None:
+        config = get_response_config()
+        _encoder = ResponseEncoder(
+            min_bytes=config["compression_min_bytes"],
+            gzip_level=config["gzip_level"],
+            zstd_level=config["zstd_level"],
+            max_entries=config["cache_max_entries"],
+            max_bytes=config["cache_max_bytes"]
+        )
+    return _encoder
@@ -0,0 +1,61 @@
+"""Bounded-memory popularity tracking."""
+
+from typing import Dict, Hashable, List, Tuple
+
+
+class HeavyHitters:
+    """
+    Space-Saving sketch of the most frequent keys.
+    
+    Tracks at most `capacity` keys. When a new key arrives and the sketch is
+    full, it replaces the least counted key and inherits its count, so counts
+    are overestimates bounded by `errors[key]`. Any key whose true frequency
+    exceeds total/capacity is guaranteed to be tracked.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        """Initialize the sketch."""
+        self.capacity = capacity
+        self.counts: Dict[Hashable, float] = {}
+        self.errors: Dict[Hashable, float] = {}
+    
+    def add(self, key: Hashable, weight: float = 1.0) -> None:
+        """Count an occurrence of a key."""
+        if key in self.counts:
+            self.counts[key] += weight
+            return
+        
+        if len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0.0
+            return
+        
+        victim = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim, None)
+        self.counts[key] = floor + weight
+        self.errors[key] = floor
+    
+    def top(self, k: int) -> List[Tuple[Hashable, float]]:
+        """Get the k most frequent keys with their (estimated) counts."""
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+    
+    def decay(self, factor: float = 0.5) -> None:
+        """Scale all counts down so that past popularity fades."""
+        for key in self.counts:
+            self.counts[key] *= factor
+            self.errors[key] *= factor
+    
+    def restore(self, key: Hashable, count: float, error: float = 0.0) -> None:
+        """Put back a tracked key from a snapshot, if there is room for it."""
+        if key in self.counts or len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = error
+    
+    def __contains__(self, key: Hashable) -> bool:
+        """Check whether a key is tracked."""
+        return key in self.counts
+    
+    def __len__(self) -> int:
+        """Get the number of tracked keys."""
+        return len(self.counts)
@@ -0,0 +1,149 @@
+"""Registry of loaded clients shared by the HTTP and MCP front ends."""
+
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import binascii
+import logging
+
+from ..types.common import ToolDefinition
+from .tool_search import ToolSearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a tool listing cursor was not issued by this server."""
+    pass
+
+
+def encode_cursor(tool_name: str) -> str:
+    """Encode the position after a tool as an opaque cursor."""
+    return base64.urlsafe_b64encode(tool_name.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Decode a cursor into the name of the last tool of the previous page."""
+    try:
+        tool_name = base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    if not tool_name:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return tool_name
+
+
+class ClientRegistry:
+    """Holds the loaded clients and resolves tools to the client that owns them."""
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.clients: Dict[str, Any] = {}
+        self.search_index = ToolSearchIndex()
+        # Changes whenever the clients do, so derived data can be keyed by it
+        self.version = 0
+        self._sorted_tools: Optional[List[Tuple[str, ToolDefinition]]] = None
+    
+    def update(self, clients: Dict[str, Any]) -> None:
+        """Add or replace loaded clients, indexing their tools for search."""
+        for name, client in clients.items():
+            replaced = self.clients.get(name)
+            if replaced is not None:
+                for tool in replaced.get_tools():
+                    self.search_index.remove(tool.name)
+            if client.is_enabled:
+                for tool in client.get_tools():
+                    self.search_index.add(name, tool)
+        self.clients.update(clients)
+        self._sorted_tools = None
+        self.version += 1
+    
+    def enabled_clients(self) -> List[Tuple[str, Any]]:
+        """Get (name, client) pairs for every enabled client."""
+        return [(name, client) for name, client in self.clients.items() if client.is_enabled]
+    
+    def get_tools(self) -> List[Tuple[str, ToolDefinition]]:
+        """Get (client name, tool) pairs for every tool of the enabled clients."""
+        return [
+            (client_name, tool)
+            for client_name, client in self.enabled_clients()
+            for tool in client.get_tools()
+        ]
+    
+    def list_tools(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        client: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> Tuple[List[Tuple[str, ToolDefinition]], Optional[str]]:
+        """
+        Get one page of (client name, tool) pairs, ordered by tool name.
+        
+        Cursors name the last tool of the previous page, so pages stay
+        consistent when plugins are added or removed between requests.
+        
+        Args:
+            cursor: Cursor returned with the previous page, or None for the first
+            limit: Maximum tools on the page; None returns all remaining tools
+            client: Only list the tools of this client
+            prefix: Only list tools whose names start with this prefix
+            
+        Returns:
+            The page and the cursor of the next page, None on the last page
+        """
+        if self._sorted_tools is None:
+            self._sorted_tools = sorted(self.get_tools(), key=lambda entry: entry[1].name)
+        
+        after = decode_cursor(cursor) if cursor else None
+        page: List[Tuple[str, ToolDefinition]] = []
+        for client_name, tool in self._sorted_tools:
+            if after is not None and tool.name <= after:
+                continue
+            if client is not None and client_name != client:
+                continue
+            if prefix and not tool.name.startswith(prefix):
+                continue
+            if limit is not None and len(page) == limit:
+                return page, encode_cursor(page[-1][1].name)
+            page.append((client_name, tool))
+        return page, None
+    
+    def search_tools(
+        self,
+        query: str,
+        limit: int = 10,
+        client: Optional[str] = None
+    ) -> List[Tuple[float, str, ToolDefinition]]:
+        """Rank the tools of the enabled clients against a free-text query; see ToolSearchIndex.search."""
+        return self.search_index.search(query, limit=limit, client=client)
+    
+    def find_tool(self, tool_name: str) -> Optional[Tuple[str, ToolDefinition]]:
+        """Find a tool of the enabled clients and the name of its client."""
+        for client_name, client in self.enabled_clients():
+            if client.has_tool(tool_name):
+                return client_name, client.get_tool(tool_name)
+        return None
+    
+    def find_client(self, tool_name: str) -> Optional[Any]:
+        """Find the client that provides a tool."""
+        for client in self.clients.values():
+            if client.has_tool(tool_name):
+                return client
+        return None
+    
+    async def start_all(self) -> None:
+        """Start the background work of every client, then index their tools again, as isolated clients learn theirs on start."""
+        for name, client in self.clients.items():
+            try:
+                await client.start()
+            except Exception as e:
+                logger.error(f"Failed to start {name} client: {e}")
+        self.update(dict(self.clients))
+    
+    async def close_all(self) -> None:
+        """Stop the background work of every client."""
+        for name, client in self.clients.items():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.error(f"Failed to close {name} client: {e}")
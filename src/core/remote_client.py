@@ -0,0 +1,398 @@
+"""Proxy for clients that run in isolated worker processes."""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+import asyncio
+import itertools
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from ..types.common import CachePolicy, ClientConfig, ToolDefinition, ToolResult
+from .base_client import BaseClient
+from .ipc import read_frame, result_from_message, write_frame
+
+# Directory containing the `src` package, where workers are started
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class WorkerUnavailableError(RuntimeError):
+    """Raised when a call cannot be served because the plugin's workers are down."""
+    pass
+
+
+class WorkerProcess:
+    """One plugin worker process and the multiplexed connection to it."""
+    
+    def __init__(self, client_name: str, socket_path: str):
+        """Initialize the worker handle; the process is started by `spawn()`."""
+        self.client_name = client_name
+        self.socket_path = socket_path
+        self.process: Optional[subprocess.Popen] = None
+        self.in_flight = 0
+        self.ping_failures = 0
+        self.on_lost: Optional[Callable[[], None]] = None
+        
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional["asyncio.Task[None]"] = None
+        self._pending: Dict[int, Union[asyncio.Future, asyncio.Queue]] = {}
+        self._ids = itertools.count(1)
+        self._drain_lock: Optional[asyncio.Lock] = None
+    
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the worker's process id."""
+        return self.process.pid if self.process else None
+    
+    @property
+    def alive(self) -> bool:
+        """Check whether the process is running and connected."""
+        return self.process is not None and self.process.poll() is None and self._writer is not None
+    
+    def spawn(self) -> None:
+        """Start the worker process."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "src.plugin_worker", self.client_name, self.socket_path],
+            cwd=PROJECT_ROOT
+        )
+    
+    async def connect(self, timeout: float) -> None:
+        """Open the connection to the worker, waiting for it to listen."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.process.poll() is not None:
+                raise WorkerUnavailableError(f"{self.client_name} worker exited with code {self.process.returncode}")
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise WorkerUnavailableError(f"{self.client_name} worker did not start within {timeout:.0f}s")
+                await asyncio.sleep(0.05)
+        
+        self._drain_lock = asyncio.Lock()
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+    
+    async def describe(self, timeout: float) -> Dict[str, Any]:
+        """Get the client and tool descriptions of the connected worker."""
+        try:
+            return await self.request({"op": "describe"}, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise WorkerUnavailableError(f"{self.client_name} worker did not describe its client within {timeout:.0f}s")
+        except RuntimeError as e:
+            raise WorkerUnavailableError(f"{self.client_name} worker could not describe its client: {e}")
+    
+    async def request(self, message: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a request and wait for its result."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({**message, "id": request_id})
+            return await asyncio.wait_for(future, timeout) if timeout else await future
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def stream(self, message: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Send a streaming request and yield its chunks."""
+        request_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending[request_id] = queue
+        try:
+            await self._send({**message, "id": request_id})
+            while True:
+                reply = await queue.get()
+                if "chunk" in reply:
+                    yield reply["chunk"]
+                    continue
+                if "error" in reply:
+                    raise RuntimeError(reply["error"])
+                return
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def _send(self, message: Dict[str, Any]) -> None:
+        """Write one frame, with back-pressure from the socket buffer."""
+        if self._writer is None:
+            raise WorkerUnavailableError(f"{self.client_name} worker is not connected")
+        write_frame(self._writer, message)
+        async with self._drain_lock:
+            await self._writer.drain()
+    
+    async def _read_loop(self) -> None:
+        """Route replies to their pending requests until the connection closes."""
+        try:
+            while True:
+                reply = await read_frame(self._reader)
+                waiter = self._pending.get(reply.get("id"))
+                if isinstance(waiter, asyncio.Queue):
+                    waiter.put_nowait(reply)
+                elif waiter is not None and not waiter.done():
+                    if "error" in reply:
+                        waiter.set_exception(RuntimeError(reply["error"]))
+                    else:
+                        waiter.set_result(reply["result"])
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._disconnect()
+        
+        # Reached only when the worker closed the connection, not on stop()
+        if self.on_lost:
+            self.on_lost()
+    
+    def _disconnect(self) -> None:
+        """Fail every pending request and drop the connection."""
+        error = f"{self.client_name} worker {self.pid} connection lost"
+        for waiter in self._pending.values():
+            if isinstance(waiter, asyncio.Queue):
+                waiter.put_nowait({"error": error})
+            elif not waiter.done():
+                waiter.set_exception(WorkerUnavailableError(error))
+        self._pending.clear()
+        
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+    
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop the worker, killing it if it does not exit in time."""
+        if self._read_task:
+            self._read_task.cancel()
+            await asyncio.gather(self._read_task, return_exceptions=True)
+            self._read_task = None
+        self._disconnect()
+        
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.to_thread(self.process.wait, timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            await asyncio.to_thread(self.process.wait)
+
+
+class RemoteClient(BaseClient):
+    """
+    Client whose tools run in a pool of worker processes.
+    
+    Each worker loads the real client with `python -m src.plugin_worker` and
+    serves calls over a Unix socket using length-prefixed JSON frames, many
+    calls at a time on one connection. Arguments are validated here against
+    the tool schemas the workers describe, so invalid calls never cross the
+    process boundary. Calls go to the worker with the fewest in flight and
+    at most `max_concurrency` run at once. Workers are pinged every
+    `health_interval` seconds and restarted when they exit, lose their
+    connection or stop answering pings.
+    
+    Workers are started by `start()`, which connects to them without
+    blocking the event loop and registers the tools they describe, so the
+    proxy has no tools until it is started. Resource templates and help
+    text come with the tool descriptions;
+    resource reads and shard keys are requested from a worker, so resources,
+    subscriptions and sharding work as they do for in-process clients.
+    
+    State such as caches lives in the workers, so it is not part of the
+    server's snapshots.
+    """
+    
+    # Restart a worker after this many consecutive unanswered pings
+    MAX_PING_FAILURES = 3
+    
+    def __init__(
+        self,
+        config: ClientConfig,
+        workers: int = 1,
+        max_concurrency: int = 32,
+        health_interval: float = 5.0,
+        start_timeout: float = 15.0
+    ):
+        """Initialize the proxy; the worker processes are started by `start()`."""
+        self.max_concurrency = max_concurrency
+        self.health_interval = health_interval
+        self.start_timeout = start_timeout
+        self.restarts = 0
+        
+        self._socket_dir = tempfile.mkdtemp(prefix=f"mcp-{config.name}-")
+        self._workers = [
+            WorkerProcess(config.name, os.path.join(self._socket_dir, f"worker-{index}.sock"))
+            for index in range(max(1, workers))
+        ]
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._health_task: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._description: Dict[str, Any] = {"tools": []}
+        
+        super().__init__(config)
+    
+    def _initialize_tools(self) -> None:
+        """Register the tools described by the workers; none until they are started."""
+        for tool in self._description["tools"]:
+            # Workers run each tool in its declared execution mode; here it is only awaited
+            self.register_tool(ToolDefinition(
+                name=tool["name"],
+                description=tool["description"],
+                inputSchema=tool["inputSchema"],
+                max_concurrency=tool.get("max_concurrency"),
+                max_queue=tool.get("max_queue"),
+                cache=CachePolicy(**tool["cache"]) if tool.get("cache") else None
+            ))
+    
+    async def start(self) -> None:
+        """Start the workers, connect to them, register the tools they describe and start health checks."""
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._wake = asyncio.Event()
+        try:
+            for worker in self._workers:
+                worker.on_lost = self._wake.set
+                worker.spawn()
+            connected = await asyncio.gather(*(worker.connect(self.start_timeout) for worker in self._workers), return_exceptions=True)
+            for outcome in connected:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            self._description = await self._workers[0].describe(self.start_timeout)
+        except BaseException:
+            await asyncio.gather(*(worker.stop() for worker in self._workers), return_exceptions=True)
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            raise
+        
+        self._initialize_tools()
+        self._health_task = asyncio.get_running_loop().create_task(self._monitor())
+        self.logger.info(f"{self.name} client isolated in {len(self._workers)} worker process(es)")
+    
+    async def close(self) -> None:
+        """Stop health checks and the workers."""
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        
+        await asyncio.gather(*(worker.stop() for worker in self._workers), return_exceptions=True)
+        shutil.rmtree(self._socket_dir, ignore_errors=True)
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute a tool in a worker."""
+        return await self.run_tool(tool_name, arguments)
+    
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """Stream a tool from a worker."""
+        async for partial in self.run_tool_stream(tool_name, arguments):
+            yield partial
+    
+    async def run_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Execute a tool in the least busy worker; the worker applies its execution mode."""
+        async with self._slots:
+            worker = self._pick_worker()
+            worker.in_flight += 1
+            try:
+                reply = await worker.request({"op": "call", "tool": tool_name, "args": arguments})
+            finally:
+                worker.in_flight -= 1
+        return result_from_message(reply)
+    
+    async def run_tool_stream(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        """Stream a tool from the least busy worker."""
+        async with self._slots:
+            worker = self._pick_worker()
+            worker.in_flight += 1
+            try:
+                async for chunk in worker.stream({"op": "stream", "tool": tool_name, "args": arguments}):
+                    yield result_from_message(chunk)
+            finally:
+                worker.in_flight -= 1
+    
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        """Get the resource templates the workers described."""
+        return self._description.get("resource_templates", [])
+    
+    def get_help_text(self) -> Optional[str]:
+        """Get the help text the workers described, or None if the client has none."""
+        return self._description.get("help_text")
+    
+    async def read_resource(self, uri: str) -> Optional[str]:
+        """Read a resource in a worker."""
+        reply = await self._request({"op": "read_resource", "uri": uri})
+        if "invalid" in reply:
+            raise ValueError(reply["invalid"])
+        return reply["text"]
+    
+    async def route_key(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        """Get the shard key of a call from a worker."""
+        reply = await self._request({"op": "shard_key", "tool": tool_name, "args": arguments})
+        return reply["key"]
+    
+    async def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request other than a tool call to the least busy worker."""
+        worker = self._pick_worker()
+        worker.in_flight += 1
+        try:
+            return await worker.request(message)
+        finally:
+            worker.in_flight -= 1
+    
+    def _pick_worker(self) -> WorkerProcess:
+        """Get the connected worker with the fewest calls in flight."""
+        alive = [worker for worker in self._workers if worker.alive]
+        if not alive:
+            if self._wake:
+                self._wake.set()
+            raise WorkerUnavailableError(f"No {self.name} worker is available")
+        return min(alive, key=lambda worker: worker.in_flight)
+    
+    async def _monitor(self) -> None:
+        """Ping the workers every interval, restarting any that are down or unresponsive."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.health_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            
+            for worker in self._workers:
+                try:
+                    await self._check(worker)
+                except Exception as e:
+                    self.logger.error(f"Failed to restart {self.name} worker: {e}")
+    
+    async def _check(self, worker: WorkerProcess) -> None:
+        """Ping one worker and restart it if needed."""
+        if worker.alive:
+            try:
+                await worker.request({"op": "ping"}, timeout=max(1.0, self.health_interval))
+                worker.ping_failures = 0
+                return
+            except Exception:
+                worker.ping_failures += 1
+                if worker.ping_failures < self.MAX_PING_FAILURES:
+                    return
+        
+        exit_code = worker.process.poll()
+        if exit_code is not None:
+            reason = f"exited with code {exit_code}"
+        else:
+            reason = "unresponsive" if worker.ping_failures else "connection lost"
+        self.logger.warning(f"Restarting {self.name} worker {worker.pid}: {reason}")
+        await worker.stop()
+        worker.ping_failures = 0
+        worker.spawn()
+        await worker.connect(self.start_timeout)
+        self.restarts += 1
+    
+    def worker_stats(self) -> Dict[str, Any]:
+        """Get the state of the worker processes."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "restarts": self.restarts,
+            "workers": [
+                {"pid": worker.pid, "alive": worker.alive, "in_flight": worker.in_flight}
+                for worker in self._workers
+            ]
+        }
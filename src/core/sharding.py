@@ -0,0 +1,208 @@
+"""Consistent-hash sharding of tool calls across server nodes."""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import bisect
+import hashlib
+import logging
+import math
+import time
+
+import httpx
+
+from ..utils.config import get_cluster_config
+
+logger = logging.getLogger(__name__)
+
+# Set on forwarded calls, so the receiving node serves them itself instead of forwarding again
+FORWARDED_HEADER = "X-MCP-Forwarded-By"
+
+
+def _hash(value: str) -> int:
+    """Hash a string onto the ring."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes, so nodes own even shares of the key space."""
+    
+    def __init__(self, nodes: List[str], vnodes: int = 100):
+        """Initialize the ring over node URLs."""
+        self.nodes = list(nodes)
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+    
+    def preference(self, key: str) -> Iterator[str]:
+        """Yield every node once, starting with the owner of the key and walking clockwise."""
+        start = bisect.bisect(self._hashes, _hash(key))
+        seen = set()
+        for i in range(len(self._owners)):
+            node = self._owners[(start + i) % len(self._owners)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self.nodes):
+                    return
+
+
+class ShardRouter:
+    """
+    Routes each sharded call to the node that owns its key, so every
+    location is fetched and cached by one node and the cluster's cache
+    capacity grows with its size.
+    
+    Placement uses consistent hashing with bounded loads: a node already
+    running more than `load_factor` times its fair share of the calls this
+    node has in flight is passed over for the next node on the ring. Nodes
+    that fail to answer are skipped for `down_cooldown` seconds, and the
+    call is served locally instead.
+    """
+    
+    def __init__(
+        self,
+        self_url: str,
+        nodes: List[str],
+        vnodes: int = 100,
+        load_factor: float = 1.25,
+        timeout: float = 10.0,
+        down_cooldown: float = 10.0
+    ):
+        """Initialize the router for this node and the cluster's membership list."""
+        self.self_url = self_url
+        self.ring = HashRing(nodes, vnodes)
+        self.load_factor = load_factor
+        self.timeout = timeout
+        self.down_cooldown = down_cooldown
+        self.in_flight: Dict[str, int] = {node: 0 for node in nodes}
+        self.routed: Dict[str, int] = {node: 0 for node in nodes}
+        self.rebalanced = 0
+        self.fallbacks = 0
+        self._down_until: Dict[str, float] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def is_up(self, node: str) -> bool:
+        """Check whether a node is not in its failure cooldown; this node is always up."""
+        return node == self.self_url or self._down_until.get(node, 0.0) <= time.monotonic()
+    
+    def choose(self, key: str) -> str:
+        """Pick the node that serves a key: its owner, unless the owner is down or over its load bound."""
+        candidates = [node for node in self.ring.preference(key) if self.is_up(node)]
+        capacity = math.ceil(self.load_factor * (sum(self.in_flight.values()) + 1) / len(candidates))
+        
+        for position, node in enumerate(candidates):
+            if self.in_flight[node] < capacity:
+                if position:
+                    self.rebalanced += 1
+                self.routed[node] += 1
+                return node
+        
+        self.routed[self.self_url] += 1
+        return self.self_url
+    
+    @contextmanager
+    def track(self, node: str) -> Iterator[None]:
+        """Count a call as in flight on a node for the duration of the block."""
+        self.in_flight[node] += 1
+        try:
+            yield
+        finally:
+            self.in_flight[node] -= 1
+    
+    def mark_down(self, node: str) -> None:
+        """Skip a node until its cooldown ends."""
+        self._down_until[node] = time.monotonic() + self.down_cooldown
+    
+    async def forward(
+        self,
+        node: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        api_key: Optional[str],
+        accept: Optional[str] = None
+    ) -> Optional[httpx.Response]:
+        """
+        Execute a tool call on another node.
+        
+        Args:
+            node: Base URL of the node
+            tool_name: Tool to call
+            arguments: Validated tool arguments
+            api_key: API key of the caller, passed on to the node
+            accept: Response format to ask the node for; the node answers
+                uncompressed and the receiving node compresses
+        
+        Returns:
+            The node's response, or None if the call should be served locally
+            because the node is unreachable, failed or is shedding load
+        """
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=self.timeout)
+        
+        headers = {FORWARDED_HEADER: self.self_url, "Accept-Encoding": "identity"}
+        if api_key:
+            headers["X-API-Key"] = api_key
+        if accept:
+            headers["Accept"] = accept
+        
+        try:
+            with self.track(node):
+                response = await self._http.post(f"{node}/tools/{tool_name}", json=arguments, headers=headers)
+        except httpx.HTTPError as e:
+            logger.warning(f"Node {node} unreachable ({e!r}), serving {tool_name} locally")
+            self.mark_down(node)
+            self.fallbacks += 1
+            return None
+        
+        if response.status_code >= 500:
+            logger.warning(f"Node {node} answered {response.status_code}, serving {tool_name} locally")
+            if response.status_code != 503:
+                self.mark_down(node)
+            self.fallbacks += 1
+            return None
+        
+        return response
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get routing counters and the state of every node."""
+        return {
+            "self": self.self_url,
+            "rebalanced": self.rebalanced,
+            "fallbacks": self.fallbacks,
+            "nodes": {
+                node: {"up": self.is_up(node), "in_flight": self.in_flight[node], "routed": self.routed[node]}
+                for node in self.ring.nodes
+            }
+        }
+    
+    async def close(self) -> None:
+        """Close the connections to the other nodes."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+_router: Optional[ShardRouter] = None
+_configured = False
+
+
+def get_shard_router() -> Optional[ShardRouter]:
+    """Get the process-wide shard router, or None when CLUSTER_NODES is not set."""
+    global _router, _configured
+    if not _configured:
+        _configured = True
+        config = get_cluster_config()
+        if config["nodes"]:
+            if config["self"] not in config["nodes"]:
+                logger.error(f"CLUSTER_SELF '{config['self']}' is not one of CLUSTER_NODES; sharding disabled")
+            else:
+                _router = ShardRouter(
+                    config["self"],
+                    config["nodes"],
+                    vnodes=config["vnodes"],
+                    load_factor=config["load_factor"],
+                    timeout=config["forward_timeout"],
+                    down_cooldown=config["down_cooldown"]
+                )
+                logger.info(f"Sharding tool calls across {len(config['nodes'])} nodes as {config['self']}")
+    return _router
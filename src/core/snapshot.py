@@ -0,0 +1,238 @@
+"""Warm-cache snapshots that survive restarts."""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import asyncio
+import logging
+import mmap
+import os
+import struct
+import time
+
+from ..utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+# A snapshot record: (key, JSON-native value, wall-clock expiry or 0 for none)
+SnapshotRecord = Tuple[str, Any, float]
+
+# File layout: magic, section count, then per section a header followed by its
+# records. Each record is a fixed header followed by the key and JSON value.
+MAGIC = b"MCPSNAP1"
+_FILE_HEADER = struct.Struct("<8sI")
+_SECTION_HEADER = struct.Struct("<HIQ")  # name bytes, record count, payload bytes
+_RECORD_HEADER = struct.Struct("<dII")   # expires_at, key bytes, value bytes
+
+
+def write_snapshot(path: str, sections: Dict[str, Iterable[SnapshotRecord]]) -> int:
+    """
+    Write named sections of records to a snapshot file.
+    
+    The file is written next to its destination and renamed over it, so a
+    crash mid-write leaves the previous snapshot intact.
+    
+    Args:
+        path: Snapshot file path
+        sections: Records per section name
+    
+    Returns:
+        The number of records written
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    
+    with open(temp_path, "wb") as f:
+        f.write(_FILE_HEADER.pack(MAGIC, len(sections)))
+        for name, records in sections.items():
+            payload = bytearray()
+            count = 0
+            for key, value, expires_at in records:
+                key_bytes = key.encode("utf-8")
+                value_bytes = dumps(value)
+                payload += _RECORD_HEADER.pack(expires_at, len(key_bytes), len(value_bytes))
+                payload += key_bytes
+                payload += value_bytes
+                count += 1
+            
+            name_bytes = name.encode("utf-8")
+            f.write(_SECTION_HEADER.pack(len(name_bytes), count, len(payload)))
+            f.write(name_bytes)
+            f.write(payload)
+            written += count
+        
+        f.flush()
+        os.fsync(f.fileno())
+    
+    os.replace(temp_path, path)
+    return written
+
+
+class SnapshotReader:
+    """
+    Memory-mapped view of a snapshot file.
+    
+    Opening only indexes the section headers. Records are decoded lazily
+    while iterating a section, and expired records are skipped from their
+    fixed-size header without decoding the key or value.
+    """
+    
+    def __init__(self, path: str):
+        """Map a snapshot file and index its sections."""
+        self.path = path
+        self._file = open(path, "rb")
+        self._map: Optional[mmap.mmap] = None
+        self._sections: Dict[str, Tuple[int, int, int]] = {}
+        
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index()
+        except Exception:
+            self.close()
+            raise
+    
+    def _index(self) -> None:
+        """Record the offset, record count and payload size of every section."""
+        magic, section_count = _FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a cache snapshot")
+        
+        offset = _FILE_HEADER.size
+        for _ in range(section_count):
+            name_length, count, size = _SECTION_HEADER.unpack_from(self._map, offset)
+            offset += _SECTION_HEADER.size
+            name = self._map[offset:offset + name_length].decode("utf-8")
+            offset += name_length
+            if offset + size > len(self._map):
+                raise ValueError(f"Truncated snapshot section '{name}' in {self.path}")
+            self._sections[name] = (offset, count, size)
+            offset += size
+    
+    def sections(self) -> List[str]:
+        """Get the section names in file order."""
+        return list(self._sections)
+    
+    def records(self, name: str, now: Optional[float] = None) -> Iterator[SnapshotRecord]:
+        """Iterate over the unexpired records of a section."""
+        offset, _, size = self._sections[name]
+        end = offset + size
+        now = time.time() if now is None else now
+        data = self._map
+        
+        while offset < end:
+            expires_at, key_length, value_length = _RECORD_HEADER.unpack_from(data, offset)
+            offset += _RECORD_HEADER.size
+            if expires_at and expires_at <= now:
+                offset += key_length + value_length
+                continue
+            
+            key = data[offset:offset + key_length].decode("utf-8")
+            offset += key_length
+            value = loads(data[offset:offset + value_length])
+            offset += value_length
+            yield key, value, expires_at
+    
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+    
+    def __enter__(self) -> "SnapshotReader":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class SnapshotManager:
+    """
+    Saves the registry's client state periodically and on shutdown, and restores it on startup.
+    
+    Sections are named "<client>/<section>" so each client gets back only
+    what it wrote. When several processes share a snapshot path, the last
+    one to save wins; every writer replaces the file atomically.
+    """
+    
+    def __init__(self, registry: Any, path: str, interval: float = 300.0):
+        """Initialize the manager for a client registry."""
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._task: Optional["asyncio.Task[None]"] = None
+    
+    def load(self) -> int:
+        """Restore client state from the snapshot file, returning the number of records restored."""
+        if not os.path.exists(self.path):
+            return 0
+        
+        started = time.perf_counter()
+        restored = 0
+        try:
+            with SnapshotReader(self.path) as reader:
+                for name in reader.sections():
+                    client_name, _, section = name.partition("/")
+                    client = self.registry.clients.get(client_name)
+                    if client is None:
+                        continue
+                    restored += client.restore(section, reader.records(name))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache snapshot {self.path}: {e}")
+            return 0
+        
+        logger.info(f"Restored {restored} records from {self.path} in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return restored
+    
+    async def save(self) -> int:
+        """Write the current client state to the snapshot file, returning the number of records written."""
+        # Collect on the event loop, where the state is mutated; encode and write off it
+        sections: Dict[str, List[SnapshotRecord]] = {}
+        for client_name, client in self.registry.clients.items():
+            for section, records in client.snapshot().items():
+                sections[f"{client_name}/{section}"] = list(records)
+        
+        written = await asyncio.to_thread(write_snapshot, self.path, sections)
+        logger.info(f"Saved {written} records to {self.path}")
+        return written
+    
+    def start(self) -> None:
+        """Start saving periodically on the running event loop."""
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Stop the periodic saves and write a final snapshot."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        try:
+            await self.save()
+        except Exception as e:
+            logger.error(f"Failed to save cache snapshot: {e}")
+    
+    async def _run(self) -> None:
+        """Save every interval."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as e:
+                logger.error(f"Failed to save cache snapshot: {e}")
+
+
+def create_snapshot_manager(registry: Any, snapshot_config: Dict[str, Any]) -> Optional[SnapshotManager]:
+    """
+    Create the snapshot manager for a registry.
+    
+    Args:
+        registry: The ClientRegistry whose clients are snapshotted
+        snapshot_config: Settings from `get_snapshot_config()`
+    
+    Returns:
+        A SnapshotManager, or None when snapshots are disabled
+    """
+    if not snapshot_config["enabled"]:
+        return None
+    return SnapshotManager(registry, snapshot_config["path"], interval=snapshot_config["interval"])
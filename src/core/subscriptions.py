@@ -0,0 +1,165 @@
+"""Shared polling behind MCP resource subscriptions."""
+
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionLimitError(Exception):
+    """Raised when a subscription would exceed the number of watched resources."""
+    pass
+
+
+class _Watch:
+    """A watched resource: its subscribers, last value and poller."""
+    
+    __slots__ = ("sessions", "initial", "latest", "poller")
+    
+    def __init__(self, initial: "asyncio.Future[str]"):
+        self.sessions: Set[Any] = set()
+        self.initial = initial
+        self.latest: Optional[str] = None
+        self.poller: Optional["asyncio.Task[None]"] = None
+
+
+class ResourceSubscriptions:
+    """
+    Watches subscribed resources with one poller per resource, however many
+    sessions subscribe to it, and notifies the subscribers only when the
+    resource's content changes.
+    
+    Upstream load therefore depends on the number of distinct resources
+    watched rather than on the number of subscribers.
+    """
+    
+    def __init__(
+        self,
+        read: Callable[[str], Awaitable[str]],
+        interval: float = 60.0,
+        max_resources: int = 1000
+    ):
+        """
+        Initialize the subscriptions.
+        
+        Args:
+            read: Reads the current content of a resource URI, raising if it cannot
+            interval: Seconds between polls of each watched resource
+            max_resources: Distinct resources that may be watched at once
+        """
+        self.read = read
+        self.interval = interval
+        self.max_resources = max_resources
+        self._watches: Dict[str, _Watch] = {}
+        self.polls = 0
+        self.notifications = 0
+    
+    async def subscribe(self, uri: str, session: Any) -> None:
+        """
+        Subscribe a session to a resource, reading it first if nobody watches it yet.
+        
+        Raises:
+            SubscriptionLimitError: If max_resources are already watched
+            Exception: Whatever the first read of the resource raised
+        """
+        while True:
+            watch = self._watches.get(uri)
+            if watch is None:
+                if len(self._watches) >= self.max_resources:
+                    raise SubscriptionLimitError(f"Already watching {self.max_resources} resources")
+                watch = self._watches[uri] = _Watch(asyncio.ensure_future(self.read(uri)))
+            
+            # Concurrent first subscribers share the first read
+            try:
+                latest = await asyncio.shield(watch.initial)
+            except BaseException:
+                # Failed, or the only subscriber went away before the watch started
+                if self._watches.get(uri) is watch and watch.poller is None:
+                    del self._watches[uri]
+                raise
+            
+            # The last subscriber may have left while the first read ran
+            if self._watches.get(uri) is watch:
+                break
+        
+        watch.sessions.add(session)
+        if watch.poller is None:
+            watch.latest = latest
+            watch.poller = asyncio.get_running_loop().create_task(self._poll(uri, watch))
+            logger.info(f"Watching {uri}")
+    
+    async def unsubscribe(self, uri: str, session: Any) -> None:
+        """Unsubscribe a session from a resource, stopping its poller after the last subscriber."""
+        watch = self._watches.get(uri)
+        if watch is None:
+            return
+        
+        watch.sessions.discard(session)
+        if not watch.sessions:
+            await self._stop(uri, watch)
+    
+    def latest(self, uri: str) -> Optional[str]:
+        """Get the last polled content of a watched resource, or None if it is not watched."""
+        watch = self._watches.get(uri)
+        return watch.latest if watch is not None else None
+    
+    async def _poll(self, uri: str, watch: _Watch) -> None:
+        """Re-read a resource every interval, notifying its subscribers when it changes."""
+        while True:
+            await asyncio.sleep(self.interval)
+            self.polls += 1
+            try:
+                content = await self.read(uri)
+            except Exception as e:
+                # Keep the last good value; a transient failure is not a change
+                logger.warning(f"Polling {uri} failed: {e}")
+                continue
+            
+            if content == watch.latest:
+                continue
+            watch.latest = content
+            
+            sessions = list(watch.sessions)
+            results = await asyncio.gather(
+                *(session.send_resource_updated(uri) for session in sessions),
+                return_exceptions=True
+            )
+            for session, result in zip(sessions, results):
+                if isinstance(result, Exception):
+                    # The session has gone away without unsubscribing
+                    logger.info(f"Dropping subscriber of {uri}: {result!r}")
+                    watch.sessions.discard(session)
+                else:
+                    self.notifications += 1
+            
+            if not watch.sessions:
+                if self._watches.get(uri) is watch:
+                    del self._watches[uri]
+                watch.poller = None
+                logger.info(f"Stopped watching {uri}")
+                return
+    
+    async def _stop(self, uri: str, watch: _Watch) -> None:
+        """Stop watching a resource."""
+        if self._watches.get(uri) is watch:
+            del self._watches[uri]
+        if watch.poller is not None:
+            watch.poller.cancel()
+            await asyncio.gather(watch.poller, return_exceptions=True)
+            watch.poller = None
+        logger.info(f"Stopped watching {uri}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of watched resources and subscribers, polls and notifications sent."""
+        return {
+            "resources": len(self._watches),
+            "subscribers": sum(len(watch.sessions) for watch in self._watches.values()),
+            "polls": self.polls,
+            "notifications": self.notifications
+        }
+    
+    async def close(self) -> None:
+        """Stop every poller."""
+        for uri, watch in list(self._watches.items()):
+            await self._stop(uri, watch)
@@ -0,0 +1,122 @@
+"""Declarative caching of tool results."""
+
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import hashlib
+import json
+
+from ..types.common import ToolDefinition, ToolResult
+from ..utils.config import get_cache_config
+from .cache import ResultCache, create_cache
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> str:
+    """Serialize arguments so that equal values always give the same text (sorted keys, no whitespace)."""
+    return json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class ToolResultCache:
+    """
+    Caches the results of tools whose ToolDefinition carries a CachePolicy.
+    
+    Keys combine the tool name, the caller for "api_key" scoped policies, and
+    a hash of the canonicalized key arguments. Concurrent misses for one key
+    share a single execution. Error results are only stored when the policy
+    allows it.
+    """
+    
+    def __init__(self, backend: ResultCache):
+        """Initialize the cache on a result cache backend."""
+        self.backend = backend
+        self.stored = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, "asyncio.Future[ToolResult]"] = {}
+    
+    def key(self, tool: ToolDefinition, arguments: Dict[str, Any], caller: Optional[str]) -> Optional[str]:
+        """Get the cache key of a call, or None if the tool is not cached."""
+        policy = tool.cache
+        if policy is None:
+            return None
+        
+        if policy.key_arguments is not None:
+            arguments = {name: arguments.get(name) for name in policy.key_arguments}
+        digest = hashlib.sha256(canonical_arguments(arguments).encode("utf-8")).hexdigest()
+        
+        scope = f"caller={caller or ''}" if policy.scope == "api_key" else "shared"
+        return f"{tool.name}:{scope}:{digest}"
+    
+    def get(self, key: Optional[str]) -> Optional[ToolResult]:
+        """Get a cached result."""
+        if key is None:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            return None
+        return ToolResult(content=value["content"], isError=value["isError"])
+    
+    async def run(self, key: Optional[str], tool: ToolDefinition, execute: Callable[[], Awaitable[ToolResult]]) -> ToolResult:
+        """
+        Execute a call and cache its result under `key`.
+        
+        Args:
+            key: Key from `key()`; None executes without caching
+            tool: The tool's definition, for its cache policy
+            execute: Runs the tool
+        
+        Returns:
+            The tool result
+        """
+        if key is None:
+            return await execute()
+        
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The call we joined was cancelled, not us; run it ourselves
+                return await self.run(key, tool, execute)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await execute()
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; mark it retrieved for when there are none
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        
+        if not result.isError or tool.cache.cache_errors:
+            self.backend.set(key, {"content": result.content, "isError": result.isError}, tool.cache.ttl)
+            self.stored += 1
+        future.set_result(result)
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            **self.backend.stats(),
+            "stored": self.stored,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight)
+        }
+
+
+_tool_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Get the process-wide tool result cache, on the configured backend."""
+    global _tool_cache
+    if _tool_cache is None:
+        _tool_cache = ToolResultCache(create_cache("tools", get_cache_config()))
+    return _tool_cache
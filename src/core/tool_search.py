@@ -0,0 +1,166 @@
+"""Full-text search over the registered tools."""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import math
+import re
+
+from ..types.common import ToolDefinition
+
+# Words, with camelCase and snake_case names split into their parts
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Words too common in tool descriptions to help ranking
+STOP_WORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "get", "in",
+    "is", "it", "of", "on", "or", "the", "to", "with"
+))
+
+# Term frequency multipliers of the fields of a tool
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+PARAMETER_WEIGHT = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, dropping stop words and plural endings."""
+    terms = []
+    for word in _WORD.findall(text):
+        term = word.lower()
+        if term in STOP_WORDS:
+            continue
+        if len(term) > 4 and term.endswith("ies"):
+            term = term[:-3] + "y"
+        elif len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+            term = term[:-1]
+        terms.append(term)
+    return terms
+
+
+def _parameter_text(schema: Dict) -> Iterable[str]:
+    """Yield the names and descriptions of the properties of an input schema, nested ones included."""
+    for name, prop in (schema.get("properties") or {}).items():
+        yield name
+        if isinstance(prop, dict):
+            if isinstance(prop.get("description"), str):
+                yield prop["description"]
+            yield from _parameter_text(prop)
+            if isinstance(prop.get("items"), dict):
+                yield from _parameter_text(prop["items"])
+
+
+class ToolSearchIndex:
+    """
+    Inverted index over tool names, descriptions and parameter descriptions, ranked with BM25.
+    
+    Tools are added and removed one at a time as plugins load, so the index
+    never has to be rebuilt. Name terms count NAME_WEIGHT times, so a query
+    matching a tool's name outranks one that only matches its description.
+    """
+    
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """Initialize an empty index with the BM25 parameters."""
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._tools: Dict[str, Tuple[str, ToolDefinition]] = {}
+        self._total_length = 0
+        # Per-posting BM25 term frequency parts, recomputed after the index changes
+        self._parts: Optional[Dict[str, Dict[str, float]]] = None
+    
+    def __len__(self) -> int:
+        return len(self._tools)
+    
+    def add(self, client_name: str, tool: ToolDefinition) -> None:
+        """Index a tool, replacing an earlier tool of the same name."""
+        if tool.name in self._tools:
+            self.remove(tool.name)
+        
+        frequencies: Counter = Counter()
+        for term in tokenize(tool.name):
+            frequencies[term] += NAME_WEIGHT
+        for term in tokenize(tool.description or ""):
+            frequencies[term] += DESCRIPTION_WEIGHT
+        for text in _parameter_text(tool.inputSchema or {}):
+            for term in tokenize(text):
+                frequencies[term] += PARAMETER_WEIGHT
+        
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[tool.name] = frequency
+        length = sum(frequencies.values())
+        self._lengths[tool.name] = length
+        self._terms[tool.name] = list(frequencies)
+        self._tools[tool.name] = (client_name, tool)
+        self._total_length += length
+        self._parts = None
+    
+    def remove(self, tool_name: str) -> None:
+        """Drop a tool from the index."""
+        if tool_name not in self._tools:
+            return
+        
+        for term in self._terms.pop(tool_name):
+            postings = self._postings[term]
+            del postings[tool_name]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(tool_name)
+        del self._tools[tool_name]
+        self._parts = None
+    
+    def _compute_parts(self) -> Dict[str, Dict[str, float]]:
+        """Compute the length-normalized term frequency part of the BM25 score of every posting."""
+        avg_length = self._total_length / len(self._tools) or 1.0
+        norms = {
+            tool_name: self.k1 * (1 - self.b + self.b * length / avg_length)
+            for tool_name, length in self._lengths.items()
+        }
+        return {
+            term: {
+                tool_name: frequency * (self.k1 + 1) / (frequency + norms[tool_name])
+                for tool_name, frequency in postings.items()
+            }
+            for term, postings in self._postings.items()
+        }
+    
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        client: Optional[str] = None
+    ) -> List[Tuple[float, str, ToolDefinition]]:
+        """
+        Find the tools that best match a free-text query.
+        
+        Args:
+            query: Words describing what the tool should do
+            limit: Maximum number of results
+            client: Only return tools of this client
+        
+        Returns:
+            (score, client name, tool) tuples, best match first
+        """
+        count = len(self._tools)
+        if not count:
+            return []
+        
+        parts = self._parts
+        if parts is None:
+            parts = self._parts = self._compute_parts()
+        
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = parts.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for tool_name, part in postings.items():
+                scores[tool_name] = scores.get(tool_name, 0.0) + idf * part
+        
+        if client is not None:
+            scores = {name: score for name, score in scores.items() if self._tools[name][0] == client}
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [(score, *self._tools[tool_name]) for tool_name, score in best]
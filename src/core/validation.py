@@ -0,0 +1,179 @@
+"""Compiled validation of tool arguments against their JSON Schema."""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A compiled validator takes raw arguments and returns coerced arguments
+# with schema defaults applied, raising ToolArgumentError when they are invalid
+ArgumentValidator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# Per-value checker: returns (coerced value, error message or None)
+_ValueChecker = Callable[[Any], Tuple[Any, Optional[str]]]
+
+_MISSING = object()
+
+
+class ToolArgumentError(ValueError):
+    """Raised when tool arguments do not match the tool's input schema."""
+    
+    def __init__(self, tool_name: str, errors: List[str]):
+        """Initialize the error with one message per invalid argument."""
+        self.tool_name = tool_name
+        self.errors = errors
+        super().__init__(f"Invalid arguments for {tool_name}: {'; '.join(errors)}")
+
+
+def _coerce_integer(value: Any) -> Any:
+    """Coerce numeric strings and integral floats to int, leaving anything else unchanged."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce_number(value: Any) -> Any:
+    """Coerce numeric strings to float, leaving anything else unchanged."""
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce_boolean(value: Any) -> Any:
+    """Coerce "true"/"false" strings to bool, leaving anything else unchanged."""
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    return value
+
+
+_TYPE_CHECKS: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], bool]]] = {
+    "string": (lambda value: value, lambda value: isinstance(value, str)),
+    "integer": (_coerce_integer, lambda value: isinstance(value, int) and not isinstance(value, bool)),
+    "number": (_coerce_number, lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)),
+    "boolean": (_coerce_boolean, lambda value: isinstance(value, bool)),
+    "array": (lambda value: value, lambda value: isinstance(value, list)),
+    "object": (lambda value: value, lambda value: isinstance(value, dict)),
+    "null": (lambda value: value, lambda value: value is None),
+}
+
+
+def _compile_property(name: str, schema: Dict[str, Any]) -> _ValueChecker:
+    """Compile the checks of one property schema into a single closure."""
+    checks: List[Callable[[Any], Optional[str]]] = []
+    
+    schema_type = schema.get("type")
+    types = [schema_type] if isinstance(schema_type, str) else list(schema_type or [])
+    type_checks = [_TYPE_CHECKS[t] for t in types if t in _TYPE_CHECKS]
+    
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+        checks.append(lambda value: None if value in allowed else f"'{name}' must be one of {allowed}")
+    if "minimum" in schema:
+        minimum = schema["minimum"]
+        checks.append(lambda value: None if value >= minimum else f"'{name}' must be >= {minimum}")
+    if "maximum" in schema:
+        maximum = schema["maximum"]
+        checks.append(lambda value: None if value <= maximum else f"'{name}' must be <= {maximum}")
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+        checks.append(lambda value: None if len(value) >= min_length else f"'{name}' must be at least {min_length} characters")
+    if "maxLength" in schema:
+        max_length = schema["maxLength"]
+        checks.append(lambda value: None if len(value) <= max_length else f"'{name}' must be at most {max_length} characters")
+    item_checker = _compile_property(f"{name}[]", schema["items"]) if isinstance(schema.get("items"), dict) else None
+    
+    def check(value: Any) -> Tuple[Any, Optional[str]]:
+        if type_checks:
+            for coerce, is_type in type_checks:
+                candidate = coerce(value)
+                if is_type(candidate):
+                    value = candidate
+                    break
+            else:
+                return value, f"'{name}' must be of type {'/'.join(types)}"
+        
+        if item_checker and isinstance(value, list):
+            items = []
+            for item in value:
+                item, error = item_checker(item)
+                if error:
+                    return value, error
+                items.append(item)
+            value = items
+        
+        for check_value in checks:
+            try:
+                error = check_value(value)
+            except TypeError:
+                error = f"'{name}' has an invalid value"
+            if error:
+                return value, error
+        return value, None
+    
+    return check
+
+
+def compile_schema(tool_name: str, schema: Dict[str, Any]) -> ArgumentValidator:
+    """
+    Compile a tool's object input schema into a validator.
+    
+    Supports the subset of JSON Schema used by tool definitions: property
+    `type` (with lenient coercion of numeric and boolean strings), `enum`,
+    `minimum`/`maximum`, `minLength`/`maxLength`, array `items`, `default`,
+    `required` and `additionalProperties: false`. Other keywords are ignored.
+    
+    Args:
+        tool_name: Tool name, used in error messages
+        schema: The tool's inputSchema
+    
+    Returns:
+        A function that validates and coerces an arguments dict
+    """
+    properties = schema.get("properties") or {}
+    required = [name for name in schema.get("required") or [] if isinstance(name, str)]
+    allow_extra = schema.get("additionalProperties", True) is not False
+    
+    checkers = {name: _compile_property(name, prop) for name, prop in properties.items()}
+    defaults = {name: prop["default"] for name, prop in properties.items() if "default" in prop}
+    mutable_defaults = any(isinstance(value, (list, dict)) for value in defaults.values())
+    
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(arguments, dict):
+            raise ToolArgumentError(tool_name, ["arguments must be an object"])
+        
+        errors = []
+        result = {
+            name: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for name, value in defaults.items()
+        } if mutable_defaults else dict(defaults)
+        
+        for name, value in arguments.items():
+            checker = checkers.get(name)
+            if checker is None:
+                if not allow_extra:
+                    errors.append(f"unexpected argument '{name}'")
+                    continue
+                result[name] = value
+                continue
+            
+            value, error = checker(value)
+            if error:
+                errors.append(error)
+            result[name] = value
+        
+        for name in required:
+            if result.get(name, _MISSING) is _MISSING:
+                errors.append(f"missing required argument '{name}'")
+        
+        if errors:
+            raise ToolArgumentError(tool_name, errors)
+        return result
+    
+    return validate
@@ -8,7 +8,7 @@ def main():
     uvicorn.run(
         "src.app:app",
         host="0.0.0.0",
-        port=8000,
+        port=8008,
         reload=True,
         log_level="info"
     )
@@ -0,0 +1,74 @@
+"""MCP Streamable HTTP transport served from the FastAPI app."""
+
+import contextlib
+import logging
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+from .core.registry import ClientRegistry
+from .mcp_server import PureMCPServer
+from .middleware.auth import authenticate_api_key
+from .utils.config import get_mcp_config
+
+logger = logging.getLogger(__name__)
+
+
+class MCPHttpTransport:
+    """
+    ASGI endpoint speaking MCP Streamable HTTP.
+    
+    All sessions are multiplexed onto one `PureMCPServer` backed by the app's
+    client registry, so remote MCP clients no longer need a bridge process.
+    Every request must carry a valid `X-API-Key` header; the authenticated
+    client name is attached to the request for per-call logging.
+    """
+    
+    def __init__(self, registry: ClientRegistry):
+        """Initialize the transport for a client registry."""
+        self.mcp_server = PureMCPServer(registry=registry, client_name="MCP Streamable HTTP")
+        self.session_manager: Optional[StreamableHTTPSessionManager] = None
+        self._exit_stack: Optional[contextlib.AsyncExitStack] = None
+    
+    async def start(self) -> None:
+        """Start the session manager; must be paired with `stop`."""
+        # A session manager can only be run once, so create one per start. Stateless
+        # mode lets any server worker answer any request, as sessions live in one process
+        self.session_manager = StreamableHTTPSessionManager(
+            app=self.mcp_server.server,
+            stateless=get_mcp_config()["stateless_http"]
+        )
+        self._exit_stack = contextlib.AsyncExitStack()
+        await self._exit_stack.enter_async_context(self.session_manager.run())
+        logger.info("MCP Streamable HTTP transport started at /mcp")
+    
+    async def stop(self) -> None:
+        """Close all open sessions and stop watching subscribed resources."""
+        await self.mcp_server.subscriptions.close()
+        if self._exit_stack:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            logger.info("MCP Streamable HTTP transport stopped")
+    
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        """Authenticate the request and hand it to the session manager."""
+        headers = dict(scope.get("headers") or [])
+        api_key = headers.get(b"x-api-key", b"").decode("latin-1") or None
+        
+        try:
+            client_name = authenticate_api_key(api_key)
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code)
+            await response(scope, receive, send)
+            return
+        
+        if self.session_manager is None:
+            response = JSONResponse({"detail": "MCP transport not started"}, status_code=503)
+            await response(scope, receive, send)
+            return
+        
+        # Exposed to MCP handlers as request.state.client_name
+        scope.setdefault("state", {})["client_name"] = client_name
+        await self.session_manager.handle_request(scope, receive, send)
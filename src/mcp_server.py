@@ -12,6 +12,7 @@ from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.types import (
     Resource,
+    ResourceTemplate,
     Tool,
     TextContent,
     ImageContent,
@@ -19,20 +20,61 @@ from mcp.types import (
     LoggingLevel
 )
 import mcp.types as types
+from mcp.shared.exceptions import McpError
+from mcp.types import ErrorData, INVALID_PARAMS
 
-from .types.common import ClientConfig
-from .utils.config import load_environment, setup_logging
+from .types.common import ClientConfig, ToolResult
+from .core.admission import AdmissionRejected, get_admission_controller
+from .core.catalog import CATALOG_CLIENT_NAME, CatalogClient
+from .core.diagnostics import get_diagnostics
+from .core.executor import shutdown_tool_executor
+from .core.registry import ClientRegistry, InvalidCursorError
+from .core.snapshot import create_snapshot_manager
+from .core.subscriptions import ResourceSubscriptions, SubscriptionLimitError
+from .core.tool_cache import get_tool_cache
+from .core.validation import ToolArgumentError
+from .utils.config import (
+    get_catalog_config,
+    get_snapshot_config,
+    get_subscription_config,
+    load_environment,
+    setup_logging
+)
 from .utils.mcp_client_loader import load_all_mcp_clients
 
 # Import API key validation from middleware
 from .middleware.auth import validate_api_key
 
 
+class ToolCallError(Exception):
+    """Raised by the call_tool handler so the SDK answers with an error result (`isError`) carrying the message."""
+    pass
+
+
+class SubscribableServer(Server):
+    """MCP server that advertises resource subscriptions once a subscribe handler is registered."""
+    
+    def get_capabilities(self, notification_options: NotificationOptions, experimental_capabilities: Dict[str, Dict[str, Any]]) -> types.ServerCapabilities:
+        """Convert the registered handlers to capabilities, including `resources.subscribe`."""
+        capabilities = super().get_capabilities(notification_options, experimental_capabilities)
+        if capabilities.resources is not None and types.SubscribeRequest in self.request_handlers:
+            capabilities.resources.subscribe = True
+        return capabilities
+
+
 class PureMCPServer:
     """Pure MCP server implementation."""
     
-    def __init__(self):
-        """Initialize the MCP server."""
+    def __init__(self, registry: Optional[ClientRegistry] = None, client_name: Optional[str] = None):
+        """
+        Initialize the MCP server.
+        
+        Args:
+            registry: Shared client registry when hosted inside the HTTP app;
+                the stdio server creates and loads its own
+            client_name: Default client label for a hosted server, whose
+                callers are authenticated per request instead of via API_KEY
+        """
         load_environment()
         setup_logging()
         
@@ -40,10 +82,12 @@ class PureMCPServer:
         self.logger = logging.getLogger(__name__)
         
         # Initialize API key authentication
-        self.api_key = os.getenv("API_KEY")
-        self.client_name = None
+        self.api_key = None if registry else os.getenv("API_KEY")
+        self.client_name = client_name
         
-        if self.api_key:
+        if registry:
+            self.logger.info(f"MCP server hosted with shared client registry as '{client_name}'")
+        elif self.api_key:
             self.client_name = validate_api_key(self.api_key)
             if self.client_name:
                 self.logger.info(f"MCP Native Server initialized for client: {self.client_name}")
@@ -54,8 +98,18 @@ class PureMCPServer:
             self.logger.warning("No API key provided - running without authentication")
             self.client_name = "Anonymous MCP Client"
         
-        self.server = Server("mcp-server")
-        self.clients: Dict[str, Any] = {}
+        self.server = SubscribableServer("mcp-server")
+        self.registry = registry or ClientRegistry()
+        self.clients = self.registry.clients
+        self.snapshots: Optional[Any] = None
+        
+        # One poller per subscribed resource, shared by every session
+        subscription_config = get_subscription_config()
+        self.subscriptions = ResourceSubscriptions(
+            self._read_resource,
+            interval=subscription_config["poll_interval"],
+            max_resources=subscription_config["max_resources"]
+        )
         
         # Setup server handlers
         self._setup_handlers()
@@ -64,50 +118,102 @@ class PureMCPServer:
         """Set up MCP server handlers."""
         
         @self.server.list_tools()
-        async def handle_list_tools() -> List[Tool]:
-            """List all available tools."""
-            tools = []
+        async def handle_list_tools(request: types.ListToolsRequest) -> types.ListToolsResult:
+            """
+            List the available tools, one page of TOOLS_PAGE_SIZE at a time.
             
-            for client in self.clients.values():
-                if not client.is_enabled:
-                    continue
-                    
-                for tool_def in client.get_tools():
-                    tool = Tool(
-                        name=tool_def.name,
-                        description=tool_def.description,
-                        inputSchema=tool_def.inputSchema
-                    )
-                    tools.append(tool)
+            The request's `_meta` may carry `client` and `prefix` filters and
+            `fields` ("names" leaves out descriptions and schemas).
+            """
+            params = request.params if request is not None else None
+            meta = self._list_meta(request)
             
-            return tools
+            # The SDK lists without a request to refresh its tool cache; give it every tool
+            page_size = get_catalog_config()["page_size"] if request is not None else 0
+            try:
+                page, next_cursor = self.registry.list_tools(
+                    cursor=params.cursor if params is not None else None,
+                    limit=page_size or None,
+                    client=meta.get("client"),
+                    prefix=meta.get("prefix")
+                )
+            except InvalidCursorError as e:
+                raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+            
+            names_only = meta.get("fields") == "names"
+            tools = [
+                Tool(
+                    name=tool_def.name,
+                    description=None if names_only else tool_def.description,
+                    inputSchema={"type": "object"} if names_only else tool_def.inputSchema
+                )
+                for _, tool_def in page
+            ]
+            return types.ListToolsResult(tools=tools, nextCursor=next_cursor)
+        
+        # The SDK keeps every listed tool in its tool cache; answer names-only
+        # pages directly so their stub schemas never replace the real ones
+        cached_list_tools = self.server.request_handlers[types.ListToolsRequest]
         
-        @self.server.call_tool()
+        async def handle_list_tools_request(request: Optional[types.ListToolsRequest]) -> types.ServerResult:
+            """Route names-only listings around the SDK's tool cache."""
+            if self._list_meta(request).get("fields") == "names":
+                return types.ServerResult(await handle_list_tools(request))
+            return await cached_list_tools(request)
+        
+        self.server.request_handlers[types.ListToolsRequest] = handle_list_tools_request
+        
+        # Arguments are checked by each client's compiled validator instead
+        @self.server.call_tool(validate_input=False)
         async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool execution."""
+            client_name = self._get_client_name()
+            
             # Log tool execution with client identification
-            self.logger.info(f"Client '{self.client_name}' executing tool: {name} with arguments: {arguments}")
+            self.logger.info(f"Client '{client_name}' executing tool: {name} with arguments: {arguments}")
             
             # Execute tool through clients
-            for client in self.clients.values():
-                if client.has_tool(name):
-                    try:
-                        result = await client.execute_tool(name, arguments)
-                        
-                        # Convert result to MCP format
-                        content = []
-                        for item in result.content:
-                            if item["type"] == "text":
-                                content.append(TextContent(type="text", text=item["text"]))
-                        
-                        return content
-                    except Exception as e:
-                        self.logger.error(f"Error executing tool {name} for client '{self.client_name}': {e}")
-                        return [TextContent(type="text", text=f"Tool execution failed: {str(e)}")]
-            
-            # Tool not found
-            self.logger.warning(f"Tool '{name}' not found for client '{self.client_name}'")
-            return [TextContent(type="text", text=f"Tool '{name}' not found")]
+            client = self.registry.find_client(name)
+            if client is None:
+                # Tool not found
+                self.logger.warning(f"Tool '{name}' not found for client '{client_name}'")
+                raise ToolCallError(f"Tool '{name}' not found")
+            
+            try:
+                arguments = client.validate_arguments(name, arguments)
+            except ToolArgumentError as e:
+                self.logger.warning(f"Rejected call to {name} for client '{client_name}': {e}")
+                raise ToolCallError(str(e)) from e
+            
+            # Tools with a cache policy answer repeated calls without running (or queueing)
+            tool = client.get_tool(name)
+            tool_cache = get_tool_cache()
+            cache_key = tool_cache.key(tool, arguments, client_name)
+            cached = tool_cache.get(cache_key)
+            if cached is not None:
+                return self._text_content(cached)
+            
+            # Shed load with a fast error result rather than queueing without limit
+            try:
+                ticket = await get_admission_controller().acquire(tool)
+            except AdmissionRejected as e:
+                self.logger.warning(f"Shed call to {name} for client '{client_name}': {e}")
+                raise
+            
+            try:
+                progress_token = self._get_progress_token()
+                if progress_token is not None:
+                    return await self._stream_tool(client, name, arguments, progress_token)
+                
+                result = await tool_cache.run(cache_key, tool, lambda: client.run_tool(name, arguments))
+                return self._text_content(result)
+            except ToolCallError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Error executing tool {name} for client '{client_name}': {e}")
+                raise ToolCallError(f"Tool execution failed: {str(e)}") from e
+            finally:
+                ticket.release()
         
         @self.server.list_resources()
         async def handle_list_resources() -> List[Resource]:
@@ -128,44 +234,176 @@ class PureMCPServer:
             
             return resources
         
+        @self.server.list_resource_templates()
+        async def handle_list_resource_templates() -> List[ResourceTemplate]:
+            """List the resource templates of the enabled clients."""
+            return [
+                ResourceTemplate(**template)
+                for client in self.clients.values()
+                if client.is_enabled
+                for template in client.get_resource_templates()
+            ]
+        
         @self.server.read_resource()
-        async def handle_read_resource(uri: str) -> str:
-            """Read a resource."""
-            # Parse client name from URI (format: clientname://help)
-            if "://help" in uri:
-                client_name = uri.split("://")[0]
-                
-                if client_name in self.clients:
-                    client = self.clients[client_name]
-                    if hasattr(client, 'get_help_text'):
-                        return client.get_help_text()
-                    else:
-                        # Generic help text
-                        tools = client.get_tools()
-                        help_lines = [f"{client_name.capitalize()} Assistant Help", "", "Available Tools:"]
-                        
-                        for i, tool in enumerate(tools, 1):
-                            help_lines.append(f"{i}. {tool.name}")
-                            help_lines.append(f"   - {tool.description}")
-                            help_lines.append("")
-                        
-                        return "\n".join(help_lines)
+        async def handle_read_resource(uri: Any) -> str:
+            """Read a resource, answering watched ones from their last poll."""
+            uri = str(uri)
+            latest = self.subscriptions.latest(uri)
+            if latest is not None:
+                return latest
             
+            try:
+                return await self._read_resource(uri)
+            except ValueError as e:
+                raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+        
+        @self.server.subscribe_resource()
+        async def handle_subscribe_resource(uri: Any) -> None:
+            """Subscribe the calling session to `notifications/resources/updated` for a resource."""
+            uri = str(uri)
+            session = self.server.request_context.session
+            try:
+                await self.subscriptions.subscribe(uri, session)
+            except (ValueError, SubscriptionLimitError) as e:
+                raise McpError(ErrorData(code=INVALID_PARAMS, message=str(e)))
+            self.logger.info(f"Client '{self._get_client_name()}' subscribed to {uri}")
+        
+        @self.server.unsubscribe_resource()
+        async def handle_unsubscribe_resource(uri: Any) -> None:
+            """Unsubscribe the calling session from a resource."""
+            await self.subscriptions.unsubscribe(str(uri), self.server.request_context.session)
+    
+    async def _read_resource(self, uri: str) -> str:
+        """
+        Read a resource of an enabled client; its URI scheme is the client name.
+        
+        Raises:
+            ValueError: If no client serves the URI
+        """
+        client_name = uri.split("://")[0]
+        client = self.clients.get(client_name)
+        if client is None or not client.is_enabled:
             raise ValueError(f"Unknown resource: {uri}")
+        
+        # Format: clientname://help
+        if uri == f"{client_name}://help":
+            help_text = client.get_help_text() if hasattr(client, 'get_help_text') else None
+            if help_text is not None:
+                return help_text
+            else:
+                # Generic help text
+                tools = client.get_tools()
+                help_lines = [f"{client_name.capitalize()} Assistant Help", "", "Available Tools:"]
+                
+                for i, tool in enumerate(tools, 1):
+                    help_lines.append(f"{i}. {tool.name}")
+                    help_lines.append(f"   - {tool.description}")
+                    help_lines.append("")
+                
+                return "\n".join(help_lines)
+        
+        text = await client.read_resource(uri)
+        if text is None:
+            raise ValueError(f"Unknown resource: {uri}")
+        return text
+    
+    def _get_client_name(self) -> Optional[str]:
+        """Return the authenticated client of the current request, falling back to the server's client."""
+        try:
+            request = self.server.request_context.request
+        except LookupError:
+            request = None
+        
+        state = getattr(request, "state", None)
+        return getattr(state, "client_name", None) or self.client_name
+    
+    def _get_progress_token(self) -> Optional[Any]:
+        """Return the progress token of the current request, if the caller sent one."""
+        try:
+            meta = self.server.request_context.meta
+        except LookupError:
+            return None
+        return meta.progressToken if meta else None
+    
+    @staticmethod
+    def _list_meta(request: Optional[types.ListToolsRequest]) -> Dict[str, Any]:
+        """Get the extra `_meta` fields of a tools/list request (filters and `fields`)."""
+        params = request.params if request is not None else None
+        meta = params.meta.model_extra if params is not None and params.meta is not None else None
+        return meta or {}
+    
+    @staticmethod
+    def _text_content(result: ToolResult) -> List[TextContent]:
+        """
+        Convert a tool result to MCP text content.
+        
+        Raises:
+            ToolCallError: If the result is an error, so it is returned with `isError`
+        """
+        if result.isError:
+            raise ToolCallError("\n".join(item["text"] for item in result.content if item["type"] == "text"))
+        return [TextContent(type="text", text=item["text"]) for item in result.content if item["type"] == "text"]
+    
+    async def _stream_tool(self, client: Any, name: str, arguments: Dict[str, Any], progress_token: Any) -> List[TextContent]:
+        """
+        Execute a tool through its stream, reporting each chunk as progress.
+        
+        Every partial text result is sent as a `notifications/progress` message
+        so the caller can render it immediately; the final response still
+        carries the complete text.
+        """
+        context = self.server.request_context
+        texts = []
+        
+        async for partial in client.run_tool_stream(name, arguments):
+            if partial.isError:
+                return self._text_content(partial)
+            
+            for item in partial.content:
+                if item["type"] != "text":
+                    continue
+                texts.append(item["text"])
+                await context.session.send_progress_notification(
+                    progress_token,
+                    len(texts),
+                    message=item["text"],
+                    related_request_id=str(context.request_id)
+                )
+        
+        return [TextContent(type="text", text="".join(texts))] if texts else []
     
     async def initialize_clients(self) -> None:
         """Initialize all MCP clients."""
         try:
+            # A hosted server shares clients already loaded by the HTTP app
+            if self.clients:
+                return
+            
             # Load all clients dynamically
             loaded_clients = load_all_mcp_clients()
-            self.clients.update(loaded_clients)
+            self.registry.update(loaded_clients)
+            self.registry.update({CATALOG_CLIENT_NAME: CatalogClient(self.registry)})
+            
+            # Warm the caches from the previous run before background work starts
+            self.snapshots = create_snapshot_manager(self.registry, get_snapshot_config())
+            if self.snapshots:
+                self.snapshots.load()
+                self.snapshots.start()
             
+            await self.registry.start_all()
+        
         except Exception as e:
             print(f"Error initializing clients: {e}", file=sys.stderr)
             raise
     
     async def run(self) -> None:
         """Run the MCP server."""
+        # stdio carries the protocol, so diagnostics are dumped to files on SIGUSR1
+        diagnostics = get_diagnostics()
+        if diagnostics.enabled:
+            diagnostics.start()
+            diagnostics.install_signal_handler()
+        
         try:
             await self.initialize_clients()
             
@@ -185,12 +423,19 @@ class PureMCPServer:
                         )
                     )
                 )
-                
+        
         except Exception as e:
             print(f"Server error: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc(file=sys.stderr)
             raise
+        finally:
+            await self.subscriptions.close()
+            await self.registry.close_all()
+            if self.snapshots:
+                await self.snapshots.stop()
+            await shutdown_tool_executor()
+            diagnostics.stop()
 
 
 async def main():
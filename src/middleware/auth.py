@@ -23,14 +23,8 @@ def validate_api_key(api_key: str) -> Optional[str]:
         return client_name
     return None
 
-async def validate_client_request(request: Request):
-    """Middleware to validate API key."""
-    # Skip validation for health checks and docs
-    if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
-        return None
-    
-    # Get API key from header
-    api_key = request.headers.get("X-API-Key")
+def authenticate_api_key(api_key: Optional[str]) -> str:
+    """Validate an API key sent with a request, raising HTTP 401 if it is missing or invalid."""
     if not api_key:
         raise HTTPException(
             status_code=401,
@@ -46,6 +40,18 @@ async def validate_client_request(request: Request):
             detail="Invalid API key"
         )
     
+    return client_name
+
+async def validate_client_request(request: Request):
+    """Middleware to validate API key."""
+    # Skip validation for health checks and docs
+    if request.url.path in ["/health", "/", "/docs", "/openapi.json"]:
+        return None
+    
+    # Get API key from header
+    api_key = request.headers.get("X-API-Key")
+    client_name = authenticate_api_key(api_key)
+    
     # Add client info to request state
     request.state.client_name = client_name
     request.state.api_key = api_key
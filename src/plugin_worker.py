@@ -0,0 +1,183 @@
+"""Worker process hosting one plugin client behind a Unix socket.
+
+Started by RemoteClient as `python -m src.plugin_worker <client> <socket path>`.
+"""
+
+from typing import Any, Dict, Set
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+from .core.executor import shutdown_tool_executor
+from .core.ipc import read_frame, result_to_message, write_frame
+from .utils.base_client_loader import create_client
+from .utils.client_config import get_client_configs
+from .utils.config import load_environment, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# How often to check that the server that started this worker is still alive
+PARENT_CHECK_INTERVAL = 1.0
+
+
+class PluginWorker:
+    """Serves tool calls for one client over framed messages."""
+    
+    def __init__(self, client: Any):
+        """Initialize the worker for a loaded client."""
+        self.client = client
+        self.in_flight = 0
+        self.calls = 0
+        self.writers: Set[asyncio.StreamWriter] = set()
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one connection, several at a time."""
+        drain_lock = asyncio.Lock()
+        tasks: Set["asyncio.Task[None]"] = set()
+        self.writers.add(writer)
+        
+        async def send(message: Dict[str, Any]) -> None:
+            write_frame(writer, message)
+            async with drain_lock:
+                await writer.drain()
+        
+        try:
+            while True:
+                message = await read_frame(reader)
+                task = asyncio.get_running_loop().create_task(self.handle_message(message, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.writers.discard(writer)
+            writer.close()
+    
+    async def handle_message(self, message: Dict[str, Any], send: Any) -> None:
+        """Handle one request, replying with a result, stream chunks or an error."""
+        request_id = message.get("id")
+        op = message.get("op")
+        
+        try:
+            if op == "describe":
+                await send({"id": request_id, "result": self.describe()})
+            elif op == "shard_key":
+                await send({"id": request_id, "result": {"key": self.client.shard_key(message["tool"], message["args"])}})
+            elif op == "read_resource":
+                try:
+                    text = await self.client.read_resource(message["uri"])
+                except ValueError as e:
+                    await send({"id": request_id, "result": {"invalid": str(e)}})
+                else:
+                    await send({"id": request_id, "result": {"text": text}})
+            elif op == "ping":
+                await send({"id": request_id, "result": {"pid": os.getpid(), "in_flight": self.in_flight, "calls": self.calls}})
+            elif op == "call":
+                self.in_flight += 1
+                self.calls += 1
+                try:
+                    result = await self.client.run_tool(message["tool"], message["args"])
+                finally:
+                    self.in_flight -= 1
+                await send({"id": request_id, "result": result_to_message(result)})
+            elif op == "stream":
+                self.in_flight += 1
+                self.calls += 1
+                try:
+                    async for partial in self.client.run_tool_stream(message["tool"], message["args"]):
+                        await send({"id": request_id, "chunk": result_to_message(partial)})
+                finally:
+                    self.in_flight -= 1
+                await send({"id": request_id, "end": True})
+            else:
+                await send({"id": request_id, "error": f"Unknown operation: {op}"})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error handling {op} in {self.client.name} worker: {e}")
+            await send({"id": request_id, "error": str(e)})
+    
+    def describe(self) -> Dict[str, Any]:
+        """Describe the client, its tools, resource templates and help text."""
+        return {
+            "pid": os.getpid(),
+            "description": self.client.description,
+            "resource_templates": self.client.get_resource_templates(),
+            "help_text": self.client.get_help_text() if hasattr(self.client, "get_help_text") else None,
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": tool.inputSchema,
+                    "execution": tool.execution,
+                    "max_concurrency": tool.max_concurrency,
+                    "max_queue": tool.max_queue,
+                    "cache": None if tool.cache is None else {
+                        "ttl": tool.cache.ttl,
+                        "key_arguments": tool.cache.key_arguments,
+                        "scope": tool.cache.scope,
+                        "cache_errors": tool.cache.cache_errors
+                    }
+                }
+                for tool in self.client.get_tools()
+            ]
+        }
+
+
+async def serve(client_name: str, socket_path: str) -> None:
+    """Load a client and serve it on a Unix socket until told to stop or orphaned."""
+    load_environment()
+    config = get_client_configs().get(client_name)
+    if config is None:
+        raise ValueError(f"Unknown client: {client_name}")
+    
+    client = create_client(client_name, config)
+    await client.start()
+    
+    worker = PluginWorker(client)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(worker.handle_connection, path=socket_path)
+    logger.info(f"{client_name} worker {os.getpid()} listening on {socket_path}")
+    
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    
+    # Exit with the server, even if it was killed without stopping its workers
+    parent_pid = os.getppid()
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=PARENT_CHECK_INTERVAL)
+        except asyncio.TimeoutError:
+            if os.getppid() != parent_pid:
+                logger.warning(f"{client_name} worker {os.getpid()} orphaned, exiting")
+                break
+    
+    server.close()
+    for writer in list(worker.writers):
+        writer.close()
+    await server.wait_closed()
+    await client.close()
+    await shutdown_tool_executor()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+
+def main() -> None:
+    """Entry point."""
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.plugin_worker <client> <socket path>", file=sys.stderr)
+        sys.exit(2)
+    
+    setup_logging()
+    asyncio.run(serve(sys.argv[1], sys.argv[2]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Production entry point: a prefork uvicorn server.
+
+Run with `python -m src.serve` or the `mcp-server-serve` script. The parent
+imports the app and the enabled plugins, binds the listening socket and
+forks SERVER_WORKERS workers that inherit both, sharing the preloaded
+memory copy-on-write. Each worker runs its own event loop and starts its
+own clients. The parent restarts workers that die and, on SIGTERM or
+SIGINT, lets every worker drain its in-flight requests before exiting.
+"""
+
+from typing import Any, Dict
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from .utils.client_config import get_client_configs
+from .utils.config import get_serve_config, load_environment, setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Workers that die sooner than this after starting are restarted after RESTART_DELAY
+MIN_WORKER_LIFETIME = 1.0
+RESTART_DELAY = 1.0
+
+# How often the parent checks on its workers
+SUPERVISE_INTERVAL = 0.2
+
+# Extra seconds given to draining workers before they are killed
+KILL_GRACE = 5.0
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload() -> Any:
+    """Import the app and the enabled plugins so that workers inherit them already loaded."""
+    from .app import app
+    
+    for client_name, config in get_client_configs().items():
+        if config.enabled:
+            try:
+                importlib.import_module(f"src.clients.{client_name}.client")
+            except ImportError as e:
+                logger.warning(f"Could not preload {client_name} client: {e}")
+    
+    # Keep the preloaded objects out of garbage collection, which would
+    # otherwise touch (and so copy) their pages in every worker
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def run_worker(app: Any, sock: socket.socket, config: Dict[str, Any]) -> None:
+    """Serve requests on the shared socket until told to stop."""
+    # uvicorn installs its own handlers, which drain in-flight requests on SIGTERM/SIGINT
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, signal.SIG_DFL)
+    
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        loop=config["loop"],
+        http=config["http"],
+        backlog=config["backlog"],
+        timeout_keep_alive=config["keepalive"],
+        timeout_graceful_shutdown=config["graceful_timeout"] or None,
+        limit_concurrency=config["limit_concurrency"] or None,
+        limit_max_requests=config["max_requests"] or None,
+        access_log=config["access_log"],
+        log_config=None
+    ))
+    server.run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks the workers, restarts the ones that exit and drains them all on shutdown."""
+    
+    def __init__(self, app: Any, sock: socket.socket, config: Dict[str, Any]):
+        """Initialize the supervisor."""
+        self.app = app
+        self.sock = sock
+        self.config = config
+        self.workers: Dict[int, float] = {}
+        self.stopping = False
+    
+    def spawn(self) -> None:
+        """Fork one worker."""
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.config)
+            except BaseException as e:
+                logger.error(f"Worker {os.getpid()} failed: {e}")
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+    
+    def reap(self) -> None:
+        """Collect exited workers, replacing them unless shutting down."""
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            
+            if self.stopping:
+                logger.info(f"Worker {pid} stopped")
+                continue
+            
+            code = os.waitstatus_to_exitcode(status) if hasattr(os, "waitstatus_to_exitcode") else status
+            
+            # Workers also exit on purpose after SERVER_MAX_REQUESTS requests
+            logger.warning(f"Worker {pid} exited ({code}), restarting")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(RESTART_DELAY)
+            self.spawn()
+    
+    def stop(self, signum: int, frame: Any) -> None:
+        """Begin a graceful shutdown."""
+        if not self.stopping:
+            logger.info(f"Received {signal.Signals(signum).name}, draining workers")
+        self.stopping = True
+    
+    def run(self) -> None:
+        """Run the workers until SIGTERM or SIGINT, then drain them."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        
+        for _ in range(self.config["workers"]):
+            self.spawn()
+        
+        while not self.stopping:
+            self.reap()
+            time.sleep(SUPERVISE_INTERVAL)
+        
+        self.drain()
+    
+    def drain(self) -> None:
+        """Ask every worker to finish its requests and exit, killing the ones that take too long."""
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        
+        deadline = time.monotonic() + self.config["graceful_timeout"] + KILL_GRACE
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(SUPERVISE_INTERVAL / 2)
+        
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not drain in time, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.workers.pop(pid, None)
+
+
+def main() -> None:
+    """Entry point."""
+    load_environment()
+    setup_logging()
+    config = get_serve_config()
+    
+    if config["workers"] < 1:
+        print("SERVER_WORKERS must be at least 1", file=sys.stderr)
+        sys.exit(2)
+    
+    # MCP sessions live in one worker, while connections are spread over all of them
+    if config["workers"] > 1 and "MCP_HTTP_STATELESS" not in os.environ:
+        os.environ["MCP_HTTP_STATELESS"] = "true"
+    
+    app = preload()
+    sock = bind_socket(config["host"], config["port"], config["backlog"])
+    logger.info(
+        f"Serving on {config['host']}:{config['port']} with {config['workers']} workers "
+        f"(loop={config['loop']}, http={config['http']}, keep-alive={config['keepalive']}s)"
+    )
+    
+    try:
+        Supervisor(app, sock, config).run()
+    finally:
+        sock.close()
+        logger.info("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,93 @@ from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel
 
 
-class ToolDefinition(BaseModel):
-    """Definition of an MCP tool."""
-    name: str
-    description: str
-    inputSchema: Dict[str, Any]
+class CachePolicy:
+    """
+    How the results of a tool are cached by the server.
+    
+    `key_arguments` names the arguments that identify a result (None means
+    all of them). `scope` is "shared" when every caller may get the same
+    result, or "api_key" to keep results per API key. Error results are
+    only cached when `cache_errors` is set.
+    """
+    __slots__ = ("ttl", "key_arguments", "scope", "cache_errors")
+    
+    def __init__(
+        self,
+        ttl: float,
+        key_arguments: Optional[List[str]] = None,
+        scope: str = "shared",
+        cache_errors: bool = False
+    ):
+        """Initialize the cache policy."""
+        if scope not in ("shared", "api_key"):
+            raise ValueError(f"Unknown cache scope: {scope}")
+        self.ttl = ttl
+        self.key_arguments = key_arguments
+        self.scope = scope
+        self.cache_errors = cache_errors
+    
+    def __repr__(self) -> str:
+        return f"CachePolicy(ttl={self.ttl!r}, scope={self.scope!r})"
+
+
+class ToolDefinition:
+    """
+    Definition of an MCP tool.
+    
+    `execution` declares how the tool runs: "async" tools are coroutines
+    awaited on the event loop, "thread" tools block (sync I/O or SDKs) and
+    run in a shared thread pool, and "process" tools are CPU-bound and run
+    in a shared process pool.
+    
+    `max_concurrency` and `max_queue` bound the calls of this tool that may
+    run and wait at once; None uses the server's per-tool defaults.
+    
+    `cache` makes the server cache the tool's results (see CachePolicy).
+    """
+    __slots__ = ("name", "description", "inputSchema", "execution", "max_concurrency", "max_queue", "cache")
+    
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        inputSchema: Dict[str, Any],
+        execution: str = "async",
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        cache: Optional[CachePolicy] = None
+    ):
+        """Initialize the tool definition."""
+        if execution not in ("async", "thread", "process"):
+            raise ValueError(f"Unknown execution mode for tool {name}: {execution}")
+        self.name = name
+        self.description = description
+        self.inputSchema = inputSchema
+        self.execution = execution
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.cache = cache
+    
+    def __repr__(self) -> str:
+        return f"ToolDefinition(name={self.name!r})"
 
 
-class ToolResult(BaseModel):
+class ToolResult:
     """Result of a tool execution."""
-    content: List[Dict[str, Any]]
-    isError: bool = False
+    __slots__ = ("content", "isError")
+    
+    def __init__(self, content: List[Dict[str, Any]], isError: bool = False):
+        """Initialize the tool result."""
+        self.content = content
+        self.isError = isError
+    
+    def __repr__(self) -> str:
+        return f"ToolResult(content={self.content!r}, isError={self.isError!r})"
+    
+    @property
+    def text(self) -> str:
+        """Get the text of the first content item, as returned by the HTTP API."""
+        return self.content[0]["text"] if self.content else "No result"
 
 
 class ClientConfig(BaseModel):
@@ -22,3 +98,37 @@ class ClientConfig(BaseModel):
     name: str
     description: str
     enabled: bool = True
+
+
+# API response schemas. Handlers return pre-encoded responses, so these only
+# document the HTTP API; they are never instantiated on the request path.
+
+class ToolInfo(BaseModel):
+    """A tool as listed by the HTTP API; `fields` may leave out the description and schema."""
+    name: str
+    client: str
+    description: Optional[str] = None
+    input_schema: Optional[Dict[str, Any]] = None
+
+
+class ToolListResponse(BaseModel):
+    """Response of `GET /tools`."""
+    tools: List[ToolInfo]
+    next_cursor: Optional[str] = None
+
+
+class ToolMatch(ToolInfo):
+    """A tool found by `GET /search/tools`."""
+    score: float
+
+
+class ToolSearchResponse(BaseModel):
+    """Response of `GET /search/tools`."""
+    query: str
+    tools: List[ToolMatch]
+
+
+class ToolCallResponse(BaseModel):
+    """Response of `POST /tools/{tool_name}`."""
+    tool: str
+    result: str
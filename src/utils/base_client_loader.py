@@ -3,13 +3,42 @@
 from typing import Any
 import importlib
 
+from ..core.remote_client import RemoteClient
 from ..types.common import ClientConfig
+from .config import get_isolation_config
 
 
 def load_client_class(client_name: str, client_config: ClientConfig) -> Any:
     """
     Dynamically load and initialize a client class.
     
+    Clients listed in PLUGIN_ISOLATION run in their own worker processes
+    and are represented here by a RemoteClient proxy.
+    
+    Args:
+        client_name: Name of the client (e.g., "weather", "stocks")
+        client_config: Configuration for the client
+        
+    Returns:
+        The initialized client instance
+    """
+    isolation = get_isolation_config(client_name)
+    if isolation["enabled"]:
+        return RemoteClient(
+            client_config,
+            workers=isolation["workers"],
+            max_concurrency=isolation["max_concurrency"],
+            health_interval=isolation["health_interval"],
+            start_timeout=isolation["start_timeout"]
+        )
+    
+    return create_client(client_name, client_config)
+
+
+def create_client(client_name: str, client_config: ClientConfig) -> Any:
+    """
+    Import and initialize a client class in this process.
+    
     Args:
         client_name: Name of the client (e.g., "weather", "stocks")
         client_config: Configuration for the client
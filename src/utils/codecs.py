@@ -0,0 +1,136 @@
+"""Response formats and compressions offered by the HTTP API, and Accept header negotiation."""
+
+from typing import Any, List, Optional, Tuple
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; MessagePack is offered only when it is installed
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # cbor2 is optional; CBOR is offered only when it is installed
+    cbor2 = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; zstd is offered only when it is installed
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+
+# Other names clients use for MessagePack
+MSGPACK_ALIASES = ("application/x-msgpack", "application/vnd.msgpack")
+
+
+def media_types() -> List[str]:
+    """Get the response formats available, JSON first (the default)."""
+    available = [JSON]
+    if msgpack is not None:
+        available.append(MSGPACK)
+    if cbor2 is not None:
+        available.append(CBOR)
+    return available
+
+
+def encodings() -> List[str]:
+    """Get the compressions available, preferred first."""
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    """Encode JSON-native content in a response format."""
+    if media_type == MSGPACK:
+        return msgpack.packb(content, use_bin_type=True)
+    if media_type == CBOR:
+        return cbor2.dumps(content)
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes, media_type: str) -> Any:
+    """Decode a response body by its media type (the Content-Type without parameters)."""
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    if media_type == MSGPACK or media_type in MSGPACK_ALIASES:
+        return msgpack.unpackb(data, raw=False)
+    if media_type == CBOR:
+        return cbor2.loads(data)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """Compress a body with gzip or zstd at a level."""
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _parse_header(header: str) -> List[Tuple[str, float]]:
+    """Parse an Accept or Accept-Encoding header into (value, quality) pairs in header order."""
+    parsed = []
+    for part in header.split(","):
+        value, _, params = part.partition(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        parsed.append((value, quality))
+    return parsed
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Choose the response format for an Accept header.
+    
+    The available format with the highest quality wins. Formats named
+    explicitly beat wildcards and, at equal quality, the one listed first
+    wins. JSON answers wildcards and anything the client did not ask for
+    in a format we offer.
+    """
+    if not accept:
+        return JSON
+    
+    best, best_rank = JSON, (0.0, False, 0)
+    listed = _parse_header(accept)
+    for media_type in media_types():
+        names = (media_type,) + (MSGPACK_ALIASES if media_type == MSGPACK else ())
+        matches = [(quality, True, -position) for position, (value, quality) in enumerate(listed) if value in names]
+        if not matches:
+            matches = [(quality, False, 0) for value, quality in listed if value in ("*/*", "application/*")]
+        rank = max(matches, default=(0.0, False, 0))
+        if rank[0] > 0 and rank > best_rank:
+            best, best_rank = media_type, rank
+    return best
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Choose the compression for an Accept-Encoding header, or None for an uncompressed body."""
+    if not accept_encoding:
+        return None
+    
+    listed = dict(_parse_header(accept_encoding))
+    best, best_quality = None, 0.0
+    for encoding in encodings():
+        quality = listed.get(encoding, listed.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
@@ -29,7 +29,171 @@ def get_mcp_config() -> Dict[str, Any]:
     """Get MCP server configuration from environment."""
     return {
         "name": get_env_var("MCP_SERVER_NAME", "mcp-server"),
-        "version": get_env_var("MCP_SERVER_VERSION", "1.0.0")
+        "version": get_env_var("MCP_SERVER_VERSION", "1.0.0"),
+        "stateless_http": get_env_var("MCP_HTTP_STATELESS", "false").lower() == "true"
+    }
+
+
+def get_serve_config() -> Dict[str, Any]:
+    """Get the settings of the production server (`python -m src.serve`)."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return {
+        "host": get_env_var("SERVER_HOST", "0.0.0.0"),
+        "port": int(get_env_var("SERVER_PORT", "8008")),
+        "workers": int(get_env_var("SERVER_WORKERS", str(cpus))),
+        "loop": get_env_var("SERVER_LOOP", "auto"),
+        "http": get_env_var("SERVER_HTTP", "auto"),
+        "backlog": int(get_env_var("SERVER_BACKLOG", "2048")),
+        "keepalive": int(get_env_var("SERVER_KEEPALIVE", "65")),
+        "graceful_timeout": int(get_env_var("SERVER_GRACEFUL_TIMEOUT", "30")),
+        "max_requests": int(get_env_var("SERVER_MAX_REQUESTS", "0")),
+        "limit_concurrency": int(get_env_var("SERVER_LIMIT_CONCURRENCY", "0")),
+        "access_log": get_env_var("SERVER_ACCESS_LOG", "false").lower() == "true"
+    }
+
+
+def get_cache_config() -> Dict[str, Any]:
+    """Get result cache configuration from environment."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    return {
+        "backend": get_env_var("CACHE_BACKEND", "memory").lower(),
+        "path": get_env_var("CACHE_PATH", os.path.join(project_root, ".cache", "results.sqlite3")),
+        "max_entries": int(get_env_var("CACHE_MAX_ENTRIES", "1024")),
+        "max_bytes": int(get_env_var("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    }
+
+
+def get_admission_config() -> Dict[str, Any]:
+    """Get the in-flight limits and queue sizes of tool admission control."""
+    return {
+        "max_in_flight": int(get_env_var("ADMISSION_MAX_IN_FLIGHT", "256")),
+        "max_queue": int(get_env_var("ADMISSION_MAX_QUEUE", "128")),
+        "tool_concurrency": int(get_env_var("ADMISSION_TOOL_CONCURRENCY", "64")),
+        "tool_queue": int(get_env_var("ADMISSION_TOOL_QUEUE", "32")),
+        "queue_timeout": float(get_env_var("ADMISSION_QUEUE_TIMEOUT", "5"))
+    }
+
+
+def get_catalog_config() -> Dict[str, Any]:
+    """Get the page sizes of tool listings."""
+    return {
+        "page_size": int(get_env_var("TOOLS_PAGE_SIZE", "100")),
+        "max_page_size": int(get_env_var("TOOLS_MAX_PAGE_SIZE", "500"))
+    }
+
+
+def get_cluster_config() -> Dict[str, Any]:
+    """Get the membership list and routing settings of a sharded cluster."""
+    nodes = [node.strip().rstrip("/") for node in get_env_var("CLUSTER_NODES", "").split(",") if node.strip()]
+    return {
+        "nodes": nodes,
+        "self": get_env_var("CLUSTER_SELF", "").strip().rstrip("/"),
+        "vnodes": int(get_env_var("CLUSTER_VNODES", "100")),
+        "load_factor": float(get_env_var("CLUSTER_LOAD_FACTOR", "1.25")),
+        "forward_timeout": float(get_env_var("CLUSTER_FORWARD_TIMEOUT", "10")),
+        "down_cooldown": float(get_env_var("CLUSTER_DOWN_COOLDOWN", "10"))
+    }
+
+
+def get_subscription_config() -> Dict[str, Any]:
+    """Get the polling settings of MCP resource subscriptions."""
+    return {
+        "poll_interval": float(get_env_var("SUBSCRIPTION_POLL_INTERVAL", "60")),
+        "max_resources": int(get_env_var("SUBSCRIPTION_MAX_RESOURCES", "1000"))
+    }
+
+
+def get_response_config() -> Dict[str, Any]:
+    """Get the compression settings of HTTP API responses and the size of the encoded response cache."""
+    return {
+        "compression_min_bytes": int(get_env_var("RESPONSE_COMPRESSION_MIN_BYTES", "1024")),
+        "gzip_level": int(get_env_var("RESPONSE_GZIP_LEVEL", "6")),
+        "zstd_level": int(get_env_var("RESPONSE_ZSTD_LEVEL", "3")),
+        "cache_max_entries": int(get_env_var("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+        "cache_max_bytes": int(get_env_var("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    }
+
+
+def get_capture_config() -> Dict[str, Any]:
+    """Get the file and settings of tool-call traffic capture."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    return {
+        "enabled": get_env_var("TRAFFIC_CAPTURE_ENABLED", "false").lower() == "true",
+        "path": get_env_var("TRAFFIC_CAPTURE_PATH", os.path.join(project_root, "logs", "traffic.jsonl")),
+        "upstream": get_env_var("TRAFFIC_CAPTURE_UPSTREAM", "true").lower() == "true",
+        "max_bytes": int(get_env_var("TRAFFIC_CAPTURE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    }
+
+
+def get_diagnostics_config() -> Dict[str, Any]:
+    """Get the settings of the debug endpoints, event-loop lag monitor and signal dumps."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    return {
+        "enabled": get_env_var("DEBUG_ENDPOINTS_ENABLED", "false").lower() == "true",
+        "api_keys": [key.strip() for key in get_env_var("DEBUG_API_KEYS", "").split(",") if key.strip()],
+        "profile_interval_ms": float(get_env_var("DEBUG_PROFILE_INTERVAL_MS", "10")),
+        "profile_max_seconds": float(get_env_var("DEBUG_PROFILE_MAX_SECONDS", "60")),
+        "lag_interval_ms": float(get_env_var("DEBUG_LAG_INTERVAL_MS", "100")),
+        "lag_window": float(get_env_var("DEBUG_LAG_WINDOW", "60")),
+        "dump_path": get_env_var("DEBUG_DUMP_PATH", os.path.join(project_root, "logs")),
+        "signal_profile_seconds": float(get_env_var("DEBUG_SIGNAL_PROFILE_SECONDS", "10"))
+    }
+
+
+def get_executor_config() -> Dict[str, Any]:
+    """Get the configuration of the pools that run blocking and CPU-bound tools."""
+    cpus = os.cpu_count() or 1
+    
+    return {
+        "thread_workers": int(get_env_var("TOOL_THREAD_WORKERS", str(min(32, cpus + 4)))),
+        "process_workers": int(get_env_var("TOOL_PROCESS_WORKERS", str(cpus))),
+        "max_queue": int(get_env_var("TOOL_MAX_QUEUE", "64")),
+        "slow_callback_ms": float(get_env_var("SLOW_CALLBACK_MS", "100"))
+    }
+
+
+def get_allocation_config() -> Dict[str, Any]:
+    """Get the settings of allocation tracing (per-tool counters and allocation sites)."""
+    return {
+        "enabled": get_env_var("ALLOC_TRACKING_ENABLED", "false").lower() == "true",
+        "frames": int(get_env_var("ALLOC_TRACKING_FRAMES", "1"))
+    }
+
+
+def get_isolation_config(client_name: str) -> Dict[str, Any]:
+    """
+    Get the process isolation settings of a client.
+    
+    PLUGIN_ISOLATION lists the clients that run in worker processes
+    (comma-separated, or "all"). Worker count and concurrency limit can be
+    set per client with a `_<CLIENT>` suffix, e.g. PLUGIN_WORKERS_WEATHER.
+    """
+    isolated = [name.strip().lower() for name in get_env_var("PLUGIN_ISOLATION", "").split(",") if name.strip()]
+    suffix = client_name.upper()
+    
+    return {
+        "enabled": "all" in isolated or client_name.lower() in isolated,
+        "workers": int(get_env_var(f"PLUGIN_WORKERS_{suffix}", get_env_var("PLUGIN_WORKERS", "1"))),
+        "max_concurrency": int(get_env_var(f"PLUGIN_MAX_CONCURRENCY_{suffix}", get_env_var("PLUGIN_MAX_CONCURRENCY", "32"))),
+        "health_interval": float(get_env_var("PLUGIN_HEALTH_INTERVAL", "5")),
+        "start_timeout": float(get_env_var("PLUGIN_START_TIMEOUT", "15"))
+    }
+
+
+def get_snapshot_config() -> Dict[str, Any]:
+    """Get warm-cache snapshot configuration from environment."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    
+    return {
+        "enabled": get_env_var("SNAPSHOT_ENABLED", "true").lower() == "true",
+        "path": get_env_var("SNAPSHOT_PATH", os.path.join(project_root, ".cache", "snapshot.bin")),
+        "interval": float(get_env_var("SNAPSHOT_INTERVAL", "300"))
     }
 
 
@@ -0,0 +1,37 @@
+"""Fast JSON encoding and decoding for hot paths."""
+
+from typing import Any
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON-native content (dicts, lists, strings, numbers) to compact UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Decode UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when it is installed.
+    
+    Handlers that return this directly skip FastAPI's response validation and
+    `jsonable_encoder` pass, so content must already be JSON-native.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -19,6 +19,22 @@ echo "3. 🔧 Available Tools (with API key):"
 curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/tools" | jq . 2>/dev/null || curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/tools"
 echo -e "\n"
 
+echo "3a. 📄 Tool Pages (names only, 1 per page):"
+PAGE=$(curl -s "$BASE_URL/tools?limit=1&fields=names")
+echo "$PAGE" | jq . 2>/dev/null || echo "$PAGE"
+CURSOR=$(echo "$PAGE" | jq -r '.next_cursor // empty' 2>/dev/null)
+if [ -n "$CURSOR" ]; then
+  echo "Next page:"
+  curl -s "$BASE_URL/tools?limit=1&fields=names&cursor=$CURSOR" | jq . 2>/dev/null || curl -s "$BASE_URL/tools?limit=1&fields=names&cursor=$CURSOR"
+fi
+echo "Invalid cursor (should fail with 400):"
+curl -s "$BASE_URL/tools?limit=1&cursor=not-a-cursor" | jq . 2>/dev/null || curl -s "$BASE_URL/tools?limit=1&cursor=not-a-cursor"
+echo -e "\n"
+
+echo "3b. 🔎 Tool Search (\"weather forecast\"):"
+curl -s "$BASE_URL/search/tools?q=weather%20forecast&limit=3" | jq . 2>/dev/null || curl -s "$BASE_URL/search/tools?q=weather%20forecast&limit=3"
+echo -e "\n"
+
 echo "4. 🌤️ Current Weather (London) - with API key:"
 curl -s -X POST "$BASE_URL/tools/get_current_weather" \
   -H "Content-Type: application/json" \
@@ -79,5 +95,33 @@ curl -s -X POST "$BASE_URL/tools/get_current_weather" \
   -d '{"location": "London"}'
 echo -e "\n"
 
+echo "8. 🩺 Debug Endpoints (with API key; 404 unless DEBUG_ENDPOINTS_ENABLED=true, 403 for keys outside DEBUG_API_KEYS):"
+echo "Event-loop lag:"
+curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/loop-lag" | jq . 2>/dev/null || curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/loop-lag"
+echo "Pending tasks (5 oldest):"
+curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/tasks?limit=5&depth=3" | jq . 2>/dev/null || curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/tasks?limit=5&depth=3"
+echo "Profile (1s of event-loop stacks; headers and first lines):"
+curl -s -i -H "X-API-Key: $API_KEY" "$BASE_URL/debug/profile?seconds=1" | head -12
+echo "Allocations (tracing on, top 5 sites, tracing off):"
+curl -s -X POST -H "X-API-Key: $API_KEY" "$BASE_URL/debug/allocations?enabled=true" | jq . 2>/dev/null || curl -s -X POST -H "X-API-Key: $API_KEY" "$BASE_URL/debug/allocations?enabled=true"
+curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/allocations?limit=5" | jq . 2>/dev/null || curl -s -H "X-API-Key: $API_KEY" "$BASE_URL/debug/allocations?limit=5"
+curl -s -X POST -H "X-API-Key: $API_KEY" "$BASE_URL/debug/allocations?enabled=false" > /dev/null
+echo "Debug endpoints without API key (should fail):"
+curl -s "$BASE_URL/debug/loop-lag" | jq . 2>/dev/null || curl -s "$BASE_URL/debug/loop-lag"
+echo -e "\n"
+
+echo "9. 📦 Negotiated Responses:"
+echo "MessagePack (JSON when msgpack is not installed):"
+curl -s -o /dev/null -D - -H "Accept: application/msgpack" "$BASE_URL/tools" | grep -i "^content-type\|^vary"
+echo "CBOR:"
+curl -s -o /dev/null -D - -H "Accept: application/cbor" "$BASE_URL/tools" | grep -i "^content-type"
+echo "gzip (bodies under RESPONSE_COMPRESSION_MIN_BYTES stay uncompressed):"
+curl -s -o /dev/null -D - -H "Accept-Encoding: gzip" "$BASE_URL/tools" | grep -i "^content-type\|^content-encoding"
+echo "zstd (falls back to gzip or identity when zstandard is not installed):"
+curl -s -o /dev/null -D - -H "Accept-Encoding: zstd, gzip;q=0.5" "$BASE_URL/tools" | grep -i "^content-encoding"
+echo "Decompressed gzip body (tool names):"
+curl -s --compressed "$BASE_URL/tools?fields=names" | jq -c '[.tools[].name]' 2>/dev/null || curl -s --compressed "$BASE_URL/tools?fields=names"
+echo -e "\n"
+
 echo "✅ All endpoint tests completed!"
 echo "📊 Check logs/mcp-server.log for client tracking information"
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Shared fixtures."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import urllib.parse
+
+import pytest
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Answers OWM current weather and forecast requests for any city or coordinates, recording their queries."""
+    
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        endpoint = url.path.rsplit("/", 1)[-1]
+        query = {key: values[0] for key, values in urllib.parse.parse_qs(url.query).items()}
+        self.server.requests.append(query)
+        if endpoint in self.server.failing:
+            self._reply(503, {"cod": 503, "message": "stand-in outage"})
+            return
+        
+        name = query["q"].split(",")[0] if "q" in query else "Greenwich"
+        coord = {"lat": float(query.get("lat", 51.51)), "lon": float(query.get("lon", -0.13))}
+        main = {"temp": 12.3, "humidity": 80, "pressure": 1012}
+        if endpoint == "forecast":
+            self._reply(200, {
+                "city": {"name": name, "country": "GB", "coord": coord},
+                "list": [
+                    {"dt": 1760000000 + i * 10800, "dt_txt": f"2025-10-09 {i * 3:02d}:00:00", "main": {**main, "temp": 10 + i},
+                     "weather": [{"description": "clear sky"}], "wind": {"speed": 2}}
+                    for i in range(8)
+                ]
+            })
+            return
+        self._reply(200, {
+            "name": name, "sys": {"country": "GB"}, "coord": coord, "dt": 1760000000,
+            "main": main, "weather": [{"description": "light rain"}], "wind": {"speed": 3.1}
+        })
+    
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def standin():
+    """Run a local OWM stand-in; `url` is its base URL, `requests` the queries it answered and `failing` the endpoints it fails with a 503."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.requests = []
+    server.failing = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def weather_env(monkeypatch, tmp_path):
+    """Configure the weather client for tests: a dummy API key, memory cache, no prefetch and no history."""
+    monkeypatch.setenv("OPENWEATHERMAP_API_KEY", "test")
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+    monkeypatch.setenv("WEATHER_PREFETCH_ENABLED", "false")
+    monkeypatch.setenv("WEATHER_HISTORY_ENABLED", "false")
+    monkeypatch.setenv("WEATHER_HISTORY_PATH", str(tmp_path / "history"))
@@ -0,0 +1,101 @@
+"""Admission control and load shedding."""
+
+import asyncio
+
+import pytest
+
+from src.core.admission import AdmissionController, AdmissionRejected
+from src.types.common import ToolDefinition
+
+
+def make_tool(max_concurrency=None, max_queue=None) -> ToolDefinition:
+    return ToolDefinition("slow", "Slow tool", {}, max_concurrency=max_concurrency, max_queue=max_queue)
+
+
+def test_full_tool_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(queue_timeout=1.0)
+        tool = make_tool(max_concurrency=1, max_queue=1)
+        
+        first = await controller.acquire(tool)
+        queued = asyncio.ensure_future(controller.acquire(tool))
+        await asyncio.sleep(0)
+        
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(tool)
+        assert rejected.value.scope == "tool"
+        assert rejected.value.retry_after >= 1
+        assert "retry after" in str(rejected.value)
+        
+        # The released slot passes straight to the queued call
+        first.release()
+        second = await queued
+        second.release()
+        return controller.stats()
+    
+    stats = asyncio.run(scenario())
+    gate = stats["tools"]["slow"]
+    assert (gate["admitted"], gate["shed"], gate["in_flight"], gate["queued"]) == (2, 1, 0, 0)
+    assert stats["global"]["in_flight"] == 0
+
+
+def test_retry_after_grows_with_recent_call_durations():
+    async def scenario():
+        controller = AdmissionController(queue_timeout=1.0)
+        tool = make_tool(max_concurrency=1, max_queue=20)
+        async with controller.admit(tool):
+            await asyncio.sleep(0.3)
+        
+        ticket = await controller.acquire(tool)
+        queued = [asyncio.ensure_future(controller.acquire(tool)) for _ in range(20)]
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(tool)
+        
+        gate = controller.stats()["tools"]["slow"]
+        
+        for call in queued:
+            call.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        ticket.release()
+        return rejected.value.retry_after, gate
+    
+    retry_after, gate = asyncio.run(scenario())
+    # One finished 0.3s call averages to about 60ms, and 21 calls are ahead of a retry
+    assert (gate["queued"], gate["shed"]) == (20, 1)
+    assert gate["avg_ms"] >= 60
+    assert retry_after >= 2
+
+
+def test_queued_calls_time_out():
+    async def scenario():
+        controller = AdmissionController(queue_timeout=0.05)
+        tool = make_tool(max_concurrency=1, max_queue=4)
+        
+        ticket = await controller.acquire(tool)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire(tool)
+        ticket.release()
+        return controller.stats()["tools"]["slow"]
+    
+    gate = asyncio.run(scenario())
+    assert (gate["shed"], gate["timed_out"], gate["queued"], gate["in_flight"]) == (1, 1, 0, 0)
+
+
+def test_global_limit_rejects_and_releases_the_tool_slot():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout=1.0)
+        first_tool = ToolDefinition("first", "First tool", {})
+        second_tool = ToolDefinition("second", "Second tool", {})
+        
+        async with controller.admit(first_tool):
+            with pytest.raises(AdmissionRejected) as rejected:
+                await controller.acquire(second_tool)
+            assert rejected.value.scope == "global"
+            assert rejected.value.tool_name == "second"
+        return controller.stats()
+    
+    stats = asyncio.run(scenario())
+    assert stats["tools"]["second"]["in_flight"] == 0
+    assert stats["global"]["in_flight"] == 0
+    assert stats["global"]["shed"] == 1
@@ -0,0 +1,85 @@
+"""Per-tool allocation accounting."""
+
+from typing import Any, Dict
+import asyncio
+
+from src.core.allocations import AllocationTracker
+from src.core.base_client import BaseClient
+from src.core.executor import ToolExecutor
+from src.types.common import ClientConfig, ToolDefinition, ToolResult
+
+MB = 1 << 20
+
+
+class MemoryClient(BaseClient):
+    """One tool that keeps a megabyte per call, and one that only uses it briefly."""
+    
+    def __init__(self, config: ClientConfig):
+        super().__init__(config)
+        self.kept = []
+    
+    def _initialize_tools(self) -> None:
+        self.register_tool(ToolDefinition(name="hoard", description="Keep a megabyte", inputSchema={}))
+        self.register_tool(ToolDefinition(name="churn", description="Use a megabyte", inputSchema={}))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        await asyncio.sleep(0)
+        block = bytearray(MB)
+        await asyncio.sleep(0)
+        if tool_name == "hoard":
+            self.kept.append(block)
+        del block
+        return ToolResult(content=[{"type": "text", "text": tool_name}])
+
+
+def run_calls(tracker: AllocationTracker, calls) -> MemoryClient:
+    client = MemoryClient(ClientConfig(name="memory", description="Memory"))
+    executor = ToolExecutor(slow_callback=0, allocations=tracker)
+    
+    async def scenario():
+        for tool_name in calls:
+            await executor.run(client, tool_name, {})
+    
+    asyncio.run(scenario())
+    return client
+
+
+def test_calls_are_charged_to_their_tool_while_tracing():
+    tracker = AllocationTracker()
+    tracker.start()
+    try:
+        run_calls(tracker, ["hoard", "churn", "hoard", "churn"])
+        tools = tracker.stats()["tools"]
+    finally:
+        tracker.stop()
+    
+    hoard, churn = tools["memory.hoard"], tools["memory.churn"]
+    assert hoard["calls"] == churn["calls"] == 2
+    assert hoard["mean_net_bytes"] >= MB and hoard["total_net_bytes"] >= 2 * MB
+    assert churn["max_peak_bytes"] >= MB
+    assert churn["max_net_bytes"] < MB // 10
+
+
+def test_top_sites_report_growth_since_the_previous_snapshot():
+    tracker = AllocationTracker()
+    tracker.start()
+    try:
+        first = tracker.top_sites()
+        client = run_calls(tracker, ["hoard"] * 3)
+        second = tracker.top_sites(limit=5)
+    finally:
+        tracker.stop()
+    
+    assert first["tracing"] and not first["compared_to_previous"]
+    assert second["compared_to_previous"]
+    top = second["sites"][0]
+    assert top["site"].startswith(f"{__file__}:")
+    assert top["growth_bytes"] >= 3 * MB
+    assert len(client.kept) == 3
+    assert tracker.top_sites() == {"tracing": False, "sites": []}
+
+
+def test_nothing_is_counted_without_tracing():
+    tracker = AllocationTracker()
+    run_calls(tracker, ["hoard", "churn"])
+    assert tracker.stats() == {"tracing": False, "traced_bytes": None, "tools": {}}
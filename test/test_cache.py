@@ -0,0 +1,47 @@
+"""SQLite cache namespaces are bounded separately."""
+
+from src.core.cache import SQLiteCache
+
+
+def test_eviction_stays_within_namespace(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    small = SQLiteCache(path, namespace="small", max_bytes=100)
+    large = SQLiteCache(path, namespace="large", max_bytes=1024 * 1024)
+    for i in range(20):
+        large.set(f"key{i}", "x" * 50, 600)
+    for i in range(10):
+        small.set(f"key{i}", "y" * 50, 600)
+    
+    small.evict()
+    
+    assert small.stats()["bytes"] <= 100
+    assert small.get("key9") == "y" * 50
+    assert small.get("key0") is None
+    assert large.stats()["entries"] == 20
+    assert large.get("key0") == "x" * 50
+
+
+def test_expired_entries_of_other_namespaces_are_left_alone(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SQLiteCache(path, namespace="first")
+    second = SQLiteCache(path, namespace="second")
+    first.set("stale", 1, -1)
+    second.set("stale", 2, -1)
+    
+    first.evict()
+    
+    assert first.stats()["entries"] == 0
+    assert second.stats()["entries"] == 1
+
+
+def test_clear_keeps_namespaces_with_a_shared_prefix(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    weather = SQLiteCache(path, namespace="weather")
+    negative = SQLiteCache(path, namespace="weather-negative")
+    weather.set("a", 1, 600)
+    negative.set("a", 2, 600)
+    
+    weather.clear()
+    
+    assert weather.get("a") is None
+    assert negative.get("a") == 2
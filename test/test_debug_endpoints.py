@@ -0,0 +1,46 @@
+"""Access to the /debug endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+from src.core import diagnostics
+from src.middleware.auth import VALID_API_KEYS
+
+OPERATOR_KEY, CLIENT_KEY = list(VALID_API_KEYS)[:2]
+
+
+@pytest.fixture
+def debug_client(monkeypatch):
+    """Get a test client of the app (without its startup) whose diagnostics are configured per test."""
+    def configure(**env):
+        for name in ("DEBUG_ENDPOINTS_ENABLED", "DEBUG_API_KEYS"):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setattr(diagnostics, "_diagnostics", None)
+        return TestClient(app_module.app)
+    
+    return configure
+
+
+def test_debug_endpoints_are_off_by_default(debug_client):
+    client = debug_client()
+    response = client.get("/debug/loop-lag", headers={"X-API-Key": OPERATOR_KEY})
+    assert response.status_code == 404
+    assert client.get("/debug/loop-lag").status_code == 401
+
+
+def test_enabled_debug_endpoints_accept_any_valid_key(debug_client):
+    client = debug_client(DEBUG_ENDPOINTS_ENABLED="true")
+    assert client.get("/debug/loop-lag", headers={"X-API-Key": CLIENT_KEY}).status_code == 200
+    assert client.get("/debug/loop-lag", headers={"X-API-Key": "invalid"}).status_code == 401
+
+
+def test_debug_api_keys_restrict_the_endpoints(debug_client):
+    client = debug_client(DEBUG_ENDPOINTS_ENABLED="true", DEBUG_API_KEYS=f" {OPERATOR_KEY} ,")
+    assert client.get("/debug/loop-lag", headers={"X-API-Key": OPERATOR_KEY}).status_code == 200
+    
+    denied = client.post("/debug/allocations?enabled=true", headers={"X-API-Key": CLIENT_KEY})
+    assert denied.status_code == 403
+    assert client.get("/debug/tasks", headers={"X-API-Key": CLIENT_KEY}).status_code == 403
@@ -0,0 +1,82 @@
+"""Tool execution modes and shutdown of the tool executor."""
+
+from typing import Any, Dict
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.base_client import BaseClient
+from src.core.executor import ToolExecutor
+from src.types.common import ClientConfig, ToolDefinition, ToolResult
+
+
+class BlockingClient(BaseClient):
+    """A client with one blocking tool."""
+    
+    def _initialize_tools(self) -> None:
+        self.register_tool(ToolDefinition(name="wait", description="Block briefly", inputSchema={}, execution="thread"))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        raise AssertionError("thread tools do not run on the event loop")
+    
+    def execute_tool_sync(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        time.sleep(arguments.get("seconds", 0.01))
+        return ToolResult(content=[{"type": "text", "text": threading.current_thread().name}])
+
+
+def test_shutdown_waits_off_the_event_loop():
+    client = BlockingClient(ClientConfig(name="blocking", description="Blocking"))
+    executor = ToolExecutor(thread_workers=1)
+    
+    async def scenario():
+        running = asyncio.get_running_loop().create_task(executor.run(client, "wait", {"seconds": 0.3}))
+        await asyncio.sleep(0.05)
+        ticks = 0
+        
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticker = asyncio.get_running_loop().create_task(tick())
+        await executor.shutdown()
+        ticker.cancel()
+        return await running, ticks
+    
+    result, ticks = asyncio.run(scenario())
+    assert not result.isError
+    assert ticks >= 10
+    assert executor.stats()["pools"]["thread"]["completed"] == 1
+
+
+class MissingHookClient(BaseClient):
+    """A client declaring a blocking tool without implementing it."""
+    
+    def _initialize_tools(self) -> None:
+        self.register_tool(ToolDefinition(name="wait", description="Block briefly", inputSchema={}, execution="thread"))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        return ToolResult(content=[{"type": "text", "text": "ran on the loop"}])
+
+
+def test_thread_tools_run_in_the_thread_pool():
+    client = BlockingClient(ClientConfig(name="blocking", description="Blocking"))
+    executor = ToolExecutor(thread_workers=1)
+    
+    async def scenario():
+        try:
+            return await executor.run(client, "wait", {})
+        finally:
+            await executor.shutdown()
+    
+    result = asyncio.run(scenario())
+    assert result.content[0]["text"] != threading.main_thread().name
+    assert executor.stats()["pools"]["thread"]["completed"] == 1
+
+
+def test_tools_without_their_execution_hook_are_rejected_at_registration():
+    with pytest.raises(ValueError, match="MissingHookClient does not define execute_tool_sync"):
+        MissingHookClient(ClientConfig(name="missing", description="Missing hook"))
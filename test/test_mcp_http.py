@@ -0,0 +1,40 @@
+"""Native MCP over Streamable HTTP at /mcp."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+from src.middleware.auth import VALID_API_KEYS
+
+API_KEY = next(iter(VALID_API_KEYS))
+HEADERS = {"X-API-Key": API_KEY, "Accept": "application/json, text/event-stream"}
+
+
+def _message(response) -> dict:
+    """Get the JSON-RPC message of a single-event SSE response."""
+    data = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert len(data) == 1
+    return json.loads(data[0])
+
+
+def test_initialize_and_list_tools(weather_env, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_ENABLED", "false")
+    
+    with TestClient(app_module.app) as client:
+        initialize = client.post("/mcp", headers=HEADERS, json={
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {"protocolVersion": "2025-03-26", "capabilities": {}, "clientInfo": {"name": "test", "version": "1.0"}}
+        })
+        assert initialize.status_code == 200
+        assert "tools" in _message(initialize)["result"]["capabilities"]
+        
+        headers = {**HEADERS, "mcp-session-id": initialize.headers["mcp-session-id"]}
+        assert client.post("/mcp", headers=headers, json={"jsonrpc": "2.0", "method": "notifications/initialized"}).status_code == 202
+        
+        listed = _message(client.post("/mcp", headers=headers, json={"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}}))
+        names = {tool["name"] for tool in listed["result"]["tools"]}
+        assert {"get_current_weather", "get_weather_forecast"} <= names
+        
+        unauthenticated = client.post("/mcp", headers={"Accept": HEADERS["Accept"]}, json={"jsonrpc": "2.0", "id": 3, "method": "tools/list"})
+        assert unauthenticated.status_code == 401
@@ -0,0 +1,84 @@
+"""Native MCP server: error results and names-only tool listings."""
+
+from typing import Any, Dict
+import asyncio
+
+import mcp.types as types
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from src.core.base_client import BaseClient
+from src.core.registry import ClientRegistry
+from src.mcp_server import PureMCPServer
+from src.types.common import ClientConfig, ToolDefinition, ToolResult
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"count": {"type": "integer", "minimum": 1}},
+    "required": ["count"]
+}
+
+
+class DemoClient(BaseClient):
+    """One tool that repeats a word, failing for counts above 3."""
+    
+    def _initialize_tools(self) -> None:
+        self.register_tool(ToolDefinition(name="repeat", description="Repeat a word", inputSchema=SCHEMA))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        if arguments["count"] > 3:
+            return ToolResult(content=[{"type": "text", "text": "Too many"}], isError=True)
+        return ToolResult(content=[{"type": "text", "text": "hi " * arguments["count"]}])
+
+
+def _server() -> PureMCPServer:
+    registry = ClientRegistry()
+    registry.update({"demo": DemoClient(ClientConfig(name="demo", description="Demo"))})
+    return PureMCPServer(registry=registry, client_name="test")
+
+
+def _call(server: PureMCPServer, name: str, arguments: Dict[str, Any]) -> types.CallToolResult:
+    async def call():
+        async with create_connected_server_and_client_session(server.server) as session:
+            return await session.call_tool(name, arguments)
+    return asyncio.run(call())
+
+
+def test_successful_call_is_not_an_error():
+    result = _call(_server(), "repeat", {"count": "2"})
+    assert not result.isError
+    assert result.content[0].text == "hi hi "
+
+
+def test_invalid_arguments_are_an_error_result():
+    result = _call(_server(), "repeat", {"count": 0})
+    assert result.isError
+    assert "count" in result.content[0].text
+
+
+def test_unknown_tool_is_an_error_result():
+    result = _call(_server(), "missing", {})
+    assert result.isError
+    assert result.content[0].text == "Tool 'missing' not found"
+
+
+def test_tool_error_is_an_error_result():
+    result = _call(_server(), "repeat", {"count": 5})
+    assert result.isError
+    assert result.content[0].text == "Too many"
+
+
+def test_names_only_listing_keeps_cached_schemas():
+    server = _server()
+    
+    async def scenario():
+        async with create_connected_server_and_client_session(server.server) as session:
+            await session.list_tools()
+            request = types.ListToolsRequest(params=types.PaginatedRequestParams(_meta={"fields": "names"}))
+            names = await session.send_request(types.ClientRequest(request), types.ListToolsResult)
+            return names
+    
+    names = asyncio.run(scenario())
+    assert [tool.name for tool in names.tools] == ["repeat"]
+    assert names.tools[0].inputSchema == {"type": "object"}
+    assert server.server._tool_cache["repeat"].inputSchema == SCHEMA
+    assert server.server._tool_cache["repeat"].description == "Repeat a word"
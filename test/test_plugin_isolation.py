@@ -0,0 +1,57 @@
+"""An isolated weather client serves tools, resources, help and shard keys through its worker."""
+
+import asyncio
+
+import pytest
+
+from src.clients.weather.client import WeatherClient
+from src.core.registry import ClientRegistry
+from src.core.remote_client import RemoteClient
+from src.types.common import ClientConfig
+
+
+def test_isolated_client_matches_in_process_client(weather_env, standin, monkeypatch):
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    config = ClientConfig(name="weather", description="Weather")
+    local = WeatherClient(config)
+    remote = RemoteClient(config, workers=1, health_interval=60)
+    registry = ClientRegistry()
+    registry.update({"weather": remote})
+    assert remote.get_tools() == []
+    
+    async def scenario():
+        # Workers start without blocking the event loop
+        ticks = 0
+        
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        ticker = asyncio.get_running_loop().create_task(tick())
+        await registry.start_all()
+        ticker.cancel()
+        assert ticks >= 5
+        try:
+            assert [tool.name for tool in remote.get_tools()] == [tool.name for tool in local.get_tools()]
+            assert registry.find_tool("get_current_weather") == ("weather", remote.get_tool("get_current_weather"))
+            assert registry.search_tools("current weather")[0][2].name == "get_current_weather"
+            assert remote.get_resource_templates() == local.get_resource_templates()
+            assert remote.get_help_text() == local.get_help_text()
+            
+            for arguments in ({"location": "London, UK"}, {"location": "51.5,-0.12"}):
+                assert await remote.route_key("get_current_weather", arguments) == local.shard_key("get_current_weather", arguments)
+            
+            text = await remote.read_resource("weather://current/London%2CUK")
+            assert text.startswith("Current weather in London, GB")
+            assert await remote.read_resource("other://thing") is None
+            with pytest.raises(ValueError):
+                await remote.read_resource("weather://current/")
+            
+            result = await remote.run_tool("get_current_weather", {"location": "London,UK", "units": "metric"})
+            assert not result.isError and "Temperature: 12.3°C" in result.text
+        finally:
+            await remote.close()
+    
+    asyncio.run(scenario())
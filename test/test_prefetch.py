@@ -0,0 +1,49 @@
+"""The weather prefetcher answers hot-location checks from the set computed each cycle."""
+
+import asyncio
+import logging
+
+from src.clients.weather.prefetch import WeatherPrefetcher
+
+
+class _Client:
+    """The part of WeatherClient the prefetcher uses, with nothing cached."""
+    
+    logger = logging.getLogger(__name__)
+    
+    def __init__(self):
+        self.refreshed = []
+    
+    def expires_in(self, endpoint, location):
+        return None
+    
+    async def refresh(self, endpoint, location):
+        self.refreshed.append((endpoint, location))
+
+
+def test_hot_set_changes_only_on_refresh_cycles():
+    client = _Client()
+    prefetcher = WeatherPrefetcher(client, top_k=2, budget_per_minute=100)
+    for _ in range(3):
+        prefetcher.record("London")
+    
+    assert not prefetcher.is_hot("london")
+    asyncio.run(prefetcher.refresh_hot())
+    assert prefetcher.is_hot("london")
+    assert client.refreshed == [("forecast", "london")]
+    
+    async def current_requests():
+        for _ in range(5):
+            prefetcher.record_current("London")
+            prefetcher.record_current("Paris")
+        await asyncio.sleep(0.01)
+    
+    # Paris turns popular but stays cold until the next cycle; London co-fetches its forecast once
+    asyncio.run(current_requests())
+    assert not prefetcher.is_hot("paris")
+    assert client.refreshed == [("forecast", "london")] * 2
+    stats = prefetcher.stats()
+    assert (stats["hot"], stats["refreshes"], stats["tracked"]) == (["london"], 2, 2)
+    
+    asyncio.run(prefetcher.refresh_hot())
+    assert prefetcher.is_hot("paris")
@@ -0,0 +1,86 @@
+"""Paging and filtering of the tool catalog."""
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+from src.core.base_client import BaseClient
+from src.core.registry import ClientRegistry, InvalidCursorError
+from src.middleware.auth import VALID_API_KEYS
+from src.types.common import ClientConfig, ToolDefinition, ToolResult
+
+
+class NamedToolsClient(BaseClient):
+    """A client with tools of the given names."""
+    
+    def __init__(self, name: str, tool_names: List[str]):
+        self.tool_names = tool_names
+        super().__init__(ClientConfig(name=name, description=name))
+    
+    def _initialize_tools(self) -> None:
+        for tool_name in self.tool_names:
+            self.register_tool(ToolDefinition(name=tool_name, description=tool_name, inputSchema={}))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        return ToolResult(content=[{"type": "text", "text": tool_name}])
+
+
+def make_registry() -> ClientRegistry:
+    registry = ClientRegistry()
+    registry.update({
+        "weather": NamedToolsClient("weather", ["get_current_weather", "get_weather_forecast"]),
+        "files": NamedToolsClient("files", ["list_files", "read_file", "write_file"])
+    })
+    return registry
+
+
+def names(page) -> List[str]:
+    return [tool.name for _, tool in page]
+
+
+def test_pages_follow_cursors_in_name_order():
+    registry = make_registry()
+    pages, cursor = [], None
+    while True:
+        page, cursor = registry.list_tools(cursor=cursor, limit=2)
+        pages.append(names(page))
+        if cursor is None:
+            break
+    assert pages == [["get_current_weather", "get_weather_forecast"], ["list_files", "read_file"], ["write_file"]]
+    
+    page, _ = registry.list_tools(client="files", prefix="w")
+    assert names(page) == ["write_file"]
+
+
+def test_cursor_of_a_removed_tool_resumes_after_it():
+    registry = make_registry()
+    page, cursor = registry.list_tools(limit=4)
+    assert names(page)[-1] == "read_file"
+    
+    # The plugin is reloaded without the tool the cursor names, and with a new one before it
+    registry.update({"files": NamedToolsClient("files", ["list_files", "move_file", "write_file"])})
+    page, cursor = registry.list_tools(cursor=cursor, limit=4)
+    assert (names(page), cursor) == (["write_file"], None)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "gA==", "////"])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        make_registry().list_tools(cursor=cursor)
+
+
+def test_invalid_cursor_is_a_bad_request(monkeypatch):
+    monkeypatch.setattr(app_module, "registry", make_registry())
+    client = TestClient(app_module.app)
+    headers = {"X-API-Key": next(iter(VALID_API_KEYS))}
+    
+    first = client.get("/tools?limit=3&fields=names", headers=headers).json()
+    second = client.get(f"/tools?limit=3&fields=names&cursor={first['next_cursor']}", headers=headers).json()
+    assert [tool["name"] for tool in first["tools"] + second["tools"]] == names(make_registry().list_tools()[0])
+    assert second["next_cursor"] is None
+    
+    response = client.get("/tools?cursor=not-a-cursor!", headers=headers)
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
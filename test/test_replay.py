@@ -0,0 +1,88 @@
+"""A captured session replays against the OWM stand-in serving its recorded responses."""
+
+import asyncio
+import contextlib
+import importlib.util
+import json
+import os
+import threading
+import time
+
+import uvicorn
+from fastapi.testclient import TestClient
+
+from src import app as app_module
+from src.core import capture
+from src.middleware.auth import VALID_API_KEYS
+
+API_KEY = next(iter(VALID_API_KEYS))
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+CALLS = [
+    ("get_current_weather", {"location": "London, UK"}),
+    ("get_weather_forecast", {"location": "London, UK", "days": 1}),
+    ("get_current_weather", {"location": "51.5,-0.12"}),
+    ("get_current_weather", {"location": "london, uk"}),
+    ("get_current_weather", {"location": ""})
+]
+
+
+def load_script(name: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def serving(app):
+    """Serve an app on a free local port."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        assert thread.is_alive() and time.monotonic() < deadline
+        time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join(30)
+
+
+def test_replay_against_the_standin_matches_the_capture(weather_env, standin, monkeypatch, tmp_path):
+    path = str(tmp_path / "traffic.jsonl")
+    monkeypatch.setenv("SNAPSHOT_ENABLED", "false")
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    monkeypatch.setenv("TRAFFIC_CAPTURE_ENABLED", "true")
+    monkeypatch.setenv("TRAFFIC_CAPTURE_PATH", path)
+    monkeypatch.setattr(capture, "_traffic_capture", None)
+    
+    with TestClient(app_module.app) as client:
+        statuses = [client.post(f"/tools/{tool}", json=arguments, headers={"X-API-Key": API_KEY}).status_code for tool, arguments in CALLS]
+    assert statuses == [200, 200, 200, 200, 422]
+    
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    calls = [record for record in records if record["type"] == "call"]
+    upstream = [record for record in records if record["type"] == "upstream"]
+    assert [(call["tool"], call["arguments"], call["status"]) for call in calls] == [call + (status,) for call, status in zip(CALLS, statuses)]
+    assert len(upstream) == len(standin.requests) == 3
+    
+    # Replay cold, without capturing, against the recorded responses only
+    owm_standin, replay = load_script("owm_standin"), load_script("replay")
+    monkeypatch.setenv("TRAFFIC_CAPTURE_ENABLED", "false")
+    monkeypatch.setattr(capture, "_traffic_capture", None)
+    standin.failing.update({"weather", "forecast"})
+    capture_file = replay.load_capture(path, ["http"], None)
+    
+    with serving(owm_standin.create_app(*owm_standin.load_responses(path), latency_scale=0)) as standin_url:
+        monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin_url)
+        with serving(app_module.app) as url:
+            replayer = replay.Replayer(url, {}, API_KEY, timeout=10)
+            asyncio.run(replayer.run(capture_file["calls"], None, 1))
+            stats = asyncio.run(replay.fetch_json(f"{standin_url}/_standin/stats"))
+    
+    assert [(result["tool"], result["status"]) for result in replayer.results] == [(call["tool"], call["status"]) for call in calls]
+    assert (stats["requests"], stats["misses"], stats["recorded"]) == (3, 0, 3)
+    assert len(standin.requests) == 3
@@ -0,0 +1,69 @@
+"""The prefork production server."""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def workers(pid: int) -> set:
+    with open(f"/proc/{pid}/task/{pid}/children") as children:
+        return {int(child) for child in children.read().split()}
+
+
+def wait_for(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            value = condition()
+        except httpx.TransportError:
+            value = None
+        if value:
+            return value
+        time.sleep(0.1)
+    raise AssertionError("Timed out")
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="lists workers through /proc")
+def test_workers_are_restarted_and_drained(weather_env, monkeypatch):
+    port = free_port()
+    for name, value in {
+        "SERVER_HOST": "127.0.0.1", "SERVER_PORT": str(port), "SERVER_WORKERS": "2",
+        "SERVER_GRACEFUL_TIMEOUT": "5", "SNAPSHOT_ENABLED": "false", "LOG_LEVEL": "WARNING"
+    }.items():
+        monkeypatch.setenv(name, value)
+    server = subprocess.Popen([sys.executable, "-m", "src.serve"], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    health = f"http://127.0.0.1:{port}/health"
+    
+    try:
+        wait_for(lambda: httpx.get(health).status_code == 200)
+        started = wait_for(lambda: len(workers(server.pid)) == 2 and workers(server.pid))
+        
+        # A worker that dies is replaced, and the others keep serving meanwhile
+        killed = min(started)
+        os.kill(killed, signal.SIGKILL)
+        assert httpx.get(health).status_code == 200
+        replaced = wait_for(lambda: len(workers(server.pid)) == 2 and killed not in workers(server.pid) and workers(server.pid))
+        assert replaced - started and max(started) in replaced
+        wait_for(lambda: httpx.get(health).status_code == 200)
+        
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=20) == 0
+        assert not any(os.path.exists(f"/proc/{pid}") for pid in replaced)
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
@@ -0,0 +1,67 @@
+"""Consistent-hash sharding of tool calls."""
+
+from src.core.sharding import HashRing, ShardRouter
+
+NODES = ["http://a:8008", "http://b:8008", "http://c:8008"]
+KEYS = [f"location:{i}" for i in range(300)]
+
+
+def test_preference_yields_every_node_once_owner_first():
+    ring = HashRing(NODES)
+    for key in KEYS[:20]:
+        preference = list(ring.preference(key))
+        assert sorted(preference) == sorted(NODES)
+        assert preference == list(ring.preference(key))
+
+
+def test_keys_are_spread_and_move_only_to_a_new_node():
+    ring = HashRing(NODES)
+    owners = {key: next(ring.preference(key)) for key in KEYS}
+    assert set(owners.values()) == set(NODES)
+    assert max(list(owners.values()).count(node) for node in NODES) < len(KEYS) * 0.5
+    
+    grown = HashRing(NODES + ["http://d:8008"])
+    for key, owner in owners.items():
+        assert next(grown.preference(key)) in (owner, "http://d:8008")
+
+
+def test_choose_routes_to_the_owner_when_balanced():
+    router = ShardRouter(NODES[0], NODES)
+    for key in KEYS[:20]:
+        assert router.choose(key) == next(router.ring.preference(key))
+    assert router.rebalanced == 0
+
+
+def test_choose_passes_over_an_overloaded_owner():
+    router = ShardRouter(NODES[0], NODES, load_factor=1.25)
+    key = KEYS[0]
+    owner, successor, _ = router.ring.preference(key)
+    
+    # Six calls in flight: each node's bound is ceil(1.25 * 7 / 3) = 3
+    router.in_flight[owner] = 3
+    router.in_flight[successor] = 2
+    router.in_flight[[node for node in NODES if node not in (owner, successor)][0]] = 1
+    assert router.choose(key) == successor
+    assert router.rebalanced == 1
+    
+    router.in_flight[owner] = 2
+    assert router.choose(key) == owner
+
+
+def test_choose_skips_down_nodes_and_falls_back_to_self():
+    router = ShardRouter(NODES[0], NODES, down_cooldown=60)
+    key = next(key for key in KEYS if next(router.ring.preference(key)) != NODES[0])
+    owner = router.choose(key)
+    
+    router.mark_down(owner)
+    assert not router.is_up(owner)
+    assert router.choose(key) != owner
+    
+    router.mark_down(NODES[0])
+    assert router.is_up(NODES[0])
+    
+    # Every candidate over its bound: the call is served locally
+    router.load_factor = 0.0
+    routed = router.routed[NODES[0]]
+    assert router.choose(key) == NODES[0]
+    assert router.routed[NODES[0]] == routed + 1
@@ -0,0 +1,83 @@
+"""Streamed tool results over NDJSON, SSE and MCP progress notifications."""
+
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from src import app as app_module
+from src.core.base_client import BaseClient
+from src.core.registry import ClientRegistry
+from src.mcp_server import PureMCPServer
+from src.middleware.auth import VALID_API_KEYS
+from src.types.common import ClientConfig, ToolDefinition, ToolResult
+
+API_KEY = next(iter(VALID_API_KEYS))
+
+
+class CountingClient(BaseClient):
+    """One tool that counts up to a number, one line per chunk."""
+    
+    def _initialize_tools(self) -> None:
+        self.register_tool(ToolDefinition(name="count", description="Count up", inputSchema={"type": "object"}))
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        text = "".join(f"{i}\n" for i in range(1, arguments["to"] + 1))
+        return ToolResult(content=[{"type": "text", "text": text}])
+    
+    async def stream_tool(self, tool_name: str, arguments: Dict[str, Any]) -> AsyncIterator[ToolResult]:
+        for i in range(1, arguments["to"] + 1):
+            await asyncio.sleep(0)
+            yield ToolResult(content=[{"type": "text", "text": f"{i}\n"}])
+        if arguments.get("fail"):
+            yield ToolResult(content=[{"type": "text", "text": "Counter broke"}], isError=True)
+
+
+def _registry() -> ClientRegistry:
+    registry = ClientRegistry()
+    registry.update({"counting": CountingClient(ClientConfig(name="counting", description="Counting"))})
+    return registry
+
+
+def test_ndjson_stream_matches_the_plain_response(monkeypatch):
+    monkeypatch.setattr(app_module, "registry", _registry())
+    client = TestClient(app_module.app)
+    headers = {"X-API-Key": API_KEY}
+    
+    plain = client.post("/tools/count", json={"to": 3}, headers=headers).json()["result"]
+    streamed = client.post("/tools/count", json={"to": 3}, headers={**headers, "Accept": "application/x-ndjson"})
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    
+    events = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [event["event"] for event in events] == ["chunk", "chunk", "chunk", "done"]
+    assert "".join(event["content"]["text"] for event in events[:-1]) == plain == "1\n2\n3\n"
+    assert events[-1]["chunks"] == 3
+
+
+def test_sse_stream_ends_with_an_error_event(monkeypatch):
+    monkeypatch.setattr(app_module, "registry", _registry())
+    client = TestClient(app_module.app)
+    
+    streamed = client.post("/tools/count", json={"to": 2, "fail": True}, headers={"X-API-Key": API_KEY, "Accept": "text/event-stream"})
+    frames = [frame.split("\n") for frame in streamed.text.strip().split("\n\n")]
+    assert [frame[0] for frame in frames] == ["event: chunk", "event: chunk", "event: error"]
+    assert json.loads(frames[-1][1][len("data: "):])["detail"] == "Counter broke"
+
+
+def test_mcp_progress_notifications_carry_each_chunk():
+    server = PureMCPServer(registry=_registry(), client_name="test")
+    progress = []
+    
+    async def on_progress(done, total, message):
+        progress.append((done, message))
+    
+    async def call():
+        async with create_connected_server_and_client_session(server.server) as session:
+            return await session.call_tool("count", {"to": 3}, progress_callback=on_progress)
+    
+    result = asyncio.run(call())
+    assert not result.isError
+    assert result.content[0].text == "1\n2\n3\n"
+    assert progress == [(1, "1\n"), (2, "2\n"), (3, "3\n")]
@@ -0,0 +1,123 @@
+"""MCP resource subscriptions."""
+
+from typing import Any, Dict, List, Optional
+import asyncio
+
+import mcp.types as types
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from src.core.base_client import BaseClient
+from src.core.registry import ClientRegistry
+from src.core.subscriptions import ResourceSubscriptions, SubscriptionLimitError
+from src.mcp_server import PureMCPServer
+from src.types.common import ClientConfig, ToolResult
+
+
+class Session:
+    """Records the update notifications sent to it, or fails as a session that went away."""
+    
+    def __init__(self, gone: bool = False):
+        self.updated: List[str] = []
+        self.gone = gone
+    
+    async def send_resource_updated(self, uri: str) -> None:
+        if self.gone:
+            raise ConnectionError("session closed")
+        self.updated.append(uri)
+
+
+def test_subscribers_share_one_poller_and_hear_only_changes():
+    values = {"demo://a": "1"}
+    reads = []
+    
+    async def read(uri):
+        reads.append(uri)
+        await asyncio.sleep(0)
+        return values[uri]
+    
+    async def scenario():
+        subscriptions = ResourceSubscriptions(read, interval=0.01, max_resources=1)
+        sessions = [Session(), Session(), Session(gone=True)]
+        await asyncio.gather(*(subscriptions.subscribe("demo://a", session) for session in sessions))
+        assert reads == ["demo://a"]
+        with pytest.raises(SubscriptionLimitError):
+            await subscriptions.subscribe("demo://b", Session())
+        
+        await asyncio.sleep(0.05)
+        assert [session.updated for session in sessions] == [[], [], []]
+        
+        values["demo://a"] = "2"
+        await asyncio.sleep(0.05)
+        assert [session.updated for session in sessions] == [["demo://a"], ["demo://a"], []]
+        assert subscriptions.latest("demo://a") == "2"
+        stats = subscriptions.stats()
+        assert (stats["resources"], stats["subscribers"], stats["notifications"]) == (1, 2, 2)
+        
+        for session in sessions[:2]:
+            await subscriptions.unsubscribe("demo://a", session)
+        polled = len(reads)
+        await asyncio.sleep(0.05)
+        return polled, subscriptions.stats()
+    
+    polled, stats = asyncio.run(scenario())
+    assert len(reads) == polled
+    assert (stats["resources"], stats["subscribers"]) == (0, 0)
+
+
+class CounterClient(BaseClient):
+    """Serves one resource, demo://counter, whose text is a counter."""
+    
+    def __init__(self, config: ClientConfig):
+        super().__init__(config)
+        self.counter = 0
+    
+    def _initialize_tools(self) -> None:
+        pass
+    
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        raise ValueError(f"Unknown tool: {tool_name}")
+    
+    def get_resource_templates(self) -> List[Dict[str, Any]]:
+        return [{"uriTemplate": "demo://counter", "name": "Counter", "description": "A counter", "mimeType": "text/plain"}]
+    
+    async def read_resource(self, uri: str) -> Optional[str]:
+        return str(self.counter) if uri == "demo://counter" else None
+
+
+def test_mcp_sessions_are_notified_when_a_resource_changes(monkeypatch):
+    monkeypatch.setenv("SUBSCRIPTION_POLL_INTERVAL", "0.01")
+    client = CounterClient(ClientConfig(name="demo", description="Demo"))
+    registry = ClientRegistry()
+    registry.update({"demo": client})
+    server = PureMCPServer(registry=registry, client_name="test")
+    updated = []
+    
+    async def on_message(message):
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ResourceUpdatedNotification):
+            updated.append(str(message.root.params.uri))
+    
+    async def scenario():
+        async with create_connected_server_and_client_session(server.server, message_handler=on_message) as session:
+            assert session.get_server_capabilities().resources.subscribe
+            templates = await session.list_resource_templates()
+            assert [template.uriTemplate for template in templates.resourceTemplates] == ["demo://counter"]
+            
+            await session.subscribe_resource("demo://counter")
+            await asyncio.sleep(0.05)
+            assert updated == []
+            
+            client.counter = 1
+            await asyncio.sleep(0.05)
+            assert updated == ["demo://counter"]
+            read = await session.read_resource("demo://counter")
+            assert read.contents[0].text == "1"
+            
+            await session.unsubscribe_resource("demo://counter")
+            client.counter = 2
+            await asyncio.sleep(0.05)
+        await server.subscriptions.close()
+    
+    asyncio.run(scenario())
+    assert updated == ["demo://counter"]
+    assert server.subscriptions.stats()["resources"] == 0
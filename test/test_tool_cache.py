@@ -0,0 +1,107 @@
+"""Declarative caching of tool results."""
+
+import asyncio
+
+from src.core.cache import MemoryCache
+from src.core.tool_cache import ToolResultCache
+from src.types.common import CachePolicy, ToolDefinition, ToolResult
+
+
+class Upstream:
+    """Counts the calls a cached tool makes, answering each after a short delay."""
+    
+    def __init__(self, error: bool = False):
+        self.calls = 0
+        self.error = error
+    
+    async def __call__(self) -> ToolResult:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return ToolResult(content=[{"type": "text", "text": f"call {self.calls}"}], isError=self.error)
+
+
+def make_tool(**policy) -> ToolDefinition:
+    return ToolDefinition("lookup", "Look something up", {}, cache=CachePolicy(ttl=60, **policy))
+
+
+def test_results_are_reused_for_equal_arguments():
+    cache = ToolResultCache(MemoryCache())
+    tool = make_tool(key_arguments=["q"])
+    upstream = Upstream()
+    
+    async def scenario():
+        first = await cache.run(cache.key(tool, {"q": "paris", "trace": 1}, "alice"), tool, upstream)
+        key = cache.key(tool, {"trace": 2, "q": "paris"}, "bob")
+        return first, cache.get(key)
+    
+    first, cached = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert cached.content == first.content
+    assert cache.key(ToolDefinition("plain", "Not cached", {}), {}, "alice") is None
+
+
+def test_api_key_scope_keeps_callers_apart():
+    cache = ToolResultCache(MemoryCache())
+    tool = make_tool(scope="api_key")
+    upstream = Upstream()
+    
+    async def scenario():
+        await cache.run(cache.key(tool, {"q": "paris"}, "alice"), tool, upstream)
+        assert cache.get(cache.key(tool, {"q": "paris"}, "alice")) is not None
+        assert cache.get(cache.key(tool, {"q": "paris"}, "bob")) is None
+        await cache.run(cache.key(tool, {"q": "paris"}, "bob"), tool, upstream)
+    
+    asyncio.run(scenario())
+    assert upstream.calls == 2
+
+
+def test_errors_are_only_stored_when_the_policy_allows():
+    cache = ToolResultCache(MemoryCache())
+    upstream = Upstream(error=True)
+    
+    async def scenario(tool):
+        key = cache.key(tool, {"q": "atlantis"}, None)
+        result = await cache.run(key, tool, upstream)
+        assert result.isError
+        return cache.get(key)
+    
+    assert asyncio.run(scenario(make_tool())) is None
+    assert cache.stats()["stored"] == 0
+    
+    cached = asyncio.run(scenario(make_tool(cache_errors=True)))
+    assert cached.isError
+    assert cache.stats()["stored"] == 1
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    cache = ToolResultCache(MemoryCache())
+    tool = make_tool()
+    upstream = Upstream()
+    
+    async def scenario():
+        key = cache.key(tool, {"q": "paris"}, None)
+        return await asyncio.gather(*(cache.run(key, tool, upstream) for _ in range(10)))
+    
+    results = asyncio.run(scenario())
+    assert upstream.calls == 1
+    assert {result.content[0]["text"] for result in results} == {"call 1"}
+    stats = cache.stats()
+    assert (stats["coalesced"], stats["stored"], stats["in_flight"]) == (9, 1, 0)
+
+
+def test_a_failed_execution_fails_its_waiters_and_is_not_stored():
+    cache = ToolResultCache(MemoryCache())
+    tool = make_tool()
+    
+    async def failing() -> ToolResult:
+        await asyncio.sleep(0.01)
+        raise ConnectionError("upstream down")
+    
+    async def scenario():
+        key = cache.key(tool, {"q": "paris"}, None)
+        results = await asyncio.gather(*(cache.run(key, tool, failing) for _ in range(3)), return_exceptions=True)
+        return results, cache.get(key)
+    
+    results, cached = asyncio.run(scenario())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert cached is None
@@ -0,0 +1,64 @@
+"""Full-text tool search."""
+
+from src.core.tool_search import ToolSearchIndex, tokenize
+from src.types.common import ToolDefinition
+
+LOCATION_SCHEMA = {
+    "type": "object",
+    "properties": {"location": {"type": "string", "description": "City name"}}
+}
+
+
+def make_index() -> ToolSearchIndex:
+    index = ToolSearchIndex()
+    index.add("weather", ToolDefinition("get_current_weather", "Current conditions for a city", LOCATION_SCHEMA))
+    index.add("weather", ToolDefinition("get_weather_forecast", "Forecast for the coming days", LOCATION_SCHEMA))
+    index.add("files", ToolDefinition("read_file", "Read a file from disk, with weather-proof locking", {}))
+    return index
+
+
+def test_tokenize_splits_names_and_drops_stop_words_and_plurals():
+    assert tokenize("getWeatherForecast") == ["weather", "forecast"]
+    assert tokenize("list_cities for the days") == ["list", "city", "day"]
+
+
+def test_name_matches_outrank_description_matches():
+    names = [tool.name for _, _, tool in make_index().search("weather")]
+    assert names[-1] == "read_file"
+    assert set(names[:2]) == {"get_current_weather", "get_weather_forecast"}
+
+
+def test_more_matching_terms_rank_higher():
+    results = make_index().search("weather forecast")
+    assert results[0][2].name == "get_weather_forecast"
+    assert results[0][0] > results[1][0]
+
+
+def test_parameter_descriptions_are_indexed():
+    names = {tool.name for _, _, tool in make_index().search("city name")}
+    assert names == {"get_current_weather", "get_weather_forecast"}
+
+
+def test_limit_and_client_filter():
+    index = make_index()
+    assert len(index.search("weather", limit=1)) == 1
+    assert [client for _, client, _ in index.search("weather", client="files")] == ["files"]
+    assert index.search("unrelated") == []
+
+
+def test_remove_and_replace_update_the_index():
+    index = make_index()
+    index.remove("get_weather_forecast")
+    assert len(index) == 2
+    assert index.search("forecast") == []
+    
+    index.add("weather", ToolDefinition("get_current_weather", "Air quality index", {}))
+    assert len(index) == 2
+    assert [tool.name for _, _, tool in index.search("air quality")] == ["get_current_weather"]
+    assert [tool.name for _, _, tool in index.search("conditions")] == []
+    
+    index.remove("missing")
+    for name in ("get_current_weather", "read_file"):
+        index.remove(name)
+    assert len(index) == 0
+    assert index.search("weather") == []
@@ -0,0 +1,66 @@
+"""Compiled tool argument validation."""
+
+import pytest
+
+from src.core.validation import ToolArgumentError, compile_schema
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "location": {"type": "string", "minLength": 1},
+        "days": {"type": "integer", "minimum": 1, "maximum": 5, "default": 3},
+        "ratio": {"type": "number"},
+        "detailed": {"type": "boolean", "default": False},
+        "include": {"type": "array", "items": {"type": "string", "enum": ["current", "forecast"]}, "default": ["current"]}
+    },
+    "required": ["location"]
+}
+
+
+def test_strings_are_coerced_to_schema_types():
+    validate = compile_schema("tool", SCHEMA)
+    arguments = validate({"location": "Paris", "days": " 4 ", "ratio": "0.5", "detailed": "TRUE"})
+    assert arguments["days"] == 4
+    assert arguments["ratio"] == 0.5
+    assert arguments["detailed"] is True
+
+
+def test_integral_floats_are_integers_but_booleans_are_not():
+    validate = compile_schema("tool", SCHEMA)
+    assert validate({"location": "Paris", "days": 2.0})["days"] == 2
+    with pytest.raises(ToolArgumentError, match="'days' must be of type integer"):
+        validate({"location": "Paris", "days": True})
+
+
+def test_defaults_are_filled_in_and_not_shared_between_calls():
+    validate = compile_schema("tool", SCHEMA)
+    first = validate({"location": "Paris"})
+    assert first == {"location": "Paris", "days": 3, "detailed": False, "include": ["current"]}
+    
+    first["include"].append("forecast")
+    assert validate({"location": "Paris"})["include"] == ["current"]
+
+
+def test_every_invalid_argument_is_reported():
+    validate = compile_schema("tool", SCHEMA)
+    with pytest.raises(ToolArgumentError) as raised:
+        validate({"days": 9, "include": ["current", "history"]})
+    
+    errors = raised.value.errors
+    assert "'days' must be <= 5" in errors
+    assert any("'include[]' must be one of" in error for error in errors)
+    assert "missing required argument 'location'" in errors
+    assert raised.value.tool_name == "tool"
+
+
+def test_unknown_arguments_pass_unless_additional_properties_is_false():
+    assert compile_schema("tool", SCHEMA)({"location": "Paris", "extra": 1})["extra"] == 1
+    
+    strict = compile_schema("tool", {**SCHEMA, "additionalProperties": False})
+    with pytest.raises(ToolArgumentError, match="unexpected argument 'extra'"):
+        strict({"location": "Paris", "extra": 1})
+
+
+def test_non_object_arguments_are_rejected():
+    with pytest.raises(ToolArgumentError, match="arguments must be an object"):
+        compile_schema("tool", SCHEMA)(["Paris"])
@@ -0,0 +1,55 @@
+"""Weather cache entries keyed by coordinate grid cell."""
+
+import asyncio
+
+from src.clients.weather.client import WeatherClient
+from src.clients.weather.locations import CoordinateGrid, geohash_cell, parse_coordinates
+from src.types.common import ClientConfig
+
+
+def test_degree_grid_snaps_nearby_points_to_one_cell():
+    grid = CoordinateGrid(step=0.01)
+    first, second = grid.snap(51.5012, -0.1234), grid.snap(51.4988, -0.1226)
+    assert first["cell"] == second["cell"] == "deg0.01:51.500000,-0.120000"
+    assert (first["lat"], first["lon"]) == (51.5, -0.12)
+    assert 0 < first["error_m"] < 500
+    assert grid.snap(51.5112, -0.1234)["cell"] != first["cell"]
+
+
+def test_geohash_grid_uses_geohash_cells():
+    assert geohash_cell(57.64911, 10.40744, 11)[0] == "u4pruydqqvj"
+    grid = CoordinateGrid(mode="geohash", precision=5)
+    snap = grid.snap(57.64911, 10.40744)
+    assert snap["cell"] == "geohash:u4pru"
+    assert grid.snap(57.65, 10.41)["cell"] == snap["cell"]
+
+
+def test_only_valid_coordinates_are_parsed():
+    assert parse_coordinates(" 51.5 , -0.12 ") == (51.5, -0.12)
+    assert parse_coordinates("91,0") is None
+    assert parse_coordinates("London, UK") is None
+
+
+def test_nearby_coordinates_and_geocoded_names_share_entries(weather_env, standin, monkeypatch):
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    client = WeatherClient(ClientConfig(name="weather", description="Weather"))
+    
+    async def current(location):
+        result = await client.execute_tool("get_current_weather", {"location": location})
+        assert not result.isError
+        return result.content[0]["text"]
+    
+    async def scenario():
+        try:
+            texts = [await current("51.5012,-0.1234"), await current("51.4988,-0.1226")]
+            # The stand-in geocodes London to 51.51,-0.13; nearby coordinates then hit the entry fetched by name
+            await current("London, UK")
+            texts.append(await current("51.5101,-0.1302"))
+            return texts
+        finally:
+            await client.close()
+    
+    first, second, near_london = asyncio.run(scenario())
+    assert [request.get("q") or (request["lat"], request["lon"]) for request in standin.requests] == [("51.5", "-0.12"), "London, UK"]
+    assert "Grid Point: 51.5, -0.12" in first and "Grid Point: 51.5, -0.12" in second
+    assert near_london.startswith("Current weather in London, GB")
@@ -0,0 +1,145 @@
+"""Local weather history store."""
+
+import asyncio
+import fcntl
+import math
+import os
+import time
+
+from src.clients.weather.history import BLOCK_ROWS, FORECAST, LOCK_FILE, OBSERVED, HistoryStore
+
+DAY = 86400.0
+
+
+def reading(at: float, temperature: float, humidity: float = math.nan):
+    return (at, temperature, humidity, 1013.0, 3.5)
+
+
+def make_store(tmp_path, **kwargs) -> HistoryStore:
+    return HistoryStore(str(tmp_path), retention=kwargs.pop("retention", 30 * DAY), compact_interval=0, **kwargs)
+
+
+def test_appended_readings_are_summarized_per_kind(tmp_path):
+    store = make_store(tmp_path)
+    now = time.time()
+    store.append("place:paris,fr", OBSERVED, [reading(now - 120, 10.0, 80.0), reading(now - 60, 14.0)])
+    store.append("place:paris,fr", FORECAST, [reading(now + 3600, 20.0)])
+    
+    summary, buckets = store.summarize("place:paris,fr", now - 3600, now)
+    assert buckets == []
+    assert summary["count"] == 2
+    assert (summary["first_temperature"], summary["last_temperature"]) == (10.0, 14.0)
+    assert summary["temperature"] == {"min": 10.0, "max": 14.0, "mean": 12.0}
+    # Missing values are skipped, not averaged in
+    assert summary["humidity"] == {"min": 80.0, "max": 80.0, "mean": 80.0}
+    
+    forecast, _ = store.summarize("place:paris,fr", now, now + DAY, FORECAST)
+    assert forecast["count"] == 1
+    assert store.summarize("place:unknown", now - DAY, now) == (None, [])
+
+
+def test_compaction_preserves_readings(tmp_path):
+    store = make_store(tmp_path)
+    now = time.time()
+    readings = [reading(now - DAY + i * 60, float(i % 50)) for i in range(3 * BLOCK_ROWS + 5)]
+    store.append("cell:1", OBSERVED, readings)
+    before, _ = store.summarize("cell:1", now - 2 * DAY, now)
+    
+    assert store.compact("cell:1")
+    assert not store.compact("cell:1")
+    after, _ = store.summarize("cell:1", now - 2 * DAY, now)
+    assert after == before
+    assert after["count"] == len(readings)
+    
+    # Ranges that cut through blocks aggregate the same as a plain scan
+    start, end = readings[10][0], readings[2 * BLOCK_ROWS + 3][0]
+    partial, _ = store.summarize("cell:1", start, end)
+    expected = [row[1] for row in readings if start <= row[0] <= end]
+    assert partial["count"] == len(expected)
+    assert partial["temperature"]["min"] == min(expected)
+    assert partial["temperature"]["max"] == max(expected)
+    assert math.isclose(partial["temperature"]["mean"], sum(expected) / len(expected))
+
+
+def test_log_readings_override_compacted_ones(tmp_path):
+    store = make_store(tmp_path)
+    now = time.time()
+    store.append("cell:1", OBSERVED, [reading(now - 300, 10.0), reading(now - 200, 11.0), reading(now - 100, 12.0)])
+    store.compact("cell:1")
+    
+    # A re-fetched reading replaces the compacted one, before and after the next compaction
+    store.append("cell:1", OBSERVED, [reading(now - 200, 30.0), reading(now - 50, 13.0)])
+    merged, _ = store.summarize("cell:1", now - DAY, now)
+    assert merged["count"] == 4
+    assert merged["temperature"]["max"] == 30.0
+    assert merged["last_temperature"] == 13.0
+    
+    store.compact("cell:1")
+    assert store.summarize("cell:1", now - DAY, now)[0] == merged
+
+
+def test_buckets_aggregate_per_aligned_period(tmp_path):
+    store = make_store(tmp_path)
+    day = (time.time() // DAY - 2) * DAY
+    store.append("cell:1", OBSERVED, [reading(day + 3600, 5.0), reading(day + 7200, 7.0), reading(day + 2 * DAY + 60, 9.0)])
+    
+    summary, buckets = store.summarize("cell:1", day, day + 3 * DAY, bucket=DAY)
+    assert summary["count"] == 3
+    assert [(row["bucket"], row["count"]) for row in buckets] == [(day, 2), (day + 2 * DAY, 1)]
+    assert buckets[0]["temperature"] == {"min": 5.0, "max": 7.0, "mean": 6.0}
+
+
+def test_compaction_drops_readings_past_retention(tmp_path):
+    store = make_store(tmp_path, retention=DAY)
+    now = time.time()
+    store.append("cell:1", OBSERVED, [reading(now - 3 * DAY, 1.0), reading(now - 60, 2.0)])
+    store.append("cell:2", OBSERVED, [reading(now - 2 * DAY, 3.0)])
+    
+    assert store.compact_all() == 2
+    summary, _ = store.summarize("cell:1", 0, now)
+    assert (summary["count"], summary["temperature"]["min"]) == (1, 2.0)
+    assert store.summarize("cell:2", 0, now) == (None, [])
+
+
+def test_full_logs_are_compacted_off_the_event_loop(tmp_path):
+    store = make_store(tmp_path, compact_rows=2)
+    now = time.time()
+    
+    async def scenario():
+        store.append("cell:1", OBSERVED, [reading(now - 60, 1.0), reading(now - 30, 2.0)])
+        assert store.stats()["compactions"] == 0
+        await store.stop()
+    
+    asyncio.run(scenario())
+    assert store.stats()["compactions"] == 1
+    assert store.summarize("cell:1", now - DAY, now)[0]["count"] == 2
+
+
+def test_appends_do_not_wait_for_a_compaction_on_the_event_loop(tmp_path):
+    store = make_store(tmp_path, compact_rows=4)
+    now = time.time()
+    
+    async def scenario():
+        store.append("cell:1", OBSERVED, [reading(now - 60, 1.0)])
+        
+        # Another worker compacts the location
+        (directory,) = os.listdir(tmp_path)
+        fd = os.open(os.path.join(tmp_path, directory, LOCK_FILE), os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            started = time.monotonic()
+            store.append("cell:1", OBSERVED, [reading(now - 50 + i, 2.0) for i in range(4)])
+            assert time.monotonic() - started < 0.5
+            await asyncio.sleep(0.1)
+            assert store.stats()["appended"] == 1
+        finally:
+            os.close(fd)
+        
+        # The deferred append lands once the lock is released, and fills the log past compact_rows
+        await store.stop()
+        return await store.summarize_async("cell:1", now - DAY, now)
+    
+    summary, _ = asyncio.run(scenario())
+    assert summary["count"] == 5
+    assert store.stats()["appended"] == 5
+    assert store.stats()["compactions"] == 1
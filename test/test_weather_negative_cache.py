@@ -0,0 +1,19 @@
+"""Rejected locations do not evict cached weather with a shared SQLite cache."""
+
+from src.clients.weather.client import WeatherClient
+from src.types.common import ClientConfig
+
+
+def test_negative_cache_bound_leaves_responses(weather_env, monkeypatch, tmp_path):
+    monkeypatch.setenv("CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("WEATHER_NEGATIVE_MAX_ENTRIES", "1")
+    client = WeatherClient(ClientConfig(name="weather", description="Weather"))
+    client.cache.set('weather:{"q":"london"}', ["London", "GB"], 600)
+    
+    # Enough rejections to run eviction with the negative cache far over its bound
+    for i in range(client.negative_cache.EVICTION_CHECK_INTERVAL):
+        client.negative_cache.set(f"location:{i}", {"status": 404, "message": "city not found"}, 600)
+    
+    assert client.negative_cache.stats()["bytes"] <= client.negative_cache.max_bytes
+    assert client.cache.get('weather:{"q":"london"}') == ["London", "GB"]
@@ -0,0 +1,47 @@
+"""get_weather_overview combines its sections, reporting a failed one in place."""
+
+import asyncio
+
+from src.clients.weather.client import WeatherClient
+from src.types.common import ClientConfig
+
+
+def overview(arguments):
+    client = WeatherClient(ClientConfig(name="weather", description="Weather"))
+    
+    async def call():
+        try:
+            return await client.execute_tool("get_weather_overview", arguments)
+        finally:
+            await client.close()
+    
+    return asyncio.run(call())
+
+
+def test_overview_renders_every_section(weather_env, standin, monkeypatch):
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    result = overview({"location": "London, UK", "include": ["current", "forecast", "history"], "days": 1})
+    assert not result.isError
+    text = result.text
+    assert text.startswith("Weather overview for London, GB:\n")
+    assert "\nNow:\nTemperature: 12.3°C\n" in text
+    assert "\nNext 1 day:\n2025-10-09: 10 to 17°C, Clear Sky\n" in text
+    assert text.endswith("\nLast 24 hours:\nHistory is disabled\n")
+    assert len(standin.requests) == 2
+
+
+def test_one_failing_section_is_reported_in_place(weather_env, standin, monkeypatch):
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    standin.failing.add("forecast")
+    result = overview({"location": "London, UK"})
+    assert not result.isError
+    assert "\nNow:\nTemperature: 12.3°C\n" in result.text
+    forecast = result.text.split("\nNext 3 days:\n", 1)[1]
+    assert forecast.startswith("Unavailable (") and "503" in forecast
+
+
+def test_overview_fails_when_every_section_fails(weather_env, standin, monkeypatch):
+    monkeypatch.setenv("OPENWEATHERMAP_BASE_URL", standin.url)
+    standin.failing.update({"weather", "forecast"})
+    result = overview({"location": "London, UK"})
+    assert result.isError
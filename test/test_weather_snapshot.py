@@ -0,0 +1,51 @@
+"""Weather cache records survive a snapshot save and restore."""
+
+import asyncio
+
+from src.clients.weather.client import WeatherClient
+from src.clients.weather.projection import project_current, project_forecast
+from src.clients.weather.types import CurrentWeather, WeatherForecast
+from src.core.snapshot import SnapshotManager
+from src.types.common import ClientConfig
+
+CURRENT = {
+    "name": "London", "sys": {"country": "GB"}, "coord": {"lat": 51.51, "lon": -0.13}, "dt": 1760000000,
+    "main": {"temp": 12.3, "humidity": 80, "pressure": 1012}, "weather": [{"description": "light rain"}],
+    "wind": {"speed": 3.1}, "visibility": 10000
+}
+FORECAST = {
+    "city": {"name": "Paris", "country": "FR", "coord": {"lat": 48.85, "lon": 2.35}},
+    "list": [
+        {"dt": 1760000000 + i * 10800, "dt_txt": f"2025-10-09 {i * 3:02d}:00:00", "main": {"temp": 10 + i, "humidity": 70, "pressure": 1010},
+         "weather": [{"description": "clear sky"}], "wind": {"speed": 2}}
+        for i in range(8)
+    ]
+}
+
+
+class _Registry:
+    """The part of ClientRegistry the snapshot manager uses."""
+    
+    def __init__(self, client):
+        self.clients = {"weather": client}
+
+
+def _client() -> WeatherClient:
+    return WeatherClient(ClientConfig(name="weather", description="Weather"))
+
+
+def test_records_round_trip_through_snapshot(weather_env, tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    client = _client()
+    current, forecast = project_current(CURRENT), project_forecast(FORECAST)
+    client.cache.set('weather:{"q":"london"}', current, 600)
+    client.cache.set('forecast:{"q":"paris"}', forecast, 600)
+    
+    assert asyncio.run(SnapshotManager(_Registry(client), path).save()) >= 2
+    
+    restored = _client()
+    assert SnapshotManager(_Registry(restored), path).load() >= 2
+    restored_current = restored.cache.get('weather:{"q":"london"}')
+    restored_forecast = restored.cache.get('forecast:{"q":"paris"}')
+    assert isinstance(restored_current, CurrentWeather) and restored_current == current
+    assert isinstance(restored_forecast, WeatherForecast) and restored_forecast == forecast